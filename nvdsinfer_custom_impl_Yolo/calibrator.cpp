@@ -10,15 +10,20 @@
 
 Int8EntropyCalibrator2::Int8EntropyCalibrator2(const int& batchSize, const int& channels, const int& height,
     const int& width, const float& scaleFactor, const float* offsets, const int& inputFormat,
-    const std::string& imgPath, const std::string& calibTablePath) : batchSize(batchSize), inputC(channels),
-    inputH(height), inputW(width), scaleFactor(scaleFactor), offsets(offsets), inputFormat(inputFormat),
-    calibTablePath(calibTablePath), imageIndex(0)
+    const int& maintainAspectRatio, const int& symmetricPadding, const std::string& imgPath,
+    const std::string& calibTablePath) : batchSize(batchSize), inputC(channels), inputH(height), inputW(width),
+    scaleFactor(scaleFactor), offsets(offsets), inputFormat(inputFormat), maintainAspectRatio(maintainAspectRatio),
+    symmetricPadding(symmetricPadding), calibTablePath(calibTablePath), imageIndex(0)
 {
   inputCount = batchSize * channels * height * width;
-  std::fstream f(imgPath);
+  std::ifstream f(imgPath);
   if (f.is_open()) {
       std::string temp;
       while (std::getline(f, temp)) {
+        if (imgPaths.empty() && temp == "# DeepStream-Yolo calibration tensor") {
+          tensorMode = readTensorIndex(f, imgPath);
+          break;
+        }
         imgPaths.push_back(temp);
       }
   }
@@ -49,13 +54,26 @@ Int8EntropyCalibrator2::getBatch(void** bindings, const char** names, int nbBind
 
   float* ptr = batchData;
   for (size_t i = imageIndex; i < imageIndex + batchSize; ++i) {
+    if (tensorMode) {
+      if (!loadTensorImage(i, ptr)) {
+        std::cerr << "Failed to read calibration tensor" << std::endl;
+        return false;
+      }
+      ptr += inputC * inputH * inputW;
+
+      std::cout << "Load image: " << imgPaths[i] << std::endl;
+      std::cout << "Progress: " << (i + 1) * 100. / imgPaths.size() << "%" << std::endl;
+      continue;
+    }
+
     cv::Mat img = cv::imread(imgPaths[i]);
     if (img.empty()){
       std::cerr << "Failed to read image for calibration" << std::endl;
       return false;
     }
   
-    std::vector<float> inputData = prepareImage(img, inputC, inputH, inputW, scaleFactor, offsets, inputFormat);
+    std::vector<float> inputData = prepareImage(img, inputC, inputH, inputW, scaleFactor, offsets, inputFormat,
+        maintainAspectRatio, symmetricPadding);
 
     size_t len = inputData.size();
     memcpy(ptr, inputData.data(), len * sizeof(float));
@@ -73,6 +91,110 @@ Int8EntropyCalibrator2::getBatch(void** bindings, const char** names, int nbBind
   return true;
 }
 
+bool
+Int8EntropyCalibrator2::readTensorIndex(std::ifstream& f, const std::string& imgPath)
+{
+  std::string line;
+  std::string dataPath;
+  std::string dtype;
+  int count = 0;
+  int channels = 0;
+  int height = 0;
+  int width = 0;
+  float tensorScaleFactor = scaleFactor;
+
+  while (std::getline(f, line)) {
+    size_t pos = line.find(' ');
+    std::string key = line.substr(0, pos);
+    std::string value = pos == std::string::npos ? "" : line.substr(pos + 1);
+
+    if (key == "image") {
+      imgPaths.push_back(value);
+    }
+    else if (key == "data") {
+      dataPath = value;
+    }
+    else if (key == "dtype") {
+      dtype = value;
+    }
+    else if (key == "count") {
+      count = std::stoi(value);
+    }
+    else if (key == "channels") {
+      channels = std::stoi(value);
+    }
+    else if (key == "height") {
+      height = std::stoi(value);
+    }
+    else if (key == "width") {
+      width = std::stoi(value);
+    }
+    else if (key == "scale-factor") {
+      tensorScaleFactor = std::stof(value);
+    }
+  }
+
+  if (channels != inputC || height != inputH || width != inputW || count != int(imgPaths.size()) ||
+      (dtype != "uint8" && dtype != "float32")) {
+    std::cerr << "Calibration tensor " << imgPath << " (" << channels << "x" << height << "x" << width << ") does not "
+        << "match the model input (" << inputC << "x" << inputH << "x" << inputW << ")" << std::endl;
+    imgPaths.clear();
+    return false;
+  }
+
+  if (dataPath.empty() || dataPath[0] != '/') {
+    size_t slash = imgPath.find_last_of('/');
+    dataPath = (slash == std::string::npos ? "" : imgPath.substr(0, slash + 1)) + dataPath;
+  }
+
+  tensorFile.open(dataPath, std::ios::binary);
+  if (!tensorFile.is_open()) {
+    std::cerr << "Failed to open calibration tensor " << dataPath << std::endl;
+    imgPaths.clear();
+    return false;
+  }
+
+  tensorUint8 = dtype == "uint8";
+  if (!tensorUint8 && tensorScaleFactor != scaleFactor) {
+    std::cout << "WARNING: Calibration tensor scale-factor " << tensorScaleFactor << " does not match the "
+        << "net-scale-factor " << scaleFactor << std::endl;
+  }
+  if (tensorUint8) {
+    tensorBuffer.resize(inputC * inputH * inputW);
+  }
+
+  std::cout << "Using calibration tensor: " << dataPath << " (" << count << " images, " << dtype << ")" << std::endl;
+
+  return true;
+}
+
+bool
+Int8EntropyCalibrator2::loadTensorImage(size_t index, float* ptr)
+{
+  const size_t imageSize = inputC * inputH * inputW;
+
+  if (!tensorUint8) {
+    tensorFile.seekg(index * imageSize * sizeof(float));
+    tensorFile.read(reinterpret_cast<char*>(ptr), imageSize * sizeof(float));
+    return tensorFile.good();
+  }
+
+  tensorFile.seekg(index * imageSize);
+  tensorFile.read(reinterpret_cast<char*>(tensorBuffer.data()), imageSize);
+  if (!tensorFile.good()) {
+    return false;
+  }
+
+  const size_t channelLength = inputH * inputW;
+  for (size_t j = 0; j < channelLength; ++j) {
+    for (int c = 0; c < inputC; ++c) {
+      ptr[c * channelLength + j] = scaleFactor * (tensorBuffer[j * inputC + c] - offsets[c]);
+    }
+  }
+
+  return true;
+}
+
 const void*
 Int8EntropyCalibrator2::readCalibrationCache(std::size_t &length) noexcept
 {
@@ -94,7 +216,8 @@ Int8EntropyCalibrator2::writeCalibrationCache(const void* cache, std::size_t len
 }
 
 std::vector<float>
-prepareImage(cv::Mat& img, int inputC, int inputH, int inputW, float scaleFactor, const float* offsets, int inputFormat)
+prepareImage(cv::Mat& img, int inputC, int inputH, int inputW, float scaleFactor, const float* offsets, int inputFormat,
+    int maintainAspectRatio, int symmetricPadding)
 {
   cv::Mat out;
 
@@ -108,25 +231,43 @@ prepareImage(cv::Mat& img, int inputC, int inputH, int inputW, float scaleFactor
     out = img;
   }
 
-  int imageW = img.cols;
-  int imageH = img.rows;
+  // nvinfer scaling (as utils/deepstream_yolo/preprocess.py): the source is rounded down to even width and height, the
+  // scaled size is truncated and the padding is split only with symmetric-padding
+  int imageW = std::max(img.cols - img.cols % 2, 1);
+  int imageH = std::max(img.rows - img.rows % 2, 1);
+  out = out(cv::Rect(0, 0, imageW, imageH));
+
+  int resizedW = inputW;
+  int resizedH = inputH;
+  if (maintainAspectRatio) {
+    if ((double) inputW * imageH / imageW <= inputH) {
+      resizedH = std::max(int((double) inputW * imageH / imageW), 1);
+    }
+    else {
+      resizedW = std::max(int((double) inputH * imageW / imageH), 1);
+    }
+  }
+  int padX = maintainAspectRatio && symmetricPadding ? (inputW - resizedW) / 2 : 0;
+  int padY = maintainAspectRatio && symmetricPadding ? (inputH - resizedH) / 2 : 0;
 
-  if (imageW != inputW || imageH != inputH) {
-    float resizeFactor = std::max(inputW / (float) imageW, inputH / (float) imageH);
-    cv::resize(out, out, cv::Size(0, 0), resizeFactor, resizeFactor, cv::INTER_CUBIC);
-    cv::Rect crop(cv::Point(0.5 * (out.cols - inputW), 0.5 * (out.rows - inputH)), cv::Size(inputW, inputH));
-    out = out(crop);
+  if (imageW != resizedW || imageH != resizedH) {
+    cv::resize(out, out, cv::Size(resizedW, resizedH), 0, 0, cv::INTER_LINEAR);
   }
+  cv::Mat canvas = cv::Mat::zeros(inputH, inputW, out.type());
+  out.copyTo(canvas(cv::Rect(padX, padY, resizedW, resizedH)));
+  out = canvas;
 
-  out.convertTo(out, CV_32F, scaleFactor);
+  out.convertTo(out, CV_32F);
 
   if (inputFormat == 2) {
-    cv::subtract(out, cv::Scalar(offsets[0] / 255), out);
+    cv::subtract(out, cv::Scalar(offsets[0]), out);
   }
   else {
-    cv::subtract(out, cv::Scalar(offsets[0] / 255, offsets[1] / 255, offsets[3] / 255), out);
+    cv::subtract(out, cv::Scalar(offsets[0], offsets[1], offsets[2]), out);
   }
 
+  out *= scaleFactor;
+
   std::vector<cv::Mat> inputChannels(inputC);
   cv::split(out, inputChannels);
   std::vector<float> result(inputH * inputW * inputC);
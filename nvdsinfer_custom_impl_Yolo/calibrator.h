@@ -7,6 +7,7 @@
 #define CALIBRATOR_H
 
 #include <vector>
+#include <fstream>
 #include <cuda_runtime_api.h>
 
 #include "NvInfer.h"
@@ -23,8 +24,8 @@
 class Int8EntropyCalibrator2 : public nvinfer1::IInt8EntropyCalibrator2 {
   public:
     Int8EntropyCalibrator2(const int& batchSize, const int& channels, const int& height, const int& width,
-        const float& scaleFactor, const float* offsets, const int& inputFormat, const std::string& imgPath,
-        const std::string& calibTablePath);
+        const float& scaleFactor, const float* offsets, const int& inputFormat, const int& maintainAspectRatio,
+        const int& symmetricPadding, const std::string& imgPath, const std::string& calibTablePath);
 
     virtual ~Int8EntropyCalibrator2();
 
@@ -37,6 +38,10 @@ class Int8EntropyCalibrator2 : public nvinfer1::IInt8EntropyCalibrator2 {
     void writeCalibrationCache(const void* cache, size_t length) noexcept override;
 
   private:
+    bool readTensorIndex(std::ifstream& f, const std::string& imgPath);
+
+    bool loadTensorImage(size_t index, float* ptr);
+
     int batchSize;
     int inputC;
     int inputH;
@@ -45,17 +50,23 @@ class Int8EntropyCalibrator2 : public nvinfer1::IInt8EntropyCalibrator2 {
     float scaleFactor;
     const float* offsets;
     int inputFormat;
+    int maintainAspectRatio;
+    int symmetricPadding;
     std::string calibTablePath;
     size_t imageIndex;
     size_t inputCount;
     std::vector<std::string> imgPaths;
     float* batchData {nullptr};
     void* deviceInput {nullptr};
-    bool readCache;
+    bool readCache {true};
     std::vector<char> calibrationCache;
+    bool tensorMode {false};
+    bool tensorUint8 {true};
+    std::ifstream tensorFile;
+    std::vector<unsigned char> tensorBuffer;
 };
 
 std::vector<float> prepareImage(cv::Mat& img, int inputC, int inputH, int inputW, float scaleFactor,
-    const float* offsets, int inputFormat);
+    const float* offsets, int inputFormat, int maintainAspectRatio, int symmetricPadding);
 
 #endif //CALIBRATOR_H
@@ -64,6 +64,10 @@ getYoloNetworkInfo(NetworkInfo& networkInfo, const NvDsInferContextInitParams* i
   networkInfo.offsets = initParams->offsets;
   networkInfo.workspaceSize = initParams->workspaceSize;
   networkInfo.inputFormat = initParams->networkInputFormat;
+  networkInfo.maintainAspectRatio = initParams->maintainAspectRatio;
+  networkInfo.symmetricPadding = initParams->symmetricPadding;
+  networkInfo.inferInputH = initParams->inferInputDims.h;
+  networkInfo.inferInputW = initParams->inferInputDims.w;
 
   if (initParams->networkMode == NvDsInferNetworkMode_FP32) {
     networkInfo.networkMode = "FP32";
@@ -23,6 +23,10 @@
  * https://www.github.com/marcoslucianops
  */
 
+#include <cstring>
+#include <cstdint>
+#include <algorithm>
+
 #include "nvdsinfer_custom_impl.h"
 
 #include "utils.h"
@@ -31,6 +35,30 @@ extern "C" bool
 NvDsInferParseYolo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
     NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList);
 
+extern "C" bool
+NvDsInferParseYoloNMS(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
+    NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList);
+
+extern "C" bool
+NvDsInferParseYoloTopK(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
+    NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList);
+
+extern "C" bool
+NvDsInferParseYoloCompact(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList);
+
+static const NvDsInferLayerInfo*
+getLayerInfo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, const char* layerName)
+{
+  for (const NvDsInferLayerInfo& layer : outputLayersInfo) {
+    if (layer.layerName && strcmp(layer.layerName, layerName) == 0) {
+      return &layer;
+    }
+  }
+  return nullptr;
+}
+
 static NvDsInferParseObjectInfo
 convertBBox(const float& bx1, const float& by1, const float& bx2, const float& by2, const uint& netW, const uint& netH)
 {
@@ -94,6 +122,102 @@ decodeTensorYolo(const float* output, const uint& outputSize, const uint& netW,
   return binfo;
 }
 
+static std::vector<NvDsInferParseObjectInfo>
+decodeTensorYoloSorted(const float* output, const uint& outputSize, const uint& netW, const uint& netH,
+    const std::vector<float>& preclusterThreshold)
+{
+  std::vector<NvDsInferParseObjectInfo> binfo;
+
+  const float minThreshold = preclusterThreshold.empty() ? 0.0 :
+      *std::min_element(preclusterThreshold.begin(), preclusterThreshold.end());
+
+  for (uint b = 0; b < outputSize; ++b) {
+    float maxProb = output[b * 6 + 4];
+
+    if (maxProb < minThreshold || maxProb <= 0) {
+      break;
+    }
+
+    int maxIndex = (int) output[b * 6 + 5];
+
+    if (maxProb < preclusterThreshold[maxIndex]) {
+      continue;
+    }
+
+    float bx1 = output[b * 6 + 0];
+    float by1 = output[b * 6 + 1];
+    float bx2 = output[b * 6 + 2];
+    float by2 = output[b * 6 + 3];
+
+    addBBoxProposal(bx1, by1, bx2, by2, netW, netH, maxIndex, maxProb, binfo);
+  }
+
+  return binfo;
+}
+
+static inline float
+toFloat(const float val)
+{
+  return val;
+}
+
+static inline float
+toFloat(const uint16_t val)
+{
+  const uint32_t sign = (val & 0x8000) << 16;
+  uint32_t exponent = (val >> 10) & 0x1f;
+  uint32_t mantissa = val & 0x3ff;
+  uint32_t bits;
+
+  if (exponent == 0x1f) {
+    bits = sign | 0x7f800000 | (mantissa << 13);
+  }
+  else if (exponent != 0) {
+    bits = sign | ((exponent + 112) << 23) | (mantissa << 13);
+  }
+  else if (mantissa != 0) {
+    exponent = 113;
+    while ((mantissa & 0x400) == 0) {
+      mantissa <<= 1;
+      --exponent;
+    }
+    bits = sign | (exponent << 23) | ((mantissa & 0x3ff) << 13);
+  }
+  else {
+    bits = sign;
+  }
+
+  float f;
+  memcpy(&f, &bits, sizeof(f));
+  return f;
+}
+
+template <typename T>
+static std::vector<NvDsInferParseObjectInfo>
+decodeTensorYoloCompact(const T* boxes, const T* scores, const int* classes, const uint& outputSize, const uint& netW,
+    const uint& netH, const std::vector<float>& preclusterThreshold)
+{
+  std::vector<NvDsInferParseObjectInfo> binfo;
+
+  for (uint b = 0; b < outputSize; ++b) {
+    float maxProb = toFloat(scores[b]);
+    int maxIndex = classes[b];
+
+    if (maxProb < preclusterThreshold[maxIndex]) {
+      continue;
+    }
+
+    float bx1 = toFloat(boxes[b * 4 + 0]);
+    float by1 = toFloat(boxes[b * 4 + 1]);
+    float bx2 = toFloat(boxes[b * 4 + 2]);
+    float by2 = toFloat(boxes[b * 4 + 3]);
+
+    addBBoxProposal(bx1, by1, bx2, by2, netW, netH, maxIndex, maxProb, binfo);
+  }
+
+  return binfo;
+}
+
 static bool
 NvDsInferParseCustomYolo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
     NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
@@ -119,6 +243,78 @@ NvDsInferParseCustomYolo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo
   return true;
 }
 
+static bool
+NvDsInferParseCustomYoloNMS(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  const NvDsInferLayerInfo* output = getLayerInfo(outputLayersInfo, "output");
+  const NvDsInferLayerInfo* numDetections = getLayerInfo(outputLayersInfo, "num_detections");
+
+  if (!output || !numDetections) {
+    std::cerr << "ERROR: Could not find output and num_detections layers in bbox parsing" << std::endl;
+    return false;
+  }
+
+  const uint maxDetections = output->inferDims.d[0];
+  const int numDets = *((const int*) (numDetections->buffer));
+  const uint outputSize = std::min((uint) std::max(numDets, 0), maxDetections);
+
+  objectList = decodeTensorYolo((const float*) (output->buffer), outputSize, networkInfo.width, networkInfo.height,
+      detectionParams.perClassPreclusterThreshold);
+
+  return true;
+}
+
+static bool
+NvDsInferParseCustomYoloTopK(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  if (outputLayersInfo.empty()) {
+    std::cerr << "ERROR: Could not find output layer in bbox parsing" << std::endl;
+    return false;
+  }
+
+  const NvDsInferLayerInfo& output = outputLayersInfo[0];
+  const uint outputSize = output.inferDims.d[0];
+
+  objectList = decodeTensorYoloSorted((const float*) (output.buffer), outputSize, networkInfo.width,
+      networkInfo.height, detectionParams.perClassPreclusterThreshold);
+
+  return true;
+}
+
+static bool
+NvDsInferParseCustomYoloCompact(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  const NvDsInferLayerInfo* boxes = getLayerInfo(outputLayersInfo, "boxes");
+  const NvDsInferLayerInfo* scores = getLayerInfo(outputLayersInfo, "scores");
+  const NvDsInferLayerInfo* classes = getLayerInfo(outputLayersInfo, "classes");
+
+  if (!boxes || !scores || !classes) {
+    std::cerr << "ERROR: Could not find boxes, scores and classes layers in bbox parsing" << std::endl;
+    return false;
+  }
+
+  const uint outputSize = scores->inferDims.d[0];
+
+  if (scores->dataType == HALF) {
+    objectList = decodeTensorYoloCompact((const uint16_t*) (boxes->buffer), (const uint16_t*) (scores->buffer),
+        (const int*) (classes->buffer), outputSize, networkInfo.width, networkInfo.height,
+        detectionParams.perClassPreclusterThreshold);
+  }
+  else {
+    objectList = decodeTensorYoloCompact((const float*) (boxes->buffer), (const float*) (scores->buffer),
+        (const int*) (classes->buffer), outputSize, networkInfo.width, networkInfo.height,
+        detectionParams.perClassPreclusterThreshold);
+  }
+
+  return true;
+}
+
 extern "C" bool
 NvDsInferParseYolo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
     NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList)
@@ -126,4 +322,29 @@ NvDsInferParseYolo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDs
   return NvDsInferParseCustomYolo(outputLayersInfo, networkInfo, detectionParams, objectList);
 }
 
+extern "C" bool
+NvDsInferParseYoloNMS(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
+    NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  return NvDsInferParseCustomYoloNMS(outputLayersInfo, networkInfo, detectionParams, objectList);
+}
+
+extern "C" bool
+NvDsInferParseYoloTopK(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
+    NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  return NvDsInferParseCustomYoloTopK(outputLayersInfo, networkInfo, detectionParams, objectList);
+}
+
+extern "C" bool
+NvDsInferParseYoloCompact(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  return NvDsInferParseCustomYoloCompact(outputLayersInfo, networkInfo, detectionParams, objectList);
+}
+
 CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYolo);
+CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYoloNMS);
+CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYoloTopK);
+CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYoloCompact);
@@ -23,6 +23,8 @@
  * https://www.github.com/marcoslucianops
  */
 
+#include <cstring>
+#include <cuda_fp16.h>
 #include <thrust/host_vector.h>
 #include <thrust/device_vector.h>
 
@@ -32,6 +34,21 @@ extern "C" bool
 NvDsInferParseYoloCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
     NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList);
 
+extern "C" bool
+NvDsInferParseYoloCompactCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList);
+
+__device__ inline float toFloat(const float val)
+{
+  return val;
+}
+
+__device__ inline float toFloat(const __half val)
+{
+  return __half2float(val);
+}
+
 __global__ void decodeTensorYoloCuda(NvDsInferParseObjectInfo *binfo, const float* output, const uint outputSize,
     const uint netW, const uint netH, const float* preclusterThreshold)
 {
@@ -67,6 +84,53 @@ __global__ void decodeTensorYoloCuda(NvDsInferParseObjectInfo *binfo, const floa
   binfo[x_id].classId = maxIndex;
 }
 
+template <typename T>
+__global__ void decodeTensorYoloCompactCuda(NvDsInferParseObjectInfo *binfo, const T* boxes, const T* scores,
+    const int* classes, const uint outputSize, const uint netW, const uint netH, const float* preclusterThreshold)
+{
+  int x_id = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (x_id >= outputSize) {
+    return;
+  }
+
+  float maxProb = toFloat(scores[x_id]);
+  int maxIndex = classes[x_id];
+
+  if (maxProb < preclusterThreshold[maxIndex]) {
+    binfo[x_id].detectionConfidence = 0.0;
+    return;
+  }
+
+  float bx1 = toFloat(boxes[x_id * 4 + 0]);
+  float by1 = toFloat(boxes[x_id * 4 + 1]);
+  float bx2 = toFloat(boxes[x_id * 4 + 2]);
+  float by2 = toFloat(boxes[x_id * 4 + 3]);
+
+  bx1 = fminf(float(netW), fmaxf(float(0.0), bx1));
+  by1 = fminf(float(netH), fmaxf(float(0.0), by1));
+  bx2 = fminf(float(netW), fmaxf(float(0.0), bx2));
+  by2 = fminf(float(netH), fmaxf(float(0.0), by2));
+
+  binfo[x_id].left = bx1;
+  binfo[x_id].top = by1;
+  binfo[x_id].width = fminf(float(netW), fmaxf(float(0.0), bx2 - bx1));
+  binfo[x_id].height = fminf(float(netH), fmaxf(float(0.0), by2 - by1));
+  binfo[x_id].detectionConfidence = maxProb;
+  binfo[x_id].classId = maxIndex;
+}
+
+static const NvDsInferLayerInfo*
+getLayerInfo(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, const char* layerName)
+{
+  for (const NvDsInferLayerInfo& layer : outputLayersInfo) {
+    if (layer.layerName && strcmp(layer.layerName, layerName) == 0) {
+      return &layer;
+    }
+  }
+  return nullptr;
+}
+
 static bool NvDsInferParseCustomYoloCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
     NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
     std::vector<NvDsInferParseObjectInfo>& objectList)
@@ -96,6 +160,47 @@ static bool NvDsInferParseCustomYoloCuda(std::vector<NvDsInferLayerInfo> const&
   return true;
 }
 
+static bool NvDsInferParseCustomYoloCompactCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  const NvDsInferLayerInfo* boxes = getLayerInfo(outputLayersInfo, "boxes");
+  const NvDsInferLayerInfo* scores = getLayerInfo(outputLayersInfo, "scores");
+  const NvDsInferLayerInfo* classes = getLayerInfo(outputLayersInfo, "classes");
+
+  if (!boxes || !scores || !classes) {
+    std::cerr << "ERROR: Could not find boxes, scores and classes layers in bbox parsing" << std::endl;
+    return false;
+  }
+
+  const uint outputSize = scores->inferDims.d[0];
+
+  thrust::device_vector<float> perClassPreclusterThreshold = detectionParams.perClassPreclusterThreshold;
+
+  thrust::device_vector<NvDsInferParseObjectInfo> objects(outputSize);
+
+  int threads_per_block = 1024;
+  int number_of_blocks = ((outputSize) / threads_per_block) + 1;
+
+  if (scores->dataType == HALF) {
+    decodeTensorYoloCompactCuda<<<number_of_blocks, threads_per_block>>>(
+        thrust::raw_pointer_cast(objects.data()), (__half*) (boxes->buffer), (__half*) (scores->buffer),
+        (int*) (classes->buffer), outputSize, networkInfo.width, networkInfo.height,
+        thrust::raw_pointer_cast(perClassPreclusterThreshold.data()));
+  }
+  else {
+    decodeTensorYoloCompactCuda<<<number_of_blocks, threads_per_block>>>(
+        thrust::raw_pointer_cast(objects.data()), (float*) (boxes->buffer), (float*) (scores->buffer),
+        (int*) (classes->buffer), outputSize, networkInfo.width, networkInfo.height,
+        thrust::raw_pointer_cast(perClassPreclusterThreshold.data()));
+  }
+
+  objectList.resize(outputSize);
+  thrust::copy(objects.begin(), objects.end(), objectList.begin());
+
+  return true;
+}
+
 extern "C" bool
 NvDsInferParseYoloCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo, NvDsInferNetworkInfo const& networkInfo,
     NvDsInferParseDetectionParams const& detectionParams, std::vector<NvDsInferParseObjectInfo>& objectList)
@@ -103,4 +208,13 @@ NvDsInferParseYoloCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
   return NvDsInferParseCustomYoloCuda(outputLayersInfo, networkInfo, detectionParams, objectList);
 }
 
+extern "C" bool
+NvDsInferParseYoloCompactCuda(std::vector<NvDsInferLayerInfo> const& outputLayersInfo,
+    NvDsInferNetworkInfo const& networkInfo, NvDsInferParseDetectionParams const& detectionParams,
+    std::vector<NvDsInferParseObjectInfo>& objectList)
+{
+  return NvDsInferParseCustomYoloCompactCuda(outputLayersInfo, networkInfo, detectionParams, objectList);
+}
+
 CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYoloCuda);
+CHECK_CUSTOM_PARSE_FUNC_PROTOTYPE(NvDsInferParseYoloCompactCuda);
@@ -26,6 +26,7 @@
 #include "utils.h"
 
 #include <iomanip>
+#include <sstream>
 #include <algorithm>
 #include <experimental/filesystem>
 
@@ -135,6 +136,108 @@ getNumChannels(nvinfer1::ITensor* t)
   return d.d[1];
 }
 
+static bool
+readVarint(std::istream& stream, uint64_t& value)
+{
+  value = 0;
+  for (int shift = 0; shift < 64; shift += 7) {
+    int byte = stream.get();
+    if (byte == std::istream::traits_type::eof()) {
+      return false;
+    }
+    value |= static_cast<uint64_t>(byte & 0x7f) << shift;
+    if (!(byte & 0x80)) {
+      return true;
+    }
+  }
+  return false;
+}
+
+static bool
+skipField(std::istream& stream, uint64_t tag)
+{
+  uint64_t value;
+  switch (tag & 7) {
+    case 0:
+      return readVarint(stream, value);
+    case 1:
+      return bool(stream.ignore(8));
+    case 2:
+      return readVarint(stream, value) && bool(stream.seekg(value, std::ios_base::cur));
+    case 5:
+      return bool(stream.ignore(4));
+    default:
+      return false;
+  }
+}
+
+static bool
+readString(std::istream& stream, std::string& value)
+{
+  uint64_t length;
+  if (!readVarint(stream, length)) {
+    return false;
+  }
+  value.resize(length);
+  return length == 0 || bool(stream.read(&value[0], length));
+}
+
+std::map<std::string, std::string>
+readOnnxMetadata(const std::string onnxFilePath)
+{
+  // Read the metadata_props (field 14) of the ONNX ModelProto without parsing the graph
+  std::map<std::string, std::string> metadata;
+  std::ifstream file(onnxFilePath, std::ios_base::binary);
+  uint64_t tag;
+  while (file.good() && readVarint(file, tag)) {
+    if (tag != (14 << 3 | 2)) {
+      if (!skipField(file, tag)) {
+        break;
+      }
+      continue;
+    }
+    std::string entry;
+    if (!readString(file, entry)) {
+      break;
+    }
+    std::istringstream entryStream(entry);
+    std::string key, value;
+    while (readVarint(entryStream, tag)) {
+      if (tag == (1 << 3 | 2)) {
+        readString(entryStream, key);
+      }
+      else if (tag == (2 << 3 | 2)) {
+        readString(entryStream, value);
+      }
+      else if (!skipField(entryStream, tag)) {
+        break;
+      }
+    }
+    metadata[key] = value;
+  }
+  return metadata;
+}
+
+bool
+parseDims(const std::string s, nvinfer1::Dims& d)
+{
+  std::stringstream ss(s);
+  std::string value;
+  d.nbDims = 0;
+  while (std::getline(ss, value, ',')) {
+    if (d.nbDims == nvinfer1::Dims::MAX_DIMS) {
+      return false;
+    }
+    try {
+      d.d[d.nbDims++] = std::stoi(trim(value));
+    }
+    catch (const std::exception&) {
+      return false;
+    }
+  }
+  return d.nbDims > 0;
+}
+
 void
 printLayerInfo(std::string layerIndex, std::string layerName, std::string layerInput, std::string layerOutput,
     std::string weightPtr)
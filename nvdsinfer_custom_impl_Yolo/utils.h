@@ -47,6 +47,10 @@ std::string dimsToString(const nvinfer1::Dims d);
 
 int getNumChannels(nvinfer1::ITensor* t);
 
+std::map<std::string, std::string> readOnnxMetadata(const std::string onnxFilePath);
+
+bool parseDims(const std::string s, nvinfer1::Dims& d);
+
 void printLayerInfo(
     std::string layerIndex, std::string layerName, std::string layerInput,  std::string layerOutput,
     std::string weightPtr);
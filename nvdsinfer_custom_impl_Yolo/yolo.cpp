@@ -23,6 +23,8 @@
  * https://www.github.com/marcoslucianops
  */
 
+#include <algorithm>
+
 #include "NvOnnxParser.h"
 
 #include "yolo.h"
@@ -40,7 +42,9 @@ Yolo::Yolo(const NetworkInfo& networkInfo) : m_InputBlobName(networkInfo.inputBl
     m_DeviceType(networkInfo.deviceType), m_NumDetectedClasses(networkInfo.numDetectedClasses),
     m_ClusterMode(networkInfo.clusterMode), m_NetworkMode(networkInfo.networkMode),
     m_ScaleFactor(networkInfo.scaleFactor), m_Offsets(networkInfo.offsets), m_WorkspaceSize(networkInfo.workspaceSize),
-    m_InputFormat(networkInfo.inputFormat), m_InputC(0), m_InputH(0), m_InputW(0), m_InputSize(0), m_NumClasses(0),
+    m_InputFormat(networkInfo.inputFormat), m_MaintainAspectRatio(networkInfo.maintainAspectRatio),
+    m_SymmetricPadding(networkInfo.symmetricPadding), m_InferInputH(networkInfo.inferInputH),
+    m_InferInputW(networkInfo.inferInputW), m_InputC(0), m_InputH(0), m_InputW(0), m_InputSize(0), m_NumClasses(0),
     m_LetterBox(0), m_NewCoords(0), m_YoloCount(0)
 {
 }
@@ -117,19 +121,44 @@ Yolo::createEngine(nvinfer1::IBuilder* builder)
     }
   }
 
-  if ((m_NetworkType == "darknet" && !m_ImplicitBatch) || network->getInput(0)->getDimensions().d[0] == -1) {
+  nvinfer1::Dims networkInputDims = network->getInput(0)->getDimensions();
+  bool dynamicSize = m_NetworkType == "onnx" && networkInputDims.nbDims == 4 &&
+      (networkInputDims.d[2] == -1 || networkInputDims.d[3] == -1);
+
+  if ((m_NetworkType == "darknet" && !m_ImplicitBatch) || networkInputDims.d[0] == -1 || dynamicSize) {
     nvinfer1::IOptimizationProfile* profile = builder->createOptimizationProfile();
     assert(profile);
     for (INT i = 0; i < network->getNbInputs(); ++i) {
       nvinfer1::ITensor* input = network->getInput(i);
       nvinfer1::Dims inputDims = input->getDimensions();
-      nvinfer1::Dims dims = inputDims;
-      dims.d[0] = 1;
-      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kMIN, dims);
-      dims.d[0] = m_BatchSize;
-      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kOPT, dims);
-      dims.d[0] = m_BatchSize;
-      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kMAX, dims);
+      nvinfer1::Dims minDims = inputDims;
+      nvinfer1::Dims optDims = inputDims;
+      nvinfer1::Dims maxDims = inputDims;
+      minDims.d[0] = 1;
+      optDims.d[0] = m_BatchSize;
+      maxDims.d[0] = m_BatchSize;
+      if (m_NetworkType == "onnx" && !getProfileDims(inputDims, minDims, optDims, maxDims)) {
+
+#if NV_TENSORRT_MAJOR >= 8
+        delete parser;
+        delete network;
+#else
+        parser->destroy();
+        config->destroy();
+        network->destroy();
+#endif
+
+        return nullptr;
+      }
+      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kMIN, minDims);
+      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kOPT, optDims);
+      profile->setDimensions(input->getName(), nvinfer1::OptProfileSelector::kMAX, maxDims);
+      if (i == 0 && dynamicSize) {
+        m_InputH = optDims.d[2];
+        m_InputW = optDims.d[3];
+        std::cout << "\nOptimization profile: min " << dimsToString(minDims) << ", opt " << dimsToString(optDims)
+            << ", max " << dimsToString(maxDims) << std::endl;
+      }
     }
     config->addOptimizationProfile(profile);
   }
@@ -161,26 +190,27 @@ Yolo::createEngine(nvinfer1::IBuilder* builder)
     if (m_Int8CalibPath != "") {
 
 #ifdef OPENCV
-      fileExists(m_Int8CalibPath);
+      bool calib_table_exists = fileExists(m_Int8CalibPath);
 
       std::string calib_image_list;
-      int calib_batch_size;
+      int calib_batch_size = 1;
       if (getenv("INT8_CALIB_IMG_PATH")) {
         calib_image_list = getenv("INT8_CALIB_IMG_PATH");
       }
-      else {
+      else if (!calib_table_exists) {
         std::cerr << "INT8_CALIB_IMG_PATH not set" << std::endl;
         assert(0);
       }
       if (getenv("INT8_CALIB_BATCH_SIZE")) {
         calib_batch_size = std::stoi(getenv("INT8_CALIB_BATCH_SIZE"));
       }
-      else {
+      else if (!calib_table_exists) {
         std::cerr << "INT8_CALIB_BATCH_SIZE not set" << std::endl;
         assert(0);
       }
       nvinfer1::IInt8EntropyCalibrator2* calibrator = new Int8EntropyCalibrator2(calib_batch_size, m_InputC, m_InputH,
-          m_InputW, m_ScaleFactor, m_Offsets, m_InputFormat, calib_image_list, m_Int8CalibPath);
+          m_InputW, m_ScaleFactor, m_Offsets, m_InputFormat, m_MaintainAspectRatio, m_SymmetricPadding,
+          calib_image_list, m_Int8CalibPath);
       config->setInt8Calibrator(calibrator);
 #else
       assert(0 && "OpenCV is required to run INT8 calibrator\n");
@@ -253,6 +283,55 @@ Yolo::createEngine(nvinfer1::IBuilder* builder)
   return engine;
 }
 
+bool
+Yolo::getProfileDims(const nvinfer1::Dims& inputDims, nvinfer1::Dims& minDims, nvinfer1::Dims& optDims,
+    nvinfer1::Dims& maxDims)
+{
+  std::map<std::string, std::string> metadata = readOnnxMetadata(m_OnnxFilePath);
+
+  nvinfer1::Dims profileMin, profileOpt, profileMax;
+  bool hasProfile = metadata.count("deepstream.profile-min") && metadata.count("deepstream.profile-opt") &&
+      metadata.count("deepstream.profile-max") && parseDims(metadata["deepstream.profile-min"], profileMin) &&
+      parseDims(metadata["deepstream.profile-opt"], profileOpt) &&
+      parseDims(metadata["deepstream.profile-max"], profileMax) && profileMin.nbDims == inputDims.nbDims &&
+      profileOpt.nbDims == inputDims.nbDims && profileMax.nbDims == inputDims.nbDims;
+
+  if (inputDims.d[0] == -1 && hasProfile) {
+    minDims.d[0] = std::min(profileMin.d[0], static_cast<INT>(m_BatchSize));
+    maxDims.d[0] = std::max(profileMax.d[0], static_cast<INT>(m_BatchSize));
+    if (static_cast<INT>(m_BatchSize) > profileMax.d[0]) {
+      std::cout << "NOTE: The batch-size (" << m_BatchSize << ") is larger than the maximum batch-size of the "
+          << "exported profile (" << profileMax.d[0] << ")\n" << std::endl;
+    }
+  }
+
+  for (INT i = 2; i < inputDims.nbDims && i < 4; ++i) {
+    if (inputDims.d[i] != -1) {
+      continue;
+    }
+    INT inferDim = i == 2 ? m_InferInputH : m_InferInputW;
+    if (hasProfile) {
+      minDims.d[i] = profileMin.d[i];
+      optDims.d[i] = inferDim > 0 ? inferDim : profileOpt.d[i];
+      maxDims.d[i] = profileMax.d[i];
+    }
+    else if (inferDim > 0) {
+      minDims.d[i] = optDims.d[i] = maxDims.d[i] = inferDim;
+    }
+    else {
+      std::cerr << "\nThe ONNX model has dynamic input size, set infer-dims on the config_infer file\n" << std::endl;
+      return false;
+    }
+    if (optDims.d[i] < minDims.d[i] || optDims.d[i] > maxDims.d[i]) {
+      std::cerr << "\nThe infer-dims is out of the exported size range: min " << dimsToString(minDims) << ", max "
+          << dimsToString(maxDims) << "\n" << std::endl;
+      return false;
+    }
+  }
+
+  return true;
+}
+
 NvDsInferStatus
 Yolo::parseModel(nvinfer1::INetworkDefinition& network) {
   destroyNetworkUtils();
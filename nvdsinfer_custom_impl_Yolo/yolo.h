@@ -75,6 +75,10 @@ struct NetworkInfo
   const float* offsets;
   uint workspaceSize;
   int inputFormat;
+  int maintainAspectRatio;
+  int symmetricPadding;
+  uint inferInputH;
+  uint inferInputW;
 };
 
 struct TensorInfo
@@ -126,6 +130,10 @@ class Yolo : public IModelParser {
     const float* m_Offsets;
     const uint m_WorkspaceSize;
     const int m_InputFormat;
+    const int m_MaintainAspectRatio;
+    const int m_SymmetricPadding;
+    const uint m_InferInputH;
+    const uint m_InferInputW;
 
     uint m_InputC;
     uint m_InputH;
@@ -147,6 +155,9 @@ class Yolo : public IModelParser {
 
     void parseConfigBlocks();
 
+    bool getProfileDims(const nvinfer1::Dims& inputDims, nvinfer1::Dims& minDims, nvinfer1::Dims& optDims,
+        nvinfer1::Dims& maxDims);
+
     void destroyNetworkUtils();
 };
 
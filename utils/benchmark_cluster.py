@@ -0,0 +1,124 @@
+import os
+import time
+
+import numpy as np
+
+from deepstream_yolo.cluster import CLUSTER_MODES, cluster_frames, nms_loop, wbf
+
+
+def random_candidates(batch, anchors, classes, net_w, net_h, objects=30, seed=0):
+    # Dense pre-NMS output: most anchors predict a jittered box of a nearby object, with the score decreasing with the
+    # jitter and some class confusion, and the other anchors low score background boxes
+    rng = np.random.default_rng(seed)
+    output = np.empty((batch, anchors, 6), dtype=np.float32)
+    for b in range(batch):
+        wh = rng.uniform(0.03, 0.4, (objects, 2)) * (net_w, net_h)
+        xy = rng.uniform(0, 1, (objects, 2)) * ((net_w, net_h) - wh) + wh / 2
+        confidence = rng.uniform(0.5, 0.95, objects)
+        labels = rng.integers(0, classes, objects)
+
+        obj = rng.integers(0, objects, anchors)
+        jitter = rng.normal(0, 0.15, (anchors, 4))
+        centers = xy[obj] + jitter[:, :2] * wh[obj]
+        sizes = wh[obj] * np.exp(jitter[:, 2:])
+        scores = confidence[obj] * np.exp(-4 * np.abs(jitter).sum(1))
+        confused = rng.random(anchors) < 0.1
+        anchor_labels = np.where(confused, rng.integers(0, classes, anchors), labels[obj])
+
+        background = rng.random(anchors) < 0.3
+        centers[background] = rng.uniform(0, 1, (background.sum(), 2)) * (net_w, net_h)
+        sizes[background] = (rng.exponential(0.05, (background.sum(), 2)) + 0.005) * (net_w, net_h)
+        scores[background] = rng.beta(0.3, 30.0, background.sum())
+
+        output[b] = np.concatenate([centers - sizes / 2, centers + sizes / 2, scores[:, None],
+                                    anchor_labels[:, None]], axis=1)
+    return output
+
+
+def timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return result, np.median(times) * 1000
+
+
+def check_outputs(result, reference):
+    if len(result) != len(reference):
+        return False
+    return all(r.shape == f.shape and r.tobytes() == f.tobytes() for r, f in zip(result, reference))
+
+
+def main(args):
+    net_h, net_w = args.size * 2 if len(args.size) == 1 else args.size
+    anchors = args.anchors or (net_w // 32) * (net_h // 32) * 21
+
+    if args.input:
+        output = np.load(args.input).astype(np.float32)
+        output = output[None] if output.ndim == 2 else output
+    else:
+        output = random_candidates(args.batch, anchors, args.classes, net_w, net_h, args.objects)
+
+    frames = [o[o[:, 4] >= args.threshold] for o in output]
+    options = {
+        'iou_threshold': args.nms_iou_thres, 'topk': args.topk, 'eps': args.eps, 'group_threshold': args.group_thres,
+        'min_boxes': args.min_boxes, 'min_score': args.min_score, 'class_agnostic': args.agnostic
+    }
+
+    print(f'Output: {list(output.shape)}, pre-cluster-threshold: {args.threshold}, candidates: '
+          f'{sum(len(f) for f in frames)}, {"class-agnostic" if args.agnostic else "per-class"}')
+
+    if 2 in args.cluster_modes:
+        result = cluster_frames(frames, 2, iou_threshold=args.nms_iou_thres, class_agnostic=args.agnostic)
+        reference, loop_time = timeit(lambda: [nms_loop(f, args.nms_iou_thres, args.agnostic) for f in frames], 1)
+        if not check_outputs(result, reference):
+            raise SystemExit('NumPy NMS output does not match the loop NMS output')
+        print(f'NMS loop reference: {loop_time:.3f} ms')
+
+    print(f'{"cluster-mode":>20} {"time (ms)":>10} {"per image (ms)":>15} {"objects":>8}')
+    for mode in args.cluster_modes:
+        result, mode_time = timeit(lambda: cluster_frames(frames, mode, **options), args.repeat)
+        name = f'{mode} ({CLUSTER_MODES[mode]})'
+        print(f'{name:>20} {mode_time:10.3f} {mode_time / len(frames):15.3f} {sum(len(r) for r in result):8d}')
+
+    if args.wbf:
+        result, wbf_time = timeit(lambda: [wbf(f, args.nms_iou_thres, args.agnostic) for f in frames], args.repeat)
+        print(f'{"wbf":>20} {wbf_time:10.3f} {wbf_time / len(frames):15.3f} {sum(len(r) for r in result):8d}')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo NumPy clustering benchmark')
+    parser.add_argument('-i', '--input', default='', help='Input output layer (.npy) file path (default: random)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Network size: H,W')
+    parser.add_argument('--batch', type=int, default=1, help='Batch size of the random output')
+    parser.add_argument('--anchors', type=int, default=0,
+                        help='Number of anchors of the random output (default from the size, 8400 for 640)')
+    parser.add_argument('--classes', type=int, default=80, help='Number of classes of the random output')
+    parser.add_argument('--objects', type=int, default=30, help='Number of objects of each random output image')
+    parser.add_argument('--threshold', type=float, default=0.001, help='Pre-cluster threshold (default 0.001)')
+    parser.add_argument('--cluster-modes', nargs='+', type=int, choices=list(CLUSTER_MODES),
+                        default=list(CLUSTER_MODES), help='cluster-modes to benchmark (default all)')
+    parser.add_argument('--nms-iou-thres', type=float, default=0.45, help='nms-iou-threshold (default 0.45)')
+    parser.add_argument('--topk', type=int, default=300, help='topk per class (default 300)')
+    parser.add_argument('--eps', type=float, default=None,
+                        help='eps of cluster-mode 0, 1 and 3 (default 0.2 for 0, 0.7 for 1 and 3)')
+    parser.add_argument('--group-thres', type=int, default=1, help='group-threshold of cluster-mode 0 (default 1)')
+    parser.add_argument('--min-boxes', type=int, default=3, help='minBoxes of cluster-mode 1 and 3 (default 3)')
+    parser.add_argument('--min-score', type=float, default=0.0,
+                        help='dbscan-min-score of cluster-mode 1 and 3 (default 0)')
+    parser.add_argument('--agnostic', action='store_true', help='Class-agnostic clustering')
+    parser.add_argument('--wbf', action='store_true', help='Also benchmark the weighted boxes fusion')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of runs of each cluster-mode')
+    args = parser.parse_args()
+    if args.input and not os.path.isfile(args.input):
+        raise SystemExit('Invalid input file')
+    if args.batch < 1 or args.anchors < 0 or args.objects < 1 or args.repeat < 1:
+        raise SystemExit('Invalid benchmark settings')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
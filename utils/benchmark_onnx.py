@@ -0,0 +1,146 @@
+import os
+import json
+import time
+
+import numpy as np
+
+from deepstream_yolo.batch import peak_rss_mb, reset_peak_rss
+from deepstream_yolo.runtime import create_session, input_shape, random_input
+
+
+def graph_stats(onnx_file):
+    import onnx
+
+    model = onnx.load(onnx_file)
+    ops = {}
+    for node in model.graph.node:
+        ops[node.op_type] = ops.get(node.op_type, 0) + 1
+    return {
+        'nodes': len(model.graph.node),
+        'parameters': int(sum(np.prod(i.dims) for i in model.graph.initializer)),
+        'ops': dict(sorted(ops.items(), key=lambda x: -x[1]))
+    }
+
+
+def run_benchmark(onnx_file, batch, threads, size, warmup, iterations):
+    result = {'model': onnx_file, 'batch': batch, 'threads': threads}
+    try:
+        reset_peak_rss()
+        t0 = time.perf_counter()
+        session = create_session(onnx_file, threads)
+        result['load_time_ms'] = (time.perf_counter() - t0) * 1000
+
+        shape = input_shape(session, batch, size)
+        x = random_input(session, shape)
+        feed = {session.get_inputs()[0].name: x}
+        result['input'] = shape
+
+        for _ in range(warmup):
+            session.run(None, feed)
+
+        latencies = []
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            t1 = time.perf_counter()
+            session.run(None, feed)
+            latencies.append((time.perf_counter() - t1) * 1000)
+        total = time.perf_counter() - t0
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        result.update({
+            'status': 'ok', 'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'mean_ms': float(np.mean(latencies)), 'images_per_sec': batch * iterations / total
+        })
+    except Exception as e:
+        result['status'] = f'error: {e}'
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def print_results(results):
+    print(f'{"batch":>5} {"threads":>7} {"p50 (ms)":>9} {"p95 (ms)":>9} {"p99 (ms)":>9} {"img/s":>8} '
+          f'{"peak RSS (MB)":>14}  model')
+    for r in results:
+        if r['status'] != 'ok':
+            print(f'{r["batch"]:5d} {r["threads"]:7d}  {r["status"]}  {r["model"]}')
+            continue
+        print(f'{r["batch"]:5d} {r["threads"]:7d} {r["p50_ms"]:9.2f} {r["p95_ms"]:9.2f} {r["p99_ms"]:9.2f} '
+              f'{r["images_per_sec"]:8.1f} {r["peak_rss_mb"]:14.0f}  {r["model"]}')
+
+
+def compare_baseline(report, baseline, tolerance):
+    regressions = []
+    for onnx_file, stats in report['models'].items():
+        base = baseline['models'].get(onnx_file)
+        if base and stats['nodes'] > base['nodes'] * (1 + tolerance):
+            regressions.append(f'{onnx_file}: {stats["nodes"]} nodes (baseline {base["nodes"]})')
+    base_results = {(r['model'], r['batch'], r['threads']): r for r in baseline['results'] if r['status'] == 'ok'}
+    for r in report['results']:
+        base = base_results.get((r['model'], r['batch'], r['threads']))
+        if base and r['status'] == 'ok' and r['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f'{r["model"]} (batch {r["batch"]}, threads {r["threads"]}): p50 {r["p50_ms"]:.2f} ms '
+                               f'(baseline {base["p50_ms"]:.2f} ms)')
+    return regressions
+
+
+def main(args):
+    import onnxruntime as ort
+
+    size = args.size * 2 if len(args.size) == 1 else args.size
+
+    report = {'onnxruntime': ort.__version__, 'cpu_count': os.cpu_count(), 'warmup': args.warmup,
+              'iterations': args.iterations, 'models': {}, 'results': []}
+
+    for onnx_file in args.model:
+        report['models'][onnx_file] = graph_stats(onnx_file)
+        print(f'Model: {onnx_file} ({report["models"][onnx_file]["nodes"]} nodes, '
+              f'{report["models"][onnx_file]["parameters"]} parameters)')
+        for batch in args.batch:
+            for threads in args.threads:
+                result = run_benchmark(onnx_file, batch, threads, size, args.warmup, args.iterations)
+                report['results'].append(result)
+
+    print_results(report['results'])
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'Report: {args.report}')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_baseline(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            raise SystemExit(f'{len(regressions)} regressions found against the baseline')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo ONNX Runtime CPU benchmark')
+    parser.add_argument('-m', '--model', nargs='+', required=True, help='Input ONNX model file paths')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[], help='Input size of dynamic models: H,W')
+    parser.add_argument('--batch', nargs='+', type=int, default=[1], help='Batch sizes')
+    parser.add_argument('--threads', nargs='+', type=int, default=[0], help='CPU threads (default: 0, all)')
+    parser.add_argument('--warmup', type=int, default=10, help='Warmup runs')
+    parser.add_argument('--iterations', type=int, default=100, help='Benchmark runs')
+    parser.add_argument('--report', default='', help='Output report (.json) file path')
+    parser.add_argument('--baseline', default='', help='Baseline report (.json) file path to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed regression against the baseline')
+    args = parser.parse_args()
+    if args.baseline and not os.path.isfile(args.baseline):
+        raise SystemExit('Invalid baseline file')
+    for onnx_file in args.model:
+        if not os.path.isfile(onnx_file):
+            raise SystemExit(f'Invalid model file: {onnx_file}')
+    if len(args.size) > 2:
+        raise SystemExit('Invalid size')
+    if min(args.batch) < 1 or min(args.threads) < 0 or args.warmup < 0 or args.iterations < 1:
+        raise SystemExit('Invalid benchmark settings')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
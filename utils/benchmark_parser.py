@@ -0,0 +1,81 @@
+import os
+import time
+
+import numpy as np
+
+from deepstream_yolo.parser import parse_yolo, parse_yolo_loop
+
+
+def random_output(batch, anchors, classes, net_w, net_h, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-0.1, 1.1, (batch, anchors, 2)) * (net_w, net_h)
+    wh = rng.exponential(0.05, (batch, anchors, 2)) * (net_w, net_h)
+    scores = rng.beta(0.3, 3.0, (batch, anchors, 1))
+    labels = rng.integers(0, classes, (batch, anchors, 1))
+    return np.concatenate([xy - wh / 2, xy + wh / 2, scores, labels], axis=-1).astype(np.float32)
+
+
+def timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return result, np.median(times) * 1000
+
+
+def check_outputs(result, reference):
+    if len(result) != len(reference):
+        return False
+    return all(r.shape == f.shape and r.tobytes() == f.tobytes() for r, f in zip(result, reference))
+
+
+def main(args):
+    net_h, net_w = args.size * 2 if len(args.size) == 1 else args.size
+
+    if args.input:
+        output = np.load(args.input).astype(np.float32)
+        output = output[None] if output.ndim == 2 else output
+    else:
+        output = random_output(args.batch, args.anchors, args.classes, net_w, net_h)
+
+    num_classes = int(output[..., 5].max()) + 1 if output.size else args.classes
+    thresholds = [args.threshold] * max(num_classes, args.classes)
+
+    print(f'Output: {list(output.shape)}, network: {net_w}x{net_h}, pre-cluster-threshold: {args.threshold}')
+
+    result, numpy_time = timeit(lambda: parse_yolo(output, net_w, net_h, thresholds), args.repeat)
+    reference, loop_time = timeit(lambda: parse_yolo_loop(output, net_w, net_h, thresholds), args.loop_repeat)
+
+    if not check_outputs(result, reference):
+        raise SystemExit('NumPy parser output does not match the loop parser output')
+
+    print(f'Objects: {sum(len(r) for r in result)}')
+    print(f'{"parser":>8} {"time (ms)":>10} {"per image (ms)":>15}')
+    print(f'{"numpy":>8} {numpy_time:10.3f} {numpy_time / len(output):15.3f}')
+    print(f'{"loop":>8} {loop_time:10.3f} {loop_time / len(output):15.3f}')
+    print(f'Speedup: {loop_time / numpy_time:.1f}x')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo NumPy bbox parser benchmark')
+    parser.add_argument('-i', '--input', default='', help='Input output layer (.npy) file path (default: random)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Network size: H,W')
+    parser.add_argument('--batch', type=int, default=1, help='Batch size of the random output')
+    parser.add_argument('--anchors', type=int, default=8400, help='Number of anchors of the random output')
+    parser.add_argument('--classes', type=int, default=80, help='Number of classes of the random output')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Pre-cluster threshold')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of runs of the NumPy parser')
+    parser.add_argument('--loop-repeat', type=int, default=1, help='Number of runs of the loop parser')
+    args = parser.parse_args()
+    if args.input and not os.path.isfile(args.input):
+        raise SystemExit('Invalid input file')
+    if args.batch < 1 or args.anchors < 1 or args.repeat < 1 or args.loop_repeat < 1:
+        raise SystemExit('Invalid benchmark settings')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
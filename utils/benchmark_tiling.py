@@ -0,0 +1,145 @@
+import os
+import json
+import time
+
+import numpy as np
+
+from deepstream_yolo.calibration import IMAGE_EXTENSIONS, list_images
+from deepstream_yolo.tiling import MERGE_FUNCTIONS, TiledDetector, tile_grid
+
+
+def load_frames(args):
+    import cv2
+
+    if not args.input:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, (args.frame_size[0], args.frame_size[1], 3), dtype=np.uint8)]
+    if os.path.isfile(args.input) and args.input.lower().endswith(IMAGE_EXTENSIONS):
+        images = [args.input]
+    else:
+        images = list_images(args.input, args.num)
+    frames = [img for img in (cv2.imread(image) for image in images) if img is not None]
+    if not frames:
+        raise SystemExit('No valid images')
+    return frames
+
+
+def detect_full_frame(detector, img):
+    # The full-frame detections go through the same merge as the tiled detections
+    dets = detector.detect_frame(img)
+    t0 = time.perf_counter()
+    dets = detector.merge(dets, detector.iou_threshold, detector.class_agnostic)
+    detector.times['merge'] += time.perf_counter() - t0
+    return dets, 0
+
+
+def run_mode(detector, frames, tiled, warmup, iterations):
+    run = detector if tiled else lambda img: detect_full_frame(detector, img)
+    for i in range(warmup):
+        run(frames[i % len(frames)])
+
+    detector.times = {k: 0.0 for k in detector.times}
+    num_tiles, num_detections = 0, 0
+    t0 = time.perf_counter()
+    for i in range(iterations):
+        dets, tiles = run(frames[i % len(frames)])
+        num_tiles += tiles
+        num_detections += len(dets)
+    total = time.perf_counter() - t0
+
+    return {
+        'mode': 'tiled' if tiled else 'full-frame',
+        'frames_per_sec': iterations / total,
+        'tiles_per_sec': num_tiles / total if tiled else iterations / total,
+        'ms_per_frame': total * 1000 / iterations,
+        'preprocess_ms': detector.times['preprocess'] * 1000 / iterations,
+        'inference_ms': detector.times['inference'] * 1000 / iterations,
+        'merge_ms': detector.times['merge'] * 1000 / iterations,
+        'detections_per_frame': num_detections / iterations
+    }
+
+
+def print_results(results):
+    print(f'{"mode":>10} {"frames/s":>9} {"tiles/s":>8} {"ms/frame":>9} {"pre (ms)":>9} {"infer (ms)":>10} '
+          f'{"merge (ms)":>10} {"dets/frame":>10}')
+    for r in results:
+        print(f'{r["mode"]:>10} {r["frames_per_sec"]:9.2f} {r["tiles_per_sec"]:8.1f} {r["ms_per_frame"]:9.1f} '
+              f'{r["preprocess_ms"]:9.1f} {r["inference_ms"]:10.1f} {r["merge_ms"]:10.2f} '
+              f'{r["detections_per_frame"]:10.1f}')
+
+
+def main(args):
+    frames = load_frames(args)
+
+    detector = TiledDetector(
+        args.model, args.size, args.batch, args.overlap, args.merge, args.iou_thres, args.score_thres,
+        args.full_frame, args.agnostic, args.threads
+    )
+
+    image_h, image_w = frames[0].shape[:2]
+    grid = tile_grid(image_h, image_w, detector.tile_h, detector.tile_w, args.overlap)
+    print(f'\nModel: {args.model} (tile {detector.tile_w}x{detector.tile_h}, batch {detector.batch})')
+    print(f'Frames: {len(frames)} ({image_w}x{image_h}), {len(grid)} tiles per frame, overlap {args.overlap}, '
+          f'merge {args.merge}\n')
+
+    results = [
+        run_mode(detector, frames, False, args.warmup, args.iterations),
+        run_mode(detector, frames, True, args.warmup, args.iterations)
+    ]
+    print_results(results)
+
+    full, tiled = results
+    print(f'\nTiled / full-frame: {tiled["ms_per_frame"] / full["ms_per_frame"]:.1f}x time per frame, '
+          f'{tiled["tiles_per_sec"] / full["tiles_per_sec"]:.2f}x images/s')
+
+    if args.output:
+        report = {
+            'model': args.model, 'frame': [image_h, image_w], 'tile': [detector.tile_h, detector.tile_w],
+            'tiles': len(grid), 'overlap': args.overlap, 'merge': args.merge, 'batch': detector.batch,
+            'results': results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved: {args.output}')
+
+    print('Done\n')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo tiled inference benchmark')
+    parser.add_argument('-m', '--model', required=True, help='Input exported ONNX model file path (required)')
+    parser.add_argument('-i', '--input', default='', help='Input image, images folder or list (default: random frame)')
+    parser.add_argument('--num', type=int, default=0, help='Number of images of the folder or list (default all)')
+    parser.add_argument('--frame-size', nargs=2, type=int, default=[2160, 3840],
+                        help='Random frame size: H W (default 2160 3840)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[],
+                        help='Tile size [H,W] of dynamic size models (default model input size)')
+    parser.add_argument('--batch', type=int, default=4, help='Tiles per batch of dynamic batch models (default 4)')
+    parser.add_argument('--overlap', type=float, default=0.2, help='Tile overlap ratio (default 0.2)')
+    parser.add_argument('--merge', choices=list(MERGE_FUNCTIONS), default='nms', help='Merge method (default nms)')
+    parser.add_argument('--iou-thres', type=float, default=0.5, help='Merge IoU threshold (default 0.5)')
+    parser.add_argument('--score-thres', type=float, default=0.25, help='Score threshold (default 0.25)')
+    parser.add_argument('--full-frame', action='store_true', help='Add the full-frame detections to the tiled merge')
+    parser.add_argument('--agnostic', action='store_true', help='Class-agnostic merge')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime intra-op threads (default auto)')
+    parser.add_argument('--warmup', type=int, default=2, help='Warmup frames (default 2)')
+    parser.add_argument('--iterations', type=int, default=10, help='Benchmark frames (default 10)')
+    parser.add_argument('-o', '--output', default='', help='Output report (.json) file path')
+    args = parser.parse_args()
+    if not os.path.isfile(args.model):
+        raise SystemExit('Invalid model file')
+    if args.input and not os.path.exists(args.input):
+        raise SystemExit('Invalid input')
+    if args.size:
+        args.size = args.size * 2 if len(args.size) == 1 else args.size
+    if not 0 <= args.overlap < 1:
+        raise SystemExit('Invalid overlap')
+    if args.batch < 1 or args.iterations < 1 or args.warmup < 0:
+        raise SystemExit('Invalid benchmark settings')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
@@ -0,0 +1,55 @@
+import os
+import time
+
+from deepstream_yolo.calibration import build_tensor, list_images
+from deepstream_yolo.preprocess import INPUT_FORMATS
+
+
+def main(args):
+    images = list_images(args.images, args.num, args.seed)
+    if not images:
+        raise SystemExit('No images found')
+
+    height, width = args.size * 2 if len(args.size) == 1 else args.size
+
+    print(f'Building calibration tensor: {len(images)} images, {height}x{width}, {args.format}, {args.dtype}')
+    t0 = time.time()
+    index_file, data_file, meta = build_tensor(
+        images, args.output, height, width, input_format=INPUT_FORMATS[args.format], dtype=args.dtype,
+        scale_factor=args.scale_factor, offsets=args.offsets, maintain_aspect_ratio=args.maintain_aspect_ratio,
+        symmetric_padding=args.symmetric_padding, workers=args.workers
+    )
+    size = os.path.getsize(data_file) / 2 ** 20
+    print(f'Done: {index_file} ({meta["count"]} images, {size:.0f} MB, {time.time() - t0:.1f}s)')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo INT8 calibration tensor builder')
+    parser.add_argument('-i', '--images', required=True, help='Input images folder or list (.txt) file path')
+    parser.add_argument('-o', '--output', default='calibration', help='Output file path prefix (.bin and .idx files)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Model input size [H,W] (default 640)')
+    parser.add_argument('-n', '--num', type=int, default=1000, help='Number of random images (default 1000, 0 for all)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the images selection')
+    parser.add_argument('--format', choices=list(INPUT_FORMATS), default='rgb', help='Model input format (default rgb)')
+    parser.add_argument('--dtype', choices=['uint8', 'float32'], default='uint8',
+                        help='Tensor data type (default uint8, scaled while calibrating)')
+    parser.add_argument('--scale-factor', type=float, default=0.0039215697906911373,
+                        help='net-scale-factor of the config_infer file (float32 tensor)')
+    parser.add_argument('--offsets', nargs='+', type=float, default=[], help='offsets of the config_infer file')
+    parser.add_argument('--maintain-aspect-ratio', type=int, choices=[0, 1], default=1,
+                        help='maintain-aspect-ratio of the config_infer file (default 1)')
+    parser.add_argument('--symmetric-padding', type=int, choices=[0, 1], default=1,
+                        help='symmetric-padding of the config_infer file (default 1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default CPU count)')
+    args = parser.parse_args()
+    if not os.path.exists(args.images):
+        raise SystemExit('Invalid images folder or file')
+    if len(args.size) > 2 or args.workers < 1 or args.num < 0:
+        raise SystemExit('Invalid size, number of images or workers')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
@@ -0,0 +1,102 @@
+import os
+import time
+
+from deepstream_yolo.engines import (
+    read_config, set_config_value, model_files, calib_file, default_engine_file, gpu_arch, trt_version, engine_key,
+    load_json, save_json, prune_hashes, entry_engine, touch_entry, store_engine, evict_entries
+)
+
+
+def config_engine_path(config_file, engine_file):
+    config_dir = os.path.dirname(os.path.abspath(config_file))
+    path = os.path.relpath(os.path.abspath(engine_file), config_dir)
+    return os.path.abspath(engine_file) if path.startswith('..') else path
+
+
+def import_engine(args, key, inputs, engine_file, sources):
+    if not os.path.isfile(engine_file):
+        raise SystemExit(f'Invalid engine file: {engine_file}')
+    if os.path.getmtime(engine_file) < max(os.path.getmtime(path) for path in sources):
+        raise SystemExit(f'Engine file is older than the model files: {engine_file}')
+    meta = {'config': os.path.abspath(args.config), 'engine': os.path.abspath(engine_file), 'created': time.time(),
+            'inputs': inputs}
+    store_engine(args.cache, key, engine_file, meta)
+    print(f'Stored: {engine_file} ({key[:12]})')
+
+
+def main(args):
+    properties = read_config(args.config)
+    arch = args.arch or gpu_arch(properties.get('gpu-id', 0))
+    trt = args.trt_version or trt_version()
+    if not arch or not trt:
+        raise SystemExit('Cannot detect the GPU arch or the TensorRT version, set --arch and --trt-version')
+
+    hashes = load_json(args.cache, 'hashes.json')
+    key, inputs = engine_key(args.config, properties, arch, trt, hashes)
+    save_json(args.cache, 'hashes.json', prune_hashes(hashes))
+
+    sources = model_files(args.config, properties)
+    calib = calib_file(args.config, properties)
+    if calib:
+        sources.append(calib)
+
+    print(f'\nEngine key: {key[:12]} (network-mode {inputs["network-mode"]}, batch-size {inputs["batch-size"]}, '
+          f'{arch}, TensorRT {trt})')
+    if inputs['profile']:
+        print(f'Optimization profile: min {inputs["profile"]["min"]}, opt {inputs["profile"]["opt"]}, max '
+              f'{inputs["profile"]["max"]}')
+
+    pending = load_json(args.cache, 'pending.json')
+    engine_file = entry_engine(args.cache, key)
+
+    if args.store:
+        import_engine(args, key, inputs, args.store, sources)
+    elif not os.path.isfile(engine_file) and key in pending:
+        built_file = pending[key]['engine']
+        if os.path.isfile(built_file) and os.path.getmtime(built_file) > pending[key]['time']:
+            import_engine(args, key, inputs, built_file, sources)
+
+    if os.path.isfile(engine_file):
+        print(f'Cached: {engine_file}')
+        touch_entry(args.cache, key)
+        pending.pop(key, None)
+    else:
+        built_file = default_engine_file(args.config, properties)
+        print(f'Not cached: DeepStream will build the engine to {built_file}, run this file again after the build to '
+              'store it')
+        pending[key] = {'engine': built_file, 'time': time.time()}
+    save_json(args.cache, 'pending.json', pending)
+
+    value = config_engine_path(args.config, engine_file)
+    if properties.get('model-engine-file') != value:
+        set_config_value(args.config, 'model-engine-file', value)
+        print(f'Updated: {args.config} (model-engine-file={value})')
+
+    evicted = evict_entries(args.cache, int(args.max_size * (1 << 30)), args.max_entries, keep=(key,))
+    for evicted_key in evicted:
+        print(f'Evicted: {evicted_key[:12]}')
+
+    print('Done\n')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo TensorRT engine cache')
+    parser.add_argument('-c', '--config', required=True, help='Input config_infer file path (required)')
+    parser.add_argument('--cache', default='engines', help='Engine cache folder path (default engines)')
+    parser.add_argument('--store', default='', help='Store a built engine file in the cache')
+    parser.add_argument('--arch', default='', help='GPU arch of the key (default detected with nvidia-smi)')
+    parser.add_argument('--trt-version', default='', help='TensorRT version of the key (default detected)')
+    parser.add_argument('--max-size', type=float, default=0, help='Maximum cache size in GB (default unlimited)')
+    parser.add_argument('--max-entries', type=int, default=0, help='Maximum cached engines (default unlimited)')
+    args = parser.parse_args()
+    if not os.path.isfile(args.config):
+        raise SystemExit('Invalid config file')
+    if args.max_size < 0 or args.max_entries < 0:
+        raise SystemExit('Invalid max-size or max-entries')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
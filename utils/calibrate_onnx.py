@@ -0,0 +1,77 @@
+import os
+import time
+
+from deepstream_yolo.calibration import calibration_batches
+from deepstream_yolo.entropy import (
+    add_tensor_outputs, collect_amax, collect_histograms, compute_scales, write_calibration_cache
+)
+from deepstream_yolo.preprocess import INPUT_FORMATS
+from deepstream_yolo.runtime import create_session, input_shape
+
+
+def main(args):
+    import onnx
+
+    model_onnx, names = add_tensor_outputs(onnx.load(args.model), tail=args.tail)
+    session = create_session(model_onnx.SerializeToString(), args.threads)
+    shape = input_shape(session, args.batch)
+
+    batches, num_images = calibration_batches(
+        args.images, shape, num=args.num, seed=args.seed, scale_factor=args.scale_factor, offsets=args.offsets,
+        input_format=INPUT_FORMATS[args.format], maintain_aspect_ratio=args.maintain_aspect_ratio,
+        symmetric_padding=args.symmetric_padding
+    )
+
+    if num_images < shape[0]:
+        raise SystemExit('Not enough calibration images')
+
+    print(f'Calibrating {len(names)} tensors: {num_images} images, batch-size {shape[0]}')
+    t0 = time.time()
+    amax = collect_amax(session, batches, names)
+    hists = collect_histograms(session, batches, names, amax, args.bins)
+
+    print('Computing entropy calibration scales')
+    scales = compute_scales(hists, amax, workers=args.workers, stride=args.stride)
+    write_calibration_cache(args.output, scales, args.trt_version)
+
+    print(f'Done: {args.output} ({len(scales)} tensors, {time.time() - t0:.1f}s)')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo CPU INT8 calibration table generator')
+    parser.add_argument('-m', '--model', required=True, help='Input ONNX model file path')
+    parser.add_argument('-i', '--images', required=True,
+                        help='Input calibration tensor (.idx) file, images folder or list (.txt) file path')
+    parser.add_argument('-o', '--output', default='calib.table', help='Output calibration table file path')
+    parser.add_argument('-n', '--num', type=int, default=1000, help='Number of random images (default 1000, 0 for all)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the images selection')
+    parser.add_argument('--batch', type=int, default=1, help='Batch-size of dynamic models (default 1)')
+    parser.add_argument('--trt-version', type=int, default=100300,
+                        help='TensorRT version of the table header (default 100300, TensorRT 10.3.0)')
+    parser.add_argument('--format', choices=list(INPUT_FORMATS), default='rgb', help='Model input format (default rgb)')
+    parser.add_argument('--scale-factor', type=float, default=0.0039215697906911373,
+                        help='net-scale-factor of the config_infer file')
+    parser.add_argument('--offsets', nargs='+', type=float, default=[], help='offsets of the config_infer file')
+    parser.add_argument('--maintain-aspect-ratio', type=int, choices=[0, 1], default=1,
+                        help='maintain-aspect-ratio of the config_infer file (default 1)')
+    parser.add_argument('--symmetric-padding', type=int, choices=[0, 1], default=1,
+                        help='symmetric-padding of the config_infer file (default 1)')
+    parser.add_argument('--tail', action='store_true', help='Calibrate the post-processing nodes too')
+    parser.add_argument('--bins', type=int, default=2048, help='Histogram bins (default 2048)')
+    parser.add_argument('--stride', type=int, default=1, help='Entropy threshold search stride (default 1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default CPU count)')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime CPU threads (default all)')
+    args = parser.parse_args()
+    if not os.path.isfile(args.model):
+        raise SystemExit('Invalid model file')
+    if not os.path.exists(args.images):
+        raise SystemExit('Invalid calibration images')
+    if args.batch < 1 or args.bins < 128 or args.stride < 1 or args.workers < 1:
+        raise SystemExit('Invalid batch-size, bins, stride or workers')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
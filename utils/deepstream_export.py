@@ -0,0 +1,76 @@
+import os
+import json
+import time
+
+from deepstream_yolo.registry import FAMILIES, export_family
+
+
+def print_summary(results):
+    print('Summary')
+    print(f'{"status":>8} {"time (s)":>9} {"peak RSS (MB)":>14}  weights')
+    for result in results:
+        status = 'ok' if result['status'] == 'ok' else 'error'
+        print(f'{status:>8} {result["time"]:9.1f} {result.get("peak_rss_mb", 0.0):14.0f}  {result["weights"]}')
+    for result in results:
+        if result['status'] != 'ok':
+            print(f'{result["weights"]}: {result["status"]}')
+
+
+def main(args, extra):
+    if args.manifest:
+        from deepstream_yolo.batch import load_manifest, run_jobs
+        jobs = load_manifest(args.manifest)
+        for job in jobs:
+            job.setdefault('labels', f'{job["weights"]}.labels.txt')
+            job['args'] = [*job.get('args', []), *extra]
+        results = run_jobs(jobs, workers=args.workers, threads=args.threads)
+    else:
+        jobs = [(args.family, weights) for weights in args.weights]
+        results = []
+        for family, weights in jobs:
+            labels = f'{weights}.labels.txt' if len(jobs) > 1 else None
+            t0 = time.time()
+            onnx_output_file = export_family(family, ['-w', weights, *extra], labels=labels)
+            results.append({'family': family, 'weights': weights, 'onnx': onnx_output_file, 'status': 'ok',
+                            'time': time.time() - t0})
+
+    print_summary(results)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'Report: {args.report}')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='DeepStream multi-model conversion', epilog='Other arguments are passed to the family exporter'
+    )
+    parser.add_argument('-f', '--family', choices=list(FAMILIES), help='Model family')
+    parser.add_argument('-w', '--weights', nargs='+', default=[], help='Input weights file paths')
+    parser.add_argument('-m', '--manifest', default='', help='Input manifest (.json) file path with the export jobs')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Maximum worker processes, one per model family (manifest mode)')
+    parser.add_argument('--threads', type=int, default=0, help='CPU threads per worker (manifest mode, default all)')
+    parser.add_argument('--report', default='', help='Output report (.json) file path')
+    args, extra = parser.parse_known_args()
+    if args.manifest:
+        if not os.path.isfile(args.manifest):
+            raise SystemExit('Invalid manifest file')
+        if args.family or args.weights:
+            raise SystemExit('Cannot set manifest and family/weights at same time')
+        if args.workers < 1:
+            raise SystemExit('Invalid number of workers')
+    else:
+        if not args.family or not args.weights:
+            raise SystemExit('Set the family and weights or a manifest file')
+        for weights in args.weights:
+            if not os.path.isfile(weights):
+                raise SystemExit(f'Invalid weights file: {weights}')
+    return args, extra
+
+
+if __name__ == '__main__':
+    args, extra = parse_args()
+    main(args, extra)
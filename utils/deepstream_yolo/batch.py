@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import resource
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from deepstream_yolo.registry import FAMILIES, export_family
+
+
+def load_manifest(manifest_file):
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    if isinstance(jobs, dict):
+        jobs = jobs.get('jobs', [])
+    for i, job in enumerate(jobs):
+        if 'weights' not in job or 'family' not in job:
+            raise SystemExit(f'Invalid manifest job {i}: weights and family are required')
+        if job['family'] not in FAMILIES:
+            raise SystemExit(f'Invalid manifest job {i}: unknown family {job["family"]}')
+    return jobs
+
+
+def job_argv(job):
+    argv = ['-w', job['weights']]
+    if 'size' in job:
+        size = job['size'] if isinstance(job['size'], (list, tuple)) else [job['size']]
+        argv += ['-s', *[str(s) for s in size]]
+    if 'batch' in job:
+        argv += ['--batch', str(job['batch'])]
+    if 'opset' in job:
+        argv += ['--opset', str(job['opset'])]
+    if job.get('dynamic'):
+        argv += ['--dynamic']
+    if job.get('simplify'):
+        argv += ['--simplify']
+    return argv + [str(a) for a in job.get('args', [])]
+
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def init_worker(threads):
+    if threads > 0:
+        for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            os.environ[name] = str(threads)
+
+
+def run_job(job):
+    reset_peak_rss()
+    t0 = time.time()
+    result = {'family': job['family'], 'weights': job['weights'], 'pid': os.getpid()}
+    try:
+        result['onnx'] = export_family(job['family'], job_argv(job), labels=job.get('labels'))
+        result['status'] = 'ok'
+    except (Exception, SystemExit) as e:
+        result['status'] = f'error: {e}'
+    result['time'] = time.time() - t0
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_family(family_jobs, threads=0):
+    # One long-lived worker process per family, the framework is imported once for all the jobs of the family
+    results = []
+    with ProcessPoolExecutor(max_workers=1, initializer=init_worker, initargs=(threads,)) as executor:
+        for job in family_jobs:
+            try:
+                result = executor.submit(run_job, job).result()
+            except Exception as e:
+                result = {'family': job['family'], 'weights': job['weights'], 'status': f'error: {e}', 'time': 0.0,
+                          'peak_rss_mb': 0.0}
+            print(f'Finished: {job["weights"]} ({result["status"]}, {result["time"]:.1f}s, '
+                  f'{result["peak_rss_mb"]:.0f} MB)')
+            results.append(result)
+    return results
+
+
+def run_jobs(jobs, workers=1, threads=0):
+    # At most workers families (worker processes) run at the same time
+    families = {}
+    for job in jobs:
+        families.setdefault(job['family'], []).append(job)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(families)) or 1) as pool:
+        family_results = list(pool.map(lambda family_jobs: run_family(family_jobs, threads), families.values()))
+
+    done = {id(job): result for family_jobs, results in zip(families.values(), family_results)
+            for job, result in zip(family_jobs, results)}
+    return [done[id(job)] for job in jobs]
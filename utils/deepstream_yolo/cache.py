@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import functools
+import tempfile
+
+CACHE_VERSION = 1
+
+IGNORED_ARGS = ('weights', 'labels', 'cache', 'profile')
+
+# Images folder, list or calibration tensor args
+IMAGE_ARGS = ('qdq', 'parity')
+
+
+def hash_file(path, h=None, chunk_size=1 << 20):
+    h = h or hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h
+
+
+def exporter_files(main):
+    files = [os.path.abspath(sys.modules[main.__module__].__file__)]
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            files.append(os.path.join(package_dir, name))
+    return files
+
+
+def hash_images(source, h):
+    # Name, size and mtime of each listed image (and of the data file of a calibration tensor)
+    from deepstream_yolo.calibration import list_images, read_index
+
+    if source.endswith('.idx'):
+        files = [source, read_index(source)['data']]
+    else:
+        files = list_images(source)
+    for path in files:
+        stat = os.stat(path) if os.path.isfile(path) else None
+        h.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode() if stat else f'{path}:missing\n'.encode())
+
+
+def export_key(main, args):
+    h = hashlib.sha256()
+    h.update(f'version:{CACHE_VERSION}\n'.encode())
+
+    for path in exporter_files(main):
+        h.update(f'code:{os.path.basename(path)}\n'.encode())
+        hash_file(path, h)
+
+    h.update(b'weights\n')
+    hash_file(args.weights, h)
+
+    options = {k: v for k, v in sorted(vars(args).items()) if k not in IGNORED_ARGS}
+    for k, v in options.items():
+        if k in IMAGE_ARGS and v and os.path.exists(v):
+            h.update(f'images:{k}\n'.encode())
+            hash_images(v, h)
+        if isinstance(v, str) and os.path.isfile(v):
+            h.update(f'file:{k}\n'.encode())
+            hash_file(v, h)
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+
+    return h.hexdigest()
+
+
+def graph_shape(onnx_file):
+    # Export shape of the graph input: the dynamic axes from the optimal profile (NCHW), in the NHWC order of the
+    # models with network-input-order=1
+    import onnx
+    from deepstream_yolo.metadata import model_metadata
+
+    model = onnx.load(onnx_file, load_external_data=False)
+    shape = [d.dim_value if d.HasField('dim_value') else -1 for d in model.graph.input[0].type.tensor_type.shape.dim]
+    metadata = model_metadata(model)
+    if -1 in shape and 'profile-opt' in metadata:
+        opt = [int(d) for d in metadata['profile-opt'].split(',')]
+        if int(metadata.get('network-input-order', 0)) == 1:
+            opt = [opt[0], opt[2], opt[3], opt[1]]
+        shape = [o if d == -1 else d for d, o in zip(shape, opt)]
+    return shape if -1 not in shape else None
+
+
+def load_meta(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached(entry_dir, onnx_output_file, labels_file):
+    shutil.copyfile(os.path.join(entry_dir, 'model.onnx'), onnx_output_file)
+    cached_labels = os.path.join(entry_dir, 'labels.txt')
+    if labels_file and os.path.isfile(cached_labels):
+        shutil.copyfile(cached_labels, labels_file)
+
+
+def store_cached(cache_dir, key, onnx_output_file, labels_file, meta):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{key}.', dir=cache_dir)
+    try:
+        shutil.copyfile(onnx_output_file, os.path.join(tmp_dir, 'model.onnx'))
+        if labels_file:
+            shutil.copyfile(labels_file, os.path.join(tmp_dir, 'labels.txt'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.rename(tmp_dir, os.path.join(cache_dir, key))
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def cached_export(main):
+    @functools.wraps(main)
+    def wrapper(args):
+        cache_dir = getattr(args, 'cache', '')
+        if not cache_dir:
+            return main(args)
+
+        key = export_key(main, args)
+        entry_dir = os.path.join(cache_dir, key)
+        onnx_output_file = f'{args.weights}.onnx'
+        labels_file = getattr(args, 'labels', None)
+
+        if os.path.isfile(os.path.join(entry_dir, 'model.onnx')):
+            print(f'\nCached: {args.weights} ({key[:12]})')
+            load_cached(entry_dir, onnx_output_file, labels_file)
+            if getattr(args, 'profile', ''):
+                from deepstream_yolo.profiler import export_profile
+                shape = load_meta(entry_dir).get('graph_shape') or graph_shape(onnx_output_file)
+                export_profile(onnx_output_file, args.profile, tuple(shape) if shape else None)
+            print(f'Done: {onnx_output_file}\n')
+            return onnx_output_file
+
+        labels_mtime = os.path.getmtime(labels_file) if labels_file and os.path.isfile(labels_file) else None
+
+        onnx_output_file = main(args)
+
+        if not labels_file or not os.path.isfile(labels_file) or os.path.getmtime(labels_file) == labels_mtime:
+            labels_file = None
+        meta = {'weights': args.weights, 'args': vars(args), 'graph_shape': graph_shape(onnx_output_file)}
+        store_cached(cache_dir, key, onnx_output_file, labels_file, meta)
+
+        return onnx_output_file
+
+    return wrapper
@@ -0,0 +1,186 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from deepstream_yolo.preprocess import Preprocessor, normalize_image
+
+INDEX_HEADER = '# DeepStream-Yolo calibration tensor'
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+worker_state = {}
+
+
+def list_images(source, num=0, seed=0):
+    if os.path.isdir(source):
+        images = sorted(
+            os.path.join(source, name) for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            images = [line.strip() for line in f if line.strip()]
+    if 0 < num < len(images):
+        images = sorted(random.Random(seed).sample(images, num))
+    return [os.path.abspath(image) for image in images]
+
+
+def tensor_shape(count, channels, height, width, dtype):
+    return (count, height, width, channels) if dtype == 'uint8' else (count, channels, height, width)
+
+
+def write_index(index_file, data_file, meta, images):
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(f'{INDEX_HEADER}\n')
+        f.write(f'version {INDEX_VERSION}\n')
+        f.write(f'data {os.path.relpath(data_file, os.path.dirname(os.path.abspath(index_file)))}\n')
+        f.write(f'dtype {meta["dtype"]}\n')
+        f.write(f'layout {"NHWC" if meta["dtype"] == "uint8" else "NCHW"}\n')
+        for key in ('count', 'channels', 'height', 'width', 'input-format', 'maintain-aspect-ratio',
+                    'symmetric-padding', 'scale-factor'):
+            f.write(f'{key} {meta[key]}\n')
+        f.write(f'offsets {" ".join(str(o) for o in meta["offsets"])}\n')
+        for image in images:
+            f.write(f'image {image}\n')
+
+
+def read_index(index_file):
+    meta = {'offsets': [], 'images': []}
+    with open(index_file, 'r', encoding='utf-8') as f:
+        if f.readline().strip() != INDEX_HEADER:
+            raise ValueError(f'Invalid calibration index file {index_file}')
+        for line in f:
+            key, _, value = line.rstrip('\n').partition(' ')
+            if key == 'image':
+                meta['images'].append(value)
+            elif key == 'offsets':
+                meta['offsets'] = [float(o) for o in value.split()]
+            elif key in ('version', 'count', 'channels', 'height', 'width', 'input-format', 'maintain-aspect-ratio',
+                         'symmetric-padding'):
+                meta[key] = int(value)
+            elif key == 'scale-factor':
+                meta[key] = float(value)
+            elif key:
+                meta[key] = value
+    meta['data'] = os.path.join(os.path.dirname(os.path.abspath(index_file)), meta['data'])
+    return meta
+
+
+def load_tensor(index_file):
+    meta = read_index(index_file)
+    shape = tensor_shape(meta['count'], meta['channels'], meta['height'], meta['width'], meta['dtype'])
+    return np.memmap(meta['data'], dtype=meta['dtype'], mode='r', shape=shape), meta
+
+
+def iter_batches(index_file, batch_size=1):
+    tensor, meta = load_tensor(index_file)
+    for i in range(0, len(tensor) - batch_size + 1, batch_size):
+        batch = tensor[i:i + batch_size]
+        if meta['dtype'] == 'uint8':
+            batch = np.stack([
+                normalize_image(img, meta['scale-factor'], meta['offsets'], meta['input-format']) for img in batch
+            ])
+        yield np.ascontiguousarray(batch, dtype=np.float32)
+
+
+def image_batches(images, batch_size, height, width, **options):
+    import cv2
+
+    preprocessor = Preprocessor(height, width, batch_size, **options)
+
+    def batches():
+        # The batches share the preallocated tensor of the preprocessor
+        count = 0
+        for image in images:
+            img = cv2.imread(image)
+            if img is None:
+                continue
+            preprocessor.prepare(img, preprocessor.tensor[count])
+            count += 1
+            if count == batch_size:
+                yield preprocessor.tensor
+                count = 0
+
+    return batches
+
+
+def calibration_batches(source, shape, num=0, seed=0, **options):
+    if source.endswith('.idx'):
+        meta = read_index(source)
+        if [meta['channels'], meta['height'], meta['width']] != list(shape[1:]):
+            raise SystemExit(f'Calibration tensor {meta["channels"]}x{meta["height"]}x{meta["width"]} does not match '
+                             f'the model input {shape[1]}x{shape[2]}x{shape[3]}')
+        return lambda: iter_batches(source, shape[0]), meta['count']
+
+    images = list_images(source, num, seed)
+    return image_batches(images, shape[0], shape[2], shape[3], **options), len(images)
+
+
+def init_worker(data_file, dtype, shape, meta):
+    worker_state['tensor'] = np.memmap(data_file, dtype=dtype, mode='r+', shape=shape)
+    worker_state['preprocessor'] = Preprocessor(
+        meta['height'], meta['width'], scale_factor=meta['scale-factor'], offsets=meta['offsets'],
+        input_format=meta['input-format'], maintain_aspect_ratio=meta['maintain-aspect-ratio'],
+        symmetric_padding=meta['symmetric-padding'], dtype=dtype, layout='NHWC' if dtype == 'uint8' else 'NCHW'
+    )
+
+
+def process_images(items):
+    import cv2
+
+    tensor, preprocessor = worker_state['tensor'], worker_state['preprocessor']
+    failed = []
+    for i, image in items:
+        img = cv2.imread(image)
+        if img is None:
+            failed.append(i)
+            continue
+        preprocessor.prepare(img, tensor[i])
+    tensor.flush()
+    return failed
+
+
+def build_tensor(images, output, height, width, input_format=0, dtype='uint8', scale_factor=1 / 255, offsets=(),
+                 maintain_aspect_ratio=1, symmetric_padding=1, workers=1, chunk_size=16):
+    channels = 1 if input_format == 2 else 3
+    data_file = f'{output}.bin'
+    index_file = f'{output}.idx'
+    meta = {'dtype': dtype, 'count': len(images), 'channels': channels, 'height': height, 'width': width,
+            'input-format': input_format, 'maintain-aspect-ratio': maintain_aspect_ratio,
+            'symmetric-padding': symmetric_padding, 'scale-factor': scale_factor, 'offsets': list(offsets)}
+
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    shape = tensor_shape(len(images), channels, height, width, dtype)
+    tensor = np.memmap(data_file, dtype=dtype, mode='w+', shape=shape)
+    del tensor
+
+    chunks = [list(enumerate(images))[i:i + chunk_size] for i in range(0, len(images), chunk_size)]
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(data_file, dtype, shape, meta)) as executor:
+        for done, chunk_failed in enumerate(executor.map(process_images, chunks), 1):
+            failed += chunk_failed
+            print(f'\rProgress: {min(done * chunk_size, len(images))}/{len(images)}', end='', flush=True)
+    print()
+
+    if failed:
+        for i in failed:
+            print(f'Failed to read image: {images[i]}')
+        failed = set(failed)
+        keep = [i for i in range(len(images)) if i not in failed]
+        tensor = np.memmap(data_file, dtype=dtype, mode='r+', shape=shape)
+        for j, i in enumerate(keep):
+            if i != j:
+                tensor[j] = tensor[i]
+        tensor.flush()
+        del tensor
+        os.truncate(data_file, len(keep) * int(np.prod(shape[1:])) * np.dtype(dtype).itemsize)
+        images = [images[i] for i in keep]
+        meta['count'] = len(images)
+
+    write_index(index_file, data_file, meta, images)
+
+    return index_file, data_file, meta
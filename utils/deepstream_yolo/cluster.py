@@ -0,0 +1,274 @@
+import numpy as np
+
+
+def box_area(boxes):
+    return np.clip(boxes[..., 2] - boxes[..., 0], 0, None) * np.clip(boxes[..., 3] - boxes[..., 1], 0, None)
+
+
+def pair_iou(boxes1, boxes2):
+    x1 = np.maximum(boxes1[:, 0], boxes2[:, 0])
+    y1 = np.maximum(boxes1[:, 1], boxes2[:, 1])
+    x2 = np.minimum(boxes1[:, 2], boxes2[:, 2])
+    y2 = np.minimum(boxes1[:, 3], boxes2[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = box_area(boxes1) + box_area(boxes2) - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0)
+
+
+def sort_by_score(dets):
+    dets = np.asarray(dets, dtype=np.float32).reshape(-1, 6)
+    return dets[np.argsort(-dets[:, 4], kind='stable')]
+
+
+def class_offset_boxes(dets, class_agnostic=False):
+    boxes = dets[:, :4].astype(np.float64)
+    if class_agnostic or not len(dets):
+        return boxes
+    return boxes + (np.abs(boxes).max() + 1) * dets[:, 5:6]
+
+
+def overlap_pairs(boxes, iou_threshold, chunk_size=1 << 22):
+    # Sweep on x1: IoU <= overlap width / width, so only the boxes starting before x1 + (1 - iou_threshold) * width
+    # can overlap a box above the threshold
+    order = np.argsort(boxes[:, 0], kind='stable')
+    boxes = boxes[order]
+    bound = boxes[:, 0] + (1 - max(iou_threshold, 0)) * (boxes[:, 2] - boxes[:, 0])
+    end = np.searchsorted(boxes[:, 0], bound, side='right')
+    counts = np.maximum(end - np.arange(1, len(boxes) + 1), 0)
+    totals = np.cumsum(counts)
+
+    pairs_i, pairs_j = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    first = 0
+    while first < len(boxes):
+        last = max(int(np.searchsorted(totals, totals[first] - counts[first] + chunk_size, side='right')), first + 1)
+        c = counts[first:last]
+        i = np.repeat(np.arange(first, last), c)
+        j = i + 1 + np.arange(c.sum()) - np.repeat(np.cumsum(c) - c, c)
+        keep = pair_iou(boxes[i], boxes[j]) > iou_threshold
+        pairs_i.append(order[i[keep]])
+        pairs_j.append(order[j[keep]])
+        first = last
+
+    i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def suppression(boxes, iou_threshold):
+    # Greedy NMS of boxes sorted by score: the best remaining box is kept and suppresses the remaining boxes above the
+    # threshold, so the work is the number of kept boxes times the remaining boxes. Returns the kept box of each box.
+    x1, y1, x2, y2 = (np.ascontiguousarray(boxes[:, k]) for k in range(4))
+    area = box_area(boxes)
+    index = np.arange(len(boxes))
+    cluster = np.empty(len(boxes), dtype=np.int64)
+    while len(index):
+        k = index[0]
+        w = np.clip(np.minimum(x2[k], x2[index]) - np.maximum(x1[k], x1[index]), 0, None)
+        h = np.clip(np.minimum(y2[k], y2[index]) - np.maximum(y1[k], y1[index]), 0, None)
+        inter = w * h
+        union = area[k] + area[index] - inter
+        overlap = np.where(union > 0, inter / np.maximum(union, 1e-9), 0) > iou_threshold
+        overlap[0] = True
+        cluster[index[overlap]] = k
+        index = index[~overlap]
+    return cluster
+
+
+def cluster_suppression(dets, iou_threshold, class_agnostic=False):
+    # Kept box of each detection (dets sorted by score), suppressed per class
+    boxes = dets[:, :4].astype(np.float64)
+    if class_agnostic or not len(dets):
+        return suppression(boxes, iou_threshold)
+    cluster = np.empty(len(dets), dtype=np.int64)
+    order = np.argsort(dets[:, 5], kind='stable')
+    splits = np.flatnonzero(np.diff(dets[order, 5])) + 1
+    for group in np.split(order, splits):
+        cluster[group] = group[suppression(boxes[group], iou_threshold)]
+    return cluster
+
+
+def nms(dets, iou_threshold=0.45, class_agnostic=False):
+    dets = sort_by_score(dets)
+    return dets[cluster_suppression(dets, iou_threshold, class_agnostic) == np.arange(len(dets))]
+
+
+def nms_loop(dets, iou_threshold=0.45, class_agnostic=False):
+    # Reference greedy NMS (nvinfer cluster-mode=2 loop)
+    dets = sort_by_score(dets)
+    boxes = dets[:, :4].astype(np.float64)
+    kept = []
+    for k in range(len(dets)):
+        if kept:
+            others = np.array(kept)
+            same = others if class_agnostic else others[dets[others, 5] == dets[k, 5]]
+            if len(same) and (pair_iou(boxes[same], np.repeat(boxes[k:k + 1], len(same), 0)) > iou_threshold).any():
+                continue
+        kept.append(k)
+    return dets[kept]
+
+
+def wbf(dets, iou_threshold=0.55, class_agnostic=False):
+    dets = sort_by_score(dets)
+    if not len(dets):
+        return dets
+    # Each suppressed box is fused into the highest score kept box that overlaps it, the box that suppressed it
+    cluster = cluster_suppression(dets, iou_threshold, class_agnostic)
+    kept = cluster == np.arange(len(dets))
+
+    scores = dets[:, 4].astype(np.float64)
+    weights = np.bincount(cluster, scores, minlength=len(dets))[kept]
+    counts = np.bincount(cluster, minlength=len(dets))[kept]
+    boxes = np.stack([np.bincount(cluster, dets[:, k] * scores, minlength=len(dets))[kept] for k in range(4)], 1)
+    boxes /= np.maximum(weights, 1e-9)[:, None]
+
+    fused = np.concatenate([boxes, (weights / counts)[:, None], dets[kept, 5:6]], axis=1)
+    return sort_by_score(fused)
+
+
+def connected_components(num, i, j):
+    # Min label propagation with pointer jumping
+    labels = np.arange(num)
+    while len(i):
+        previous = labels.copy()
+        np.minimum.at(labels, i, labels[j])
+        np.minimum.at(labels, j, labels[i])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            break
+    return labels
+
+
+def fuse_clusters(dets, cluster, weighted=True):
+    # One box per cluster id (>= 0): score-weighted or mean box and max score, with the number of boxes of each cluster
+    valid = cluster >= 0
+    dets, cluster = dets[valid], cluster[valid]
+    if not len(dets):
+        return np.empty((0, 6), dtype=np.float32), np.empty(0, dtype=np.int64)
+    ids, cluster = np.unique(cluster, return_inverse=True)
+    weights = dets[:, 4].astype(np.float64) if weighted else np.ones(len(dets))
+    total = np.bincount(cluster, weights, minlength=len(ids))
+    boxes = np.stack([np.bincount(cluster, dets[:, k] * weights, minlength=len(ids)) for k in range(4)], 1)
+    boxes /= np.maximum(total, 1e-9)[:, None]
+    scores = np.full(len(ids), -np.inf)
+    np.maximum.at(scores, cluster, dets[:, 4])
+    labels = np.zeros(len(ids))
+    labels[cluster] = dets[:, 5]
+    fused = np.concatenate([boxes, scores[:, None], labels[:, None]], axis=1).astype(np.float32)
+    return fused, np.bincount(cluster, minlength=len(ids))
+
+
+def dbscan_labels(dets, eps=0.7, min_boxes=3, min_score=0.0, class_agnostic=False):
+    # DBSCAN with the 1 - IoU distance, core boxes need min_boxes neighbors (with itself) and min_score sum of scores
+    i, j = overlap_pairs(class_offset_boxes(dets, class_agnostic), 1 - eps)
+    scores = dets[:, 4].astype(np.float64)
+    count = len(dets)
+    neighbors = 1 + np.bincount(i, minlength=count) + np.bincount(j, minlength=count)
+    score_sums = scores + np.bincount(i, scores[j], minlength=count) + np.bincount(j, scores[i], minlength=count)
+    core = (neighbors >= min_boxes) & (score_sums >= min_score)
+
+    both = core[i] & core[j]
+    labels = connected_components(count, i[both], j[both])
+    cluster = np.where(core, labels, count)
+    # Border boxes join the cluster of the first core neighbor
+    for a, b in ((i, j), (j, i)):
+        border = core[a] & ~core[b]
+        np.minimum.at(cluster, b[border], labels[a[border]])
+    return np.where(cluster < count, cluster, -1)
+
+
+def dbscan(dets, eps=0.7, min_boxes=3, min_score=0.0, class_agnostic=False):
+    dets = sort_by_score(dets)
+    fused, _ = fuse_clusters(dets, dbscan_labels(dets, eps, min_boxes, min_score, class_agnostic))
+    return sort_by_score(fused)
+
+
+def hybrid(dets, iou_threshold=0.45, eps=0.7, min_boxes=3, min_score=0.0, class_agnostic=False):
+    # DBSCAN removes the boxes without cluster, NMS selects the boxes of each cluster
+    dets = sort_by_score(dets)
+    dets = dets[dbscan_labels(dets, eps, min_boxes, min_score, class_agnostic) >= 0]
+    return nms(dets, iou_threshold, class_agnostic)
+
+
+def similar_pairs(dets, eps=0.2, class_agnostic=False):
+    # cv::groupRectangles similarity: every side within eps * mean of the minimum width and height
+    boxes = class_offset_boxes(dets, class_agnostic)
+    size = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    margin = eps * size[:, None] + 1e-6
+    i, j = overlap_pairs(np.concatenate([boxes[:, :2] - margin, boxes[:, 2:] + margin], 1), 0.0)
+    w, h = boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]
+    delta = eps * (np.minimum(w[i], w[j]) + np.minimum(h[i], h[j])) * 0.5
+    similar = np.all(np.abs(boxes[i] - boxes[j]) <= delta[:, None], axis=1)
+    return i[similar], j[similar]
+
+
+def group_rectangles(dets, group_threshold=1, eps=0.2, class_agnostic=False):
+    dets = sort_by_score(dets)
+    if group_threshold <= 0 or not len(dets):
+        return dets
+    i, j = similar_pairs(dets, eps, class_agnostic)
+    cluster = connected_components(len(dets), i, j)
+    grouped, counts = fuse_clusters(dets, cluster, weighted=False)
+    keep = counts > group_threshold
+
+    # Drop the small groups inside larger groups with more boxes
+    grouped, counts = grouped[keep], counts[keep]
+    boxes = class_offset_boxes(grouped, class_agnostic)
+    margin = eps * np.stack([boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]], 1)
+    margin = np.concatenate([margin, margin], 1) + 1e-6
+    i, j = overlap_pairs(np.concatenate([boxes[:, :2] - margin[:, :2], boxes[:, 2:] + margin[:, 2:]], 1), 0.0)
+    i, j = np.concatenate([i, j]), np.concatenate([j, i])
+    inside = np.all(boxes[i, :2] >= boxes[j, :2] - margin[j, :2], axis=1) & \
+        np.all(boxes[i, 2:] <= boxes[j, 2:] + margin[j, 2:], axis=1)
+    inside &= (counts[j] > np.maximum(3, counts[i])) | (counts[i] < 3)
+    dropped = np.zeros(len(grouped), dtype=bool)
+    dropped[i[inside]] = True
+    return sort_by_score(grouped[~dropped])
+
+
+def limit_per_class(dets, max_dets):
+    # Keep the top max_dets detections of each class (dets sorted by score)
+    if not max_dets or not len(dets):
+        return dets
+    order = np.argsort(dets[:, 5], kind='stable')
+    labels = dets[order, 5]
+    starts = np.searchsorted(labels, labels, side='left')
+    keep = np.zeros(len(dets), dtype=bool)
+    keep[order] = np.arange(len(dets)) - starts < max_dets
+    return dets[keep]
+
+
+CLUSTER_MODES = {0: 'group-rectangles', 1: 'dbscan', 2: 'nms', 3: 'hybrid', 4: 'none'}
+
+
+def cluster_detections(dets, cluster_mode=2, score_threshold=0.0, iou_threshold=0.45, topk=0, eps=None,
+                       group_threshold=1, min_boxes=3, min_score=0.0, class_agnostic=False):
+    # nvinfer cluster-mode: 0 = cv::groupRectangles, 1 = DBSCAN, 2 = NMS, 3 = DBSCAN + NMS, 4 = no clustering
+    if cluster_mode not in CLUSTER_MODES:
+        raise ValueError(f'Invalid cluster-mode: {cluster_mode}')
+    dets = sort_by_score(dets)
+    dets = dets[dets[:, 4] >= score_threshold]
+    kwargs = {} if eps is None else {'eps': eps}
+    if cluster_mode == 0:
+        dets = group_rectangles(dets, group_threshold, class_agnostic=class_agnostic, **kwargs)
+    elif cluster_mode == 1:
+        dets = dbscan(dets, min_boxes=min_boxes, min_score=min_score, class_agnostic=class_agnostic, **kwargs)
+    elif cluster_mode == 2:
+        dets = nms(dets, iou_threshold, class_agnostic)
+    elif cluster_mode == 3:
+        dets = hybrid(dets, iou_threshold, min_boxes=min_boxes, min_score=min_score, class_agnostic=class_agnostic,
+                      **kwargs)
+    return limit_per_class(dets, topk)
+
+
+def cluster_frames(frames, cluster_mode=2, class_agnostic=False, **kwargs):
+    # Class-aware clustering of a batch of frames in one call: the frame and the class are merged in the label
+    frames = [sort_by_score(d) for d in frames]
+    if class_agnostic or not sum(len(d) for d in frames):
+        return [cluster_detections(d, cluster_mode, class_agnostic=class_agnostic, **kwargs) for d in frames]
+    dets = np.concatenate(frames)
+    num_labels = int(dets[:, 5].max()) + 1
+    frame = np.repeat(np.arange(len(frames)), [len(d) for d in frames])
+    dets[:, 5] += frame * num_labels
+    dets = cluster_detections(dets, cluster_mode, **kwargs)
+    frame = (dets[:, 5] // num_labels).astype(np.int64)
+    dets[:, 5] -= frame * num_labels
+    return [dets[frame == k] for k in range(len(frames))]
@@ -0,0 +1,307 @@
+import os
+import inspect
+import warnings
+
+
+def suppress_warnings():
+    import torch
+    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
+    warnings.filterwarnings('ignore', category=UserWarning)
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    warnings.filterwarnings('ignore', category=ResourceWarning)
+
+
+def get_img_size(size):
+    return size * 2 if len(size) == 1 else list(size)
+
+
+def write_labels(names, labels_file='labels.txt'):
+    if len(names) > 0:
+        print(f'Creating {os.path.basename(labels_file)} file')
+        with open(labels_file, 'w', encoding='utf-8') as f:
+            for name in names:
+                f.write(f'{name}\n')
+
+
+def get_dynamic_axes(output_names=('output',), batch=True, size=False, anchors=True):
+    dynamic_axes = {'input': {}}
+    if batch:
+        dynamic_axes['input'][0] = 'batch'
+    if size:
+        dynamic_axes['input'].update({2: 'height', 3: 'width'})
+    for name in output_names:
+        axes = {0: 'batch'} if batch else {}
+        if size and anchors and name != 'num_detections':
+            axes[1] = 'anchors'
+        if axes:
+            dynamic_axes[name] = axes
+    return dynamic_axes
+
+
+def add_input_stage(model, onnx_input_im, args, family, metadata=None):
+    if not getattr(args, 'preprocess', False):
+        return model, onnx_input_im, metadata
+
+    import torch
+    import torch.nn as nn
+    from deepstream_yolo.heads import DeepStreamInput
+    from deepstream_yolo.metadata import family_preprocess
+
+    values = {**family_preprocess(family), **(metadata or {})}
+    input_format = int(values['model-color-format'])
+    offsets = [float(o) for o in str(values['offsets']).split(';') if o]
+    layout = 'NHWC' if args.nhwc else 'NCHW'
+    dtype = 'uint8' if args.uint8 else 'float32'
+    print(f'Adding input preprocessing ({dtype} {layout} input, net-scale-factor {values["net-scale-factor"]}, '
+          f'offsets {offsets or "none"}, {"BGR to RGB" if input_format == 0 else "no channel swap"})')
+    model = nn.Sequential(DeepStreamInput(values['net-scale-factor'], offsets, input_format, args.nhwc), model)
+
+    batch, channels, height, width = onnx_input_im.shape
+    shape = (batch, height, width, channels) if args.nhwc else (batch, channels, height, width)
+    onnx_input_im = torch.zeros(shape, dtype=torch.uint8 if args.uint8 else torch.float32, device=onnx_input_im.device)
+
+    # nvinfer feeds the frames without normalization in BGR (or GRAY) format
+    metadata = {
+        **(metadata or {}), 'net-scale-factor': '1', 'offsets': '', 'model-color-format': 2 if input_format == 2 else 1,
+        'input-preprocess': 1, 'input-dtype': dtype, 'network-input-order': 1 if args.nhwc else 0
+    }
+    return model, onnx_input_im, metadata
+
+
+def add_output_heads(model, args):
+    import torch.nn as nn
+
+    output_names = ['output']
+
+    if getattr(args, 'nms', False):
+        from deepstream_yolo.heads import DeepStreamNMS
+        print(f'Adding NMS (iou {args.iou_thres}, score {args.score_thres}, max-det {args.max_det})')
+        model = nn.Sequential(model, DeepStreamNMS(args.iou_thres, args.score_thres, args.max_det))
+        output_names = ['output', 'num_detections']
+    elif getattr(args, 'topk', False):
+        from deepstream_yolo.heads import DeepStreamTopK
+        print(f'Adding TopK (score {args.score_thres}, max-det {args.max_det})')
+        model = nn.Sequential(model, DeepStreamTopK(args.score_thres, args.max_det))
+
+    if getattr(args, 'compact', False):
+        from deepstream_yolo.heads import DeepStreamCompact
+        precision = 'FP16' if args.compact_fp16 else 'FP32'
+        print(f'Using compact output layout ({precision} boxes and scores, INT32 classes)')
+        model = nn.Sequential(model, DeepStreamCompact(args.compact_fp16))
+        output_names = ['boxes', 'scores', 'classes']
+
+    return model, output_names
+
+
+def set_output_dims(onnx_output_file, model):
+    output_dims = {}
+    for m in model.modules():
+        output_dims.update(getattr(m, 'output_dims', {}))
+    if not output_dims:
+        return
+
+    import onnx
+    model_onnx = onnx.load(onnx_output_file)
+    for output in model_onnx.graph.output:
+        if output.name in output_dims:
+            for dim, value in zip(output.type.tensor_type.shape.dim[1:], output_dims[output.name]):
+                dim.Clear()
+                dim.dim_value = int(value)
+    onnx.save(model_onnx, onnx_output_file)
+
+
+def simplify_onnx(onnx_output_file):
+    print('Simplifying the ONNX model')
+    import onnx
+    import onnxslim
+    model_onnx = onnx.load(onnx_output_file)
+    model_onnx = onnxslim.slim(model_onnx)
+    onnx.save(model_onnx, onnx_output_file)
+
+
+def export_onnx(model, onnx_input_im, onnx_output_file, args, simplify=True, family='', metadata=None, reference=None):
+    import torch
+
+    dynamic_size = getattr(args, 'dynamic_size', False)
+    dynamic_axes = None
+    input_shape = tuple(onnx_input_im.shape)
+    if args.dynamic or dynamic_size:
+        from deepstream_yolo.metadata import profile_shapes
+        min_shape, opt_shape, max_shape = profile_shapes(args, input_shape)
+        print(f'Optimization profile: min {min_shape}, opt {opt_shape}, max {max_shape}')
+
+    base_model = model
+    model, onnx_input_im, metadata = add_input_stage(model, onnx_input_im, args, family, metadata)
+    stage = model[0] if model is not base_model else None
+    graph_shape = tuple(onnx_input_im.shape)
+    model, output_names = add_output_heads(model, args)
+
+    if args.dynamic or dynamic_size:
+        anchors = not (getattr(args, 'nms', False) or getattr(args, 'topk', False))
+        dynamic_axes = get_dynamic_axes(output_names, args.dynamic, dynamic_size, anchors)
+
+    # The NMS head only has a TorchScript symbolic, the dynamo exporter (default in torch >= 2.9) cannot export it
+    kwargs = {}
+    if getattr(args, 'nms', False) and 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        kwargs['dynamo'] = False
+
+    print('Exporting the model to ONNX')
+    torch.onnx.export(
+        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
+        input_names=['input'], output_names=output_names, dynamic_axes=dynamic_axes, **kwargs
+    )
+
+    set_output_dims(onnx_output_file, model)
+
+    if args.simplify:
+        if simplify:
+            simplify_onnx(onnx_output_file)
+        else:
+            print('Simplifying is not available for this model')
+
+    if getattr(args, 'qdq', ''):
+        from deepstream_yolo.qdq import export_qdq
+        export_qdq(onnx_output_file, args.qdq, input_shape, args.qdq_num, args.qdq_method)
+
+    if getattr(args, 'fp16', False):
+        from deepstream_yolo.fp16 import export_fp16
+        from deepstream_yolo.metadata import family_preprocess
+        from deepstream_yolo.preprocess import preprocess_options
+        options = preprocess_options({**(family_preprocess(family) if family else {}), **(metadata or {})})
+        export_fp16(onnx_output_file, input_shape, args.fp16_samples, args.fp16_images, options)
+
+    if family:
+        from deepstream_yolo.metadata import export_metadata
+        export_metadata(onnx_output_file, args, input_shape, family, metadata)
+
+    if getattr(args, 'parity', ''):
+        from deepstream_yolo.parity import check_parity, input_reference, torch_reference
+        reference = reference or torch_reference(base_model)
+        check_parity(onnx_output_file, input_reference(stage, reference) if stage else reference, args, input_shape)
+
+    if getattr(args, 'profile', ''):
+        from deepstream_yolo.profiler import export_profile
+        export_profile(onnx_output_file, args.profile, graph_shape)
+
+    print(f'Done: {onnx_output_file}\n')
+
+    return onnx_output_file
+
+
+def add_export_args(parser, opset, size=True, labels=True):
+    if size:
+        parser.add_argument(
+            '-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])'
+        )
+    parser.add_argument('--opset', type=int, default=opset, help='ONNX opset version')
+    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
+    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
+    parser.add_argument('--dynamic-size', action='store_true', help='Dynamic input height and width')
+    parser.add_argument('--batch', type=int, default=1, help='Static batch-size (optimal batch-size if dynamic)')
+    parser.add_argument('--min-batch', type=int, default=1, help='Minimum batch-size of dynamic models (default 1)')
+    parser.add_argument('--max-batch', type=int, default=0, help='Maximum batch-size of dynamic models (default batch)')
+    parser.add_argument(
+        '--min-size', nargs='+', type=int, default=[], help='Minimum size [H,W] of dynamic size models (default size)'
+    )
+    parser.add_argument(
+        '--max-size', nargs='+', type=int, default=[], help='Maximum size [H,W] of dynamic size models (default size)'
+    )
+    parser.add_argument('--nms', action='store_true', help='Add per-class NMS to the model (DeepStream >= 6.2)')
+    parser.add_argument('--topk', action='store_true', help='Output only the top max-det candidates sorted by score')
+    parser.add_argument('--compact', action='store_true', help='Output separate boxes, scores and INT32 classes')
+    parser.add_argument('--compact-fp16', action='store_true', help='Output FP16 boxes and scores in compact layout')
+    parser.add_argument('--iou-thres', type=float, default=0.45, help='NMS IoU threshold (default 0.45)')
+    parser.add_argument('--score-thres', type=float, default=0.25, help='NMS / TopK score threshold (default 0.25)')
+    parser.add_argument('--max-det', type=int, default=300, help='Maximum detections per image (default 300)')
+    parser.add_argument(
+        '--preprocess', action='store_true', help='Add the channel swap, scale and offsets to the model (BGR input)'
+    )
+    parser.add_argument('--uint8', action='store_true', help='UINT8 input (with --preprocess)')
+    parser.add_argument('--nhwc', action='store_true', help='NHWC input (with --preprocess)')
+    parser.add_argument('--fp16', action='store_true', help='Export FP16 model (post-processing kept in FP32)')
+    parser.add_argument(
+        '--fp16-samples', type=int, default=4, help='Batches to compare FP16 and FP32 (default 4)'
+    )
+    parser.add_argument(
+        '--fp16-images', default='', help='Compare FP16 and FP32 on the images folder or list (default random pixels)'
+    )
+    parser.add_argument('--cache', default='', help='Export cache folder path (default disabled)')
+    parser.add_argument('--profile', default='', help='Output graph profile (.json) file path (default disabled)')
+    add_parity_args(parser)
+    if labels:
+        parser.add_argument('--labels', default='labels.txt', help='Output labels file path (default labels.txt)')
+
+
+def add_parity_args(parser):
+    parser.add_argument(
+        '--parity', default='', help='Compare the ONNX and the framework model detections on the images folder or list'
+    )
+    parser.add_argument('--parity-num', type=int, default=16, help='Number of parity images (default 16)')
+    parser.add_argument(
+        '--parity-thres', type=float, default=0.9, help='Minimum parity mAP50-95 to pass the check (default 0.9)'
+    )
+
+
+def check_parity_args(args):
+    if args.parity:
+        if not os.path.exists(args.parity):
+            raise SystemExit('Invalid parity images')
+        if args.parity_num < 1 or not 0 <= args.parity_thres <= 1:
+            raise SystemExit('Invalid parity settings')
+
+
+def add_qdq_args(parser):
+    parser.add_argument(
+        '--qdq', default='', help='Insert INT8 Q/DQ nodes calibrated on the calibration tensor, images folder or list'
+    )
+    parser.add_argument('--qdq-num', type=int, default=512, help='Number of Q/DQ calibration images (default 512)')
+    parser.add_argument('--qdq-method', choices=['entropy', 'max'], default='entropy',
+                        help='Q/DQ activation calibration method (default entropy)')
+
+
+def check_export_args(args, files=()):
+    if not os.path.isfile(args.weights):
+        raise SystemExit('Invalid weights file')
+    for name in files:
+        if not os.path.isfile(getattr(args, name)):
+            raise SystemExit(f'Invalid {name} file')
+    if args.batch < 1:
+        raise SystemExit('Invalid batch-size')
+    if not args.dynamic and (args.min_batch != 1 or args.max_batch):
+        raise SystemExit('Minimum and maximum batch-size require dynamic batch-size')
+    if args.dynamic and not args.min_batch <= args.batch <= (args.max_batch or args.batch):
+        raise SystemExit('Invalid dynamic batch-size: min-batch <= batch <= max-batch')
+    if not args.dynamic_size and (args.min_size or args.max_size):
+        raise SystemExit('Minimum and maximum size require dynamic size')
+    if args.nms and args.topk:
+        raise SystemExit('Cannot set NMS and TopK at same time')
+    if args.compact_fp16:
+        args.compact = True
+    if args.nms and args.compact:
+        raise SystemExit('Cannot set NMS and compact output layout at same time')
+    if args.nms and args.opset < 11:
+        raise SystemExit('NMS requires opset >= 11')
+    if args.max_det < 1:
+        raise SystemExit('Invalid max-det')
+    preprocess = getattr(args, 'preprocess', False)
+    if (getattr(args, 'uint8', False) or getattr(args, 'nhwc', False)) and not preprocess:
+        raise SystemExit('UINT8 and NHWC input require --preprocess')
+    if getattr(args, 'nhwc', False) and getattr(args, 'dynamic_size', False):
+        # The optimization profile of the engine builder (and the profile metadata) has the H and W at d[2] and d[3]
+        raise SystemExit('Cannot set NHWC input and dynamic size at same time')
+    if getattr(args, 'fp16_images', ''):
+        if not os.path.exists(args.fp16_images):
+            raise SystemExit('Invalid FP16 comparison images')
+        if preprocess and args.fp16_images.endswith('.idx'):
+            raise SystemExit('FP16 comparison of the models with input preprocessing requires an images folder or list')
+    check_parity_args(args)
+    if getattr(args, 'qdq', ''):
+        if not os.path.exists(args.qdq):
+            raise SystemExit('Invalid Q/DQ calibration images')
+        if preprocess:
+            raise SystemExit('Cannot set Q/DQ and input preprocessing at same time')
+        if args.fp16:
+            raise SystemExit('Cannot set Q/DQ and FP16 at same time')
+        if args.opset < 13:
+            raise SystemExit('Q/DQ requires opset >= 13')
@@ -0,0 +1,297 @@
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+def parse_cfg(cfg_file):
+    blocks = []
+    with open(cfg_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line[0] in (' ', '#', ';'):
+                continue
+            line = line.strip()
+            if line[0] == '[':
+                blocks.append({'type': line[1:-1].strip()})
+            elif blocks:
+                key, _, value = line.partition('=')
+                blocks[-1][key.strip()] = value.strip()
+    if not blocks or blocks[0]['type'] not in ('net', 'network'):
+        raise SystemExit('Invalid cfg file: missing [net] block')
+    return blocks
+
+
+def parse_list(value, dtype=int):
+    return [dtype(v) for v in value.split(',') if v.strip()]
+
+
+class WeightsReader:
+    def __init__(self, weights_file):
+        major, minor, _ = np.fromfile(weights_file, dtype=np.int32, count=3)
+        offset = 20 if major * 10 + minor >= 2 and major < 1000 and minor < 1000 else 16
+        count = (os.path.getsize(weights_file) - offset) // 4
+        self.weights = np.memmap(weights_file, dtype=np.float32, mode='r', offset=offset, shape=(count,))
+        self.ptr = 0
+
+    def read(self, count):
+        if self.ptr + count > len(self.weights):
+            raise SystemExit(f'Weights file too small: {self.ptr + count} > {len(self.weights)} weights')
+        values = np.array(self.weights[self.ptr:self.ptr + count], dtype=np.float32)
+        self.ptr += count
+        return values
+
+    def remaining(self):
+        return len(self.weights) - self.ptr
+
+
+class Activation(nn.Module):
+    def __init__(self, activation):
+        super().__init__()
+        if activation not in ('linear', 'relu', 'logistic', 'sigmoid', 'tanh', 'leaky', 'softplus', 'mish', 'silu',
+                              'swish', 'hardsigmoid', 'hardswish'):
+            raise SystemExit(f'Activation not supported: {activation}')
+        self.activation = activation
+
+    def forward(self, x):
+        if self.activation == 'relu':
+            return F.relu(x)
+        if self.activation in ('logistic', 'sigmoid'):
+            return torch.sigmoid(x)
+        if self.activation == 'tanh':
+            return torch.tanh(x)
+        if self.activation == 'leaky':
+            return F.leaky_relu(x, 0.1)
+        if self.activation == 'softplus':
+            return F.softplus(x)
+        if self.activation == 'mish':
+            return x * torch.tanh(F.softplus(x))
+        if self.activation in ('silu', 'swish'):
+            return x * torch.sigmoid(x)
+        if self.activation == 'hardsigmoid':
+            return F.hardsigmoid(x)
+        if self.activation == 'hardswish':
+            return x * F.hardsigmoid(x)
+        return x
+
+
+def read_batchnorm(reader, filters, eps):
+    bias, weight, mean, var = np.split(reader.read(4 * filters), 4)
+    scale = weight / np.sqrt(var + eps)
+    return scale, bias - mean * scale
+
+
+class Convolutional(nn.Module):
+    def __init__(self, block, in_channels, reader):
+        super().__init__()
+        filters = int(block['filters'])
+        size = int(block['size'])
+        groups = int(block.get('groups', 1))
+        pad = (size - 1) // 2 if int(block.get('pad', 0)) else 0
+        batch_normalize = int(block.get('batch_normalize', 0))
+        bias = int(block.get('bias', 0 if batch_normalize else 1))
+
+        self.conv = nn.Conv2d(in_channels, filters, size, int(block['stride']), pad, groups=groups, bias=True)
+        self.act = Activation(block.get('activation', 'linear'))
+
+        if batch_normalize:
+            scale, shift = read_batchnorm(reader, filters, float(block.get('eps', 1e-5)))
+        b = reader.read(filters) if bias else np.zeros(filters, dtype=np.float32)
+        w = reader.read(filters * in_channels // groups * size * size).reshape(self.conv.weight.shape)
+        if batch_normalize:
+            w = w * scale.reshape(-1, 1, 1, 1)
+            b = b * scale + shift
+
+        self.conv.weight.data = torch.from_numpy(w)
+        self.conv.bias.data = torch.from_numpy(b)
+
+    def forward(self, x):
+        return self.act(self.conv(x))
+
+
+class BatchNorm(nn.Module):
+    def __init__(self, block, reader):
+        super().__init__()
+        filters = int(block['filters'])
+        scale, shift = read_batchnorm(reader, filters, float(block.get('eps', 1e-5)))
+        self.register_buffer('scale', torch.from_numpy(scale).reshape(1, -1, 1, 1))
+        self.register_buffer('shift', torch.from_numpy(shift).reshape(1, -1, 1, 1))
+        self.act = Activation(block.get('activation', 'linear'))
+
+    def forward(self, x):
+        return self.act(x * self.scale + self.shift)
+
+
+class Implicit(nn.Module):
+    def __init__(self, block, reader):
+        super().__init__()
+        filters = int(block['filters'])
+        self.implicit = nn.Parameter(torch.from_numpy(reader.read(filters)).reshape(1, filters, 1, 1))
+
+    def forward(self, x):
+        return self.implicit
+
+
+class MaxPool(nn.Module):
+    def __init__(self, block):
+        super().__init__()
+        self.size = int(block['size'])
+        self.stride = int(block['stride'])
+
+    def forward(self, x):
+        if self.size == 2 and self.stride == 1:
+            return F.max_pool2d(F.pad(x, (0, 1, 0, 1), mode='replicate'), 2, 1)
+        return F.max_pool2d(x, self.size, self.stride, (self.size - 1) // 2)
+
+
+class Reorg(nn.Module):
+    def __init__(self, block):
+        super().__init__()
+        self.reorg3d = block['type'] == 'reorg3d'
+        self.stride = int(block.get('stride', 1))
+
+    def forward(self, x):
+        s = self.stride
+        b, c, h, w = x.shape
+        if self.reorg3d:
+            return torch.cat([x[:, :, i::s, j::s] for i, j in ((0, 0), (0, 1), (1, 0), (1, 1))], 1)
+        x = x.reshape(b, c // (s * s), h, s, w, s).permute(0, 1, 2, 4, 3, 5)
+        x = x.reshape(b, c // (s * s), h * w, s * s).permute(0, 1, 3, 2)
+        x = x.reshape(b, c // (s * s), s * s, h * w).permute(0, 2, 1, 3)
+        return x.reshape(b, c * s * s, h // s, w // s)
+
+
+class YoloLayer(nn.Module):
+    def __init__(self, block):
+        super().__init__()
+        self.region = block['type'] == 'region'
+        self.num_classes = int(block['classes'])
+        self.new_coords = int(block.get('new_coords', 0))
+        self.scale_xy = float(block.get('scale_x_y', 1.0))
+
+        anchors = np.array(parse_list(block['anchors'], float), dtype=np.float32).reshape(-1, 2)
+        mask = parse_list(block['mask']) if 'mask' in block and not self.region else list(range(int(block['num'])))
+        self.register_buffer('anchors', torch.from_numpy(anchors[mask]).reshape(1, -1, 1, 2))
+
+    def forward(self, x, net_h, net_w):
+        _, _, grid_h, grid_w = x.shape
+        num_bboxes = self.anchors.shape[1]
+
+        x = x.reshape(-1, num_bboxes, 5 + self.num_classes, grid_h * grid_w).transpose(2, 3)
+
+        gy, gx = torch.meshgrid(torch.arange(grid_h, dtype=x.dtype), torch.arange(grid_w, dtype=x.dtype),
+                                indexing='ij')
+        grid = torch.stack([gx, gy], -1).reshape(1, 1, -1, 2)
+        stride = torch.tensor([net_w / grid_w, net_h / grid_h], dtype=x.dtype)
+
+        if self.new_coords:
+            xy = x[..., :2]
+            wh = (x[..., 2:4] * 2) ** 2 * self.anchors
+            objectness = x[..., 4:5]
+            probs = x[..., 5:]
+        else:
+            xy = torch.sigmoid(x[..., :2])
+            wh = torch.exp(x[..., 2:4]) * self.anchors
+            objectness = torch.sigmoid(x[..., 4:5])
+            probs = torch.softmax(x[..., 5:], -1) if self.region else torch.sigmoid(x[..., 5:])
+
+        if self.region:
+            xy = (xy + grid) * stride
+            wh = wh * stride
+        else:
+            xy = (xy * self.scale_xy - 0.5 * (self.scale_xy - 1) + grid) * stride
+
+        scores, labels = torch.max(probs, -1, keepdim=True)
+        boxes = torch.cat([xy - wh * 0.5, xy + wh * 0.5], -1)
+        return torch.cat([boxes, scores * objectness, labels.to(x.dtype)], -1).reshape(x.shape[0], -1, 6)
+
+
+class Darknet(nn.Module):
+    def __init__(self, blocks, reader):
+        super().__init__()
+        net = blocks[0]
+        self.channels = int(net.get('channels', 3))
+        self.height = int(net['height'])
+        self.width = int(net['width'])
+        self.letter_box = int(net.get('letter_box', 0))
+
+        self.blocks = blocks[1:]
+        self.module_list = nn.ModuleList()
+        channels = []
+        for i, block in enumerate(self.blocks):
+            module = nn.Identity()
+            layer_type = block['type']
+            in_channels = channels[-1] if channels else self.channels
+            out_channels = in_channels
+
+            if layer_type in ('conv', 'convolutional'):
+                module = Convolutional(block, in_channels, reader)
+                out_channels = module.conv.out_channels
+            elif layer_type == 'batchnorm':
+                module = BatchNorm(block, reader)
+            elif layer_type in ('implicit', 'implicit_add', 'implicit_mul'):
+                module = Implicit(block, reader)
+                out_channels = int(block['filters'])
+            elif layer_type == 'route':
+                layers = [layer if layer >= 0 else i + layer for layer in parse_list(block['layers'])]
+                block['layers'] = layers
+                out_channels = sum(channels[layer] for layer in layers) // int(block.get('groups', 1))
+            elif layer_type in ('shortcut', 'sam', 'shift_channels', 'control_channels'):
+                frm = int(block['from'])
+                block['from'] = frm if frm >= 0 else i + frm
+                module = Activation(block.get('activation', 'linear'))
+            elif layer_type in ('max', 'maxpool'):
+                module = MaxPool(block)
+            elif layer_type in ('avg', 'avgpool'):
+                module = nn.AdaptiveAvgPool2d(1)
+            elif layer_type == 'upsample':
+                module = nn.Upsample(scale_factor=int(block['stride']), mode='nearest')
+            elif layer_type in ('reorg', 'reorg3d'):
+                module = Reorg(block)
+                out_channels = in_channels * (4 if layer_type == 'reorg3d' else int(block.get('stride', 1)) ** 2)
+            elif layer_type in ('yolo', 'region'):
+                module = YoloLayer(block)
+            elif layer_type != 'dropout':
+                raise SystemExit(f'Unsupported layer type: {layer_type}')
+
+            self.module_list.append(module)
+            channels.append(out_channels)
+
+        if not any(block['type'] in ('yolo', 'region') for block in self.blocks):
+            raise SystemExit('Invalid cfg file: missing [yolo] or [region] block')
+        if reader.remaining() != 0:
+            raise SystemExit(f'Number of unused weights left: {reader.remaining()}')
+
+    def forward(self, x):
+        net_h, net_w = x.shape[2:]
+        outputs, detections = [], []
+        for block, module in zip(self.blocks, self.module_list):
+            layer_type = block['type']
+            if layer_type == 'route':
+                x = torch.cat([outputs[layer] for layer in block['layers']], 1 + int(block.get('axis', 0)))
+                if 'groups' in block:
+                    groups, group_id = int(block['groups']), int(block['group_id'])
+                    size = x.shape[1] // groups
+                    x = x[:, size * group_id:size * (group_id + 1)]
+            elif layer_type == 'shortcut':
+                y = outputs[block['from']]
+                x = module(x + y[:, :x.shape[1]])
+            elif layer_type in ('sam', 'control_channels'):
+                x = module(x * outputs[block['from']])
+            elif layer_type == 'shift_channels':
+                x = module(x + outputs[block['from']])
+            elif layer_type in ('yolo', 'region'):
+                detections.append(module(x, net_h, net_w))
+            else:
+                x = module(x)
+            outputs.append(x)
+        return torch.cat(detections, 1)
+
+
+def load_darknet(cfg_file, weights_file):
+    blocks = parse_cfg(cfg_file)
+    reader = WeightsReader(weights_file)
+    model = Darknet(blocks, reader)
+    model.eval()
+    return model
@@ -0,0 +1,266 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from deepstream_yolo.cache import hash_file
+
+ENGINE_CACHE_VERSION = 2
+
+NETWORK_MODES = {0: 'fp32', 1: 'int8', 2: 'fp16'}
+
+TRT_HEADERS = (
+    '/usr/include/x86_64-linux-gnu/NvInferVersion.h', '/usr/include/aarch64-linux-gnu/NvInferVersion.h',
+    '/usr/include/NvInferVersion.h', '/usr/local/cuda/include/NvInferVersion.h'
+)
+
+
+def read_config(config_file):
+    properties, section = {}, None
+    with open(config_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                section = line[1:-1].strip()
+            elif section == 'property' and line and not line.startswith('#') and '=' in line:
+                key, _, value = line.partition('=')
+                properties[key.strip()] = value.strip()
+    return properties
+
+
+def set_config_value(config_file, key, value):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    section, index, last = None, None, None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith('['):
+            section = stripped[1:-1].strip()
+        elif section == 'property':
+            if stripped.partition('=')[0].strip() == key:
+                index = i
+            if stripped.partition('=')[0].strip() in ('onnx-file', 'model-file'):
+                last = i
+    if index is None and last is None:
+        raise SystemExit(f'Invalid config file: {config_file}')
+
+    if index is not None:
+        lines[index] = f'{key}={value}\n'
+    else:
+        lines.insert(last + 1, f'{key}={value}\n')
+
+    tmp_file = f'{config_file}.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_file, config_file)
+
+
+def config_path(config_file, path):
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(config_file)), path))
+
+
+def model_files(config_file, properties):
+    if 'onnx-file' in properties:
+        keys = ('onnx-file',)
+    elif 'custom-network-config' in properties and 'model-file' in properties:
+        keys = ('custom-network-config', 'model-file')
+    else:
+        raise SystemExit('Config file needs onnx-file or custom-network-config and model-file')
+    files = [config_path(config_file, properties[key]) for key in keys]
+    for path in files:
+        if not os.path.isfile(path):
+            raise SystemExit(f'Invalid model file: {path}')
+    return files
+
+
+def calib_file(config_file, properties):
+    if int(properties.get('network-mode', 0)) != 1 or 'int8-calib-file' not in properties:
+        return None
+    path = config_path(config_file, properties['int8-calib-file'])
+    return path if os.path.isfile(path) else None
+
+
+def default_engine_file(config_file, properties):
+    batch_size = int(properties.get('batch-size', 1))
+    mode = NETWORK_MODES[int(properties.get('network-mode', 0))]
+    return config_path(config_file, f'model_b{batch_size}_gpu{properties.get("gpu-id", 0)}_{mode}.engine')
+
+
+def gpu_arch(gpu_id=0):
+    try:
+        output = subprocess.run(
+            ['nvidia-smi', '-i', str(gpu_id), '--query-gpu=compute_cap,name', '--format=csv,noheader'],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    compute_cap, _, name = output.strip().partition(',')
+    return f'sm{compute_cap.strip().replace(".", "")}-{name.strip().replace(" ", "_")}' if compute_cap else None
+
+
+def trt_version():
+    try:
+        import tensorrt
+        return tensorrt.__version__
+    except ImportError:
+        pass
+    for header in TRT_HEADERS:
+        if os.path.isfile(header):
+            with open(header, 'r', encoding='utf-8') as f:
+                version = dict(re.findall(r'#define\s+NV_TENSORRT_(MAJOR|MINOR|PATCH)\s+(\d+)', f.read()))
+            if len(version) == 3:
+                return f'{version["MAJOR"]}.{version["MINOR"]}.{version["PATCH"]}'
+    return None
+
+
+def file_digest(path, hashes):
+    stat = os.stat(path)
+    memo = f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+    if memo not in hashes:
+        hashes[memo] = hash_file(path).hexdigest()
+    return hashes[memo]
+
+
+def prune_hashes(hashes):
+    valid = {}
+    for memo, digest in hashes.items():
+        path, size, mtime = memo.rsplit(':', 2)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size == int(size) and stat.st_mtime_ns == int(mtime):
+            valid[memo] = digest
+    return valid
+
+
+def infer_dims(properties):
+    dims = [int(d) for d in properties.get('infer-dims', '').split(';') if d.strip()]
+    return dims if len(dims) == 3 else None
+
+
+def parse_dims(value):
+    try:
+        return [int(d) for d in value.split(',')]
+    except (AttributeError, ValueError):
+        return None
+
+
+def engine_profile(config_file, properties):
+    # Optimization profile of the dynamic ONNX models, as built by Yolo::getProfileDims from the batch-size, the
+    # infer-dims and the exported profile metadata
+    if 'onnx-file' not in properties:
+        return None
+    import onnx
+    from deepstream_yolo.metadata import model_metadata
+
+    model = onnx.load(config_path(config_file, properties['onnx-file']), load_external_data=False)
+    shape = [d.dim_value if d.HasField('dim_value') else -1 for d in model.graph.input[0].type.tensor_type.shape.dim]
+    if len(shape) != 4 or -1 not in shape:
+        return None
+
+    metadata = model_metadata(model)
+    exported = [parse_dims(metadata.get(f'profile-{k}')) for k in ('min', 'opt', 'max')]
+    exported = exported if all(d and len(d) == 4 for d in exported) else None
+    batch_size = int(properties.get('batch-size', 1))
+    dims = infer_dims(properties)
+
+    min_dims, opt_dims, max_dims = list(shape), list(shape), list(shape)
+    min_dims[0], opt_dims[0], max_dims[0] = 1, batch_size, batch_size
+    if shape[0] == -1 and exported:
+        min_dims[0] = min(exported[0][0], batch_size)
+        max_dims[0] = max(exported[2][0], batch_size)
+    for i in (2, 3):
+        if shape[i] != -1:
+            continue
+        infer_dim = dims[i - 1] if dims else 0
+        if exported:
+            min_dims[i], opt_dims[i], max_dims[i] = exported[0][i], infer_dim or exported[1][i], exported[2][i]
+        elif infer_dim:
+            min_dims[i] = opt_dims[i] = max_dims[i] = infer_dim
+        else:
+            raise SystemExit('The ONNX model has dynamic input size, set infer-dims on the config_infer file')
+    return {'min': min_dims, 'opt': opt_dims, 'max': max_dims}
+
+
+def engine_key(config_file, properties, arch, trt, hashes):
+    calib = calib_file(config_file, properties)
+    inputs = {
+        'version': ENGINE_CACHE_VERSION,
+        'models': [file_digest(path, hashes) for path in model_files(config_file, properties)],
+        'network-mode': int(properties.get('network-mode', 0)),
+        'batch-size': int(properties.get('batch-size', 1)),
+        'infer-dims': infer_dims(properties),
+        'profile': engine_profile(config_file, properties),
+        'calib': file_digest(calib, hashes) if calib else None,
+        'arch': arch,
+        'tensorrt': trt
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest(), inputs
+
+
+def load_json(cache_dir, name):
+    try:
+        with open(os.path.join(cache_dir, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json(cache_dir, name, data):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = os.path.join(cache_dir, f'.{name}.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, os.path.join(cache_dir, name))
+
+
+def entry_engine(cache_dir, key):
+    return os.path.join(cache_dir, key, 'model.engine')
+
+
+def touch_entry(cache_dir, key):
+    os.utime(os.path.join(cache_dir, key, 'meta.json'))
+
+
+def store_engine(cache_dir, key, engine_file, meta):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{key}.', dir=cache_dir)
+    try:
+        shutil.copyfile(engine_file, os.path.join(tmp_dir, 'model.engine'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.rename(tmp_dir, os.path.join(cache_dir, key))
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isfile(entry_engine(cache_dir, key)):
+            raise
+
+
+def list_entries(cache_dir):
+    entries = []
+    for key in os.listdir(cache_dir):
+        meta_file = os.path.join(cache_dir, key, 'meta.json')
+        if not key.startswith('.') and os.path.isfile(meta_file):
+            size = sum(e.stat().st_size for e in os.scandir(os.path.join(cache_dir, key)) if e.is_file())
+            entries.append((os.path.getmtime(meta_file), key, size))
+    return sorted(entries)
+
+
+def evict_entries(cache_dir, max_size=0, max_entries=0, keep=()):
+    entries = list_entries(cache_dir)
+    total = sum(size for _, _, size in entries)
+    evicted = []
+    for _, key, size in entries:
+        if (not max_size or total <= max_size) and (not max_entries or len(entries) - len(evicted) <= max_entries):
+            break
+        if key in keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+        total -= size
+        evicted.append(key)
+    return evicted
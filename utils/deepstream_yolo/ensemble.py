@@ -0,0 +1,205 @@
+import numpy as np
+
+from deepstream_yolo.metadata import model_metadata, write_metadata
+
+OUTPUT_LAYOUTS = {
+    'default': ('output',),
+    'topk': ('output',),
+    'compact': ('boxes', 'scores', 'classes'),
+}
+
+PRECISIONS = ('fp32', 'fp16', 'int8')
+
+
+def default_opset(model_onnx):
+    return next(o.version for o in model_onnx.opset_import if o.domain in ('', 'ai.onnx'))
+
+
+def load_models(onnx_files):
+    import onnx
+    from onnx import version_converter
+
+    models = [onnx.load(onnx_file) for onnx_file in onnx_files]
+    opset = max(default_opset(m) for m in models)
+    for i, (onnx_file, model_onnx) in enumerate(zip(onnx_files, models)):
+        metadata = model_metadata(model_onnx)
+        if not metadata:
+            raise SystemExit(f'{onnx_file} has no DeepStream metadata, export it again with the updated export file')
+        if metadata['output-layout'] not in OUTPUT_LAYOUTS:
+            raise SystemExit(f'{onnx_file}: {metadata["output-layout"]} output layout is not supported in ensemble '
+                             '(export the model without --nms)')
+        if default_opset(model_onnx) < opset:
+            print(f'Converting {onnx_file} to opset {opset}')
+            try:
+                models[i] = version_converter.convert_version(model_onnx, opset)
+            except Exception as e:
+                raise SystemExit(f'Cannot convert {onnx_file} to opset {opset}: {e}')
+    return models, opset
+
+
+def check_models(onnx_files, metadata):
+    for onnx_file, m in zip(onnx_files, metadata):
+        if int(m['num-classes']) < 1:
+            raise SystemExit(f'{onnx_file}: unknown number of classes, export it again with the labels file')
+    first = metadata[0]
+    for onnx_file, m in zip(onnx_files[1:], metadata[1:]):
+        input_shape = m['input-shape'].split(',')
+        if input_shape[1:] != first['input-shape'].split(',')[1:]:
+            raise SystemExit(f'{onnx_file}: input shape {m["input-shape"]} is different from {first["input-shape"]}')
+        if (input_shape[0] == '-1') != (first['input-shape'].split(',')[0] == '-1'):
+            raise SystemExit(f'{onnx_file}: cannot use static and dynamic batch-size models in the same ensemble')
+        if (m['output-layout'] == 'compact') != (first['output-layout'] == 'compact'):
+            raise SystemExit(f'{onnx_file}: cannot use compact and [x1, y1, x2, y2, score, label] output layouts in '
+                             'the same ensemble')
+        for key in ('maintain-aspect-ratio', 'symmetric-padding'):
+            if m[key] != first[key]:
+                raise SystemExit(f'{onnx_file}: {key} is different from the first model, the ensemble models need the '
+                                 'same resize')
+        if int(m['model-color-format']) != int(first['model-color-format']) and \
+                2 in (int(m['model-color-format']), int(first['model-color-format'])):
+            raise SystemExit(f'{onnx_file}: cannot use gray and color models in the same ensemble')
+
+
+def channel_offsets(metadata, channels):
+    offsets = [float(o) for o in metadata['offsets'].split(';') if o] if metadata['offsets'] else []
+    return np.array((offsets + [0.0] * channels)[:channels], dtype=np.float32)
+
+
+def input_adapter(prefix, shared, metadata, channels):
+    # Map the shared input (first model preprocessing) to the preprocessing of the model:
+    # x = s * (pixel - offset) -> x_model = s_model / s * x + s_model * (offset - offset_model)
+    from onnx import helper, numpy_helper
+
+    scale = float(metadata['net-scale-factor']) / float(shared['net-scale-factor'])
+    shared_offsets = channel_offsets(shared, channels)
+    offsets = channel_offsets(metadata, channels)
+    flip = int(metadata['model-color-format']) != int(shared['model-color-format'])
+    if flip:
+        shared_offsets = shared_offsets[::-1]
+    bias = np.float32(metadata['net-scale-factor']) * (shared_offsets - offsets)
+
+    nodes, initializers, x = [], [], 'input'
+    if flip:
+        initializers.append(numpy_helper.from_array(np.arange(channels - 1, -1, -1, dtype=np.int64), f'{prefix}flip'))
+        nodes.append(helper.make_node('Gather', [x, f'{prefix}flip'], [f'{prefix}input_flip'], axis=1))
+        x = f'{prefix}input_flip'
+    if not np.isclose(scale, 1.0, rtol=1e-6, atol=0):
+        initializers.append(numpy_helper.from_array(np.array(scale, dtype=np.float32), f'{prefix}input_scale'))
+        nodes.append(helper.make_node('Mul', [x, f'{prefix}input_scale'], [f'{prefix}input_scaled']))
+        x = f'{prefix}input_scaled'
+    if np.any(bias != 0):
+        initializers.append(numpy_helper.from_array(bias.reshape(1, -1, 1, 1), f'{prefix}input_bias'))
+        nodes.append(helper.make_node('Add', [x, f'{prefix}input_bias'], [f'{prefix}input_biased']))
+        x = f'{prefix}input_biased'
+    return nodes, initializers, x
+
+
+def rename_input(graph, old, new):
+    for node in graph.node:
+        for k, name in enumerate(node.input):
+            if name == old:
+                node.input[k] = new
+
+
+def offset_outputs(prefix, graph, layout, offset):
+    from onnx import helper, numpy_helper
+
+    nodes, initializers = [], []
+    outputs = {o.name[len(prefix):]: o.name for o in graph.output}
+    if layout == 'compact':
+        initializers.append(numpy_helper.from_array(np.array(offset, dtype=np.int32), f'{prefix}class_offset'))
+        nodes.append(helper.make_node(
+            'Add', [outputs['classes'], f'{prefix}class_offset'], [f'{prefix}classes_offset']
+        ))
+        return nodes, initializers, [outputs['boxes'], outputs['scores'], f'{prefix}classes_offset']
+    value = np.array([0, 0, 0, 0, 0, offset], dtype=np.float32)
+    initializers.append(numpy_helper.from_array(value, f'{prefix}class_offset'))
+    nodes.append(helper.make_node('Add', [outputs['output'], f'{prefix}class_offset'], [f'{prefix}output_offset']))
+    return nodes, initializers, [f'{prefix}output_offset']
+
+
+def ensemble_precision(metadata):
+    return max((m['precision'] for m in metadata), key=PRECISIONS.index)
+
+
+def build_ensemble(onnx_files):
+    import onnx
+    from onnx import compose, helper
+
+    models, opset = load_models(onnx_files)
+    metadata = [model_metadata(m) for m in models]
+    check_models(onnx_files, metadata)
+
+    shared = metadata[0]
+    layout = 'compact' if shared['output-layout'] == 'compact' else 'default'
+    channels = int(shared['input-shape'].split(',')[1])
+    input_value = models[0].graph.input[0]
+
+    nodes, initializers, value_info, branches = [], [], [], []
+    class_offsets, offset = [], 0
+    for i, (model_onnx, m) in enumerate(zip(models, metadata)):
+        prefix = f'm{i}_'
+        graph = compose.add_prefix(model_onnx, prefix).graph
+
+        adapter_nodes, adapter_initializers, x = input_adapter(prefix, shared, m, channels)
+        rename_input(graph, graph.input[0].name, x)
+
+        output_nodes, output_initializers, outputs = offset_outputs(prefix, graph, m['output-layout'], offset)
+
+        nodes += [*adapter_nodes, *graph.node, *output_nodes]
+        initializers += [*adapter_initializers, *graph.initializer, *output_initializers]
+        value_info += graph.value_info
+        branches.append(outputs)
+        class_offsets.append(offset)
+        offset += int(m['num-classes'])
+
+    graph_outputs = []
+    for k, name in enumerate(OUTPUT_LAYOUTS[layout]):
+        nodes.append(helper.make_node('Concat', [outputs[k] for outputs in branches], [name], axis=1))
+        elem_type = models[0].graph.output[k].type.tensor_type.elem_type
+        graph_outputs.append(helper.make_tensor_value_info(name, elem_type, None))
+
+    graph = helper.make_graph(nodes, 'ensemble', [input_value], graph_outputs, initializers, value_info=value_info)
+    opset_imports = {o.domain: o for m in models for o in m.opset_import}
+    opset_imports[''] = helper.make_opsetid('', opset)
+    opset_imports.pop('ai.onnx', None)
+    model_onnx = helper.make_model(
+        graph, opset_imports=list(opset_imports.values()), producer_name='DeepStream-Yolo ensemble',
+        ir_version=max(m.ir_version for m in models)
+    )
+    model_onnx = onnx.shape_inference.infer_shapes(model_onnx)
+
+    ensemble_metadata = {
+        **{k: v for k, v in shared.items() if not k.startswith('profile-')},
+        'family': 'ensemble',
+        'num-classes': offset,
+        'output-layout': layout,
+        'output-names': ','.join(OUTPUT_LAYOUTS[layout]),
+        'parse-bbox-func-name': 'NvDsInferParseYoloCompact' if layout == 'compact' else 'NvDsInferParseYolo',
+        'precision': ensemble_precision(metadata),
+        'cluster-mode': 2,
+        'ensemble-families': ','.join(m['family'] for m in metadata),
+        'ensemble-class-offsets': ','.join(str(o) for o in class_offsets)
+    }
+    profiles = [tuple(m.get(f'profile-{k}') for k in ('min', 'opt', 'max')) for m in metadata]
+    if all(profile == profiles[0] and None not in profile for profile in profiles):
+        for k, value in zip(('min', 'opt', 'max'), profiles[0]):
+            ensemble_metadata[f'profile-{k}'] = value
+    write_metadata(model_onnx, ensemble_metadata)
+
+    return model_onnx, metadata, class_offsets
+
+
+def merge_labels(label_files, metadata, names):
+    labels = []
+    for label_file, m, name in zip(label_files, metadata, names):
+        count = int(m['num-classes'])
+        model_labels = []
+        if label_file:
+            with open(label_file, 'r', encoding='utf-8') as f:
+                model_labels = [line.strip() for line in f if line.strip()]
+            if len(model_labels) != count:
+                raise SystemExit(f'{label_file} has {len(model_labels)} labels, the model has {count} classes')
+        labels += model_labels or [f'{name}_{k}' for k in range(count)]
+    return labels
+
@@ -0,0 +1,129 @@
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from deepstream_yolo.fp16 import name_nodes, tail_nodes
+
+FLOAT_TYPES = (1, 10, 16)
+
+
+def add_tensor_outputs(model_onnx, tail=False, tensors=None):
+    import onnx
+
+    model_onnx = onnx.shape_inference.infer_shapes(model_onnx)
+    graph = model_onnx.graph
+    name_nodes(graph)
+
+    skip = set() if tail else set(tail_nodes(graph))
+    types = {v.name: v.type.tensor_type.elem_type for v in [*graph.input, *graph.value_info, *graph.output]}
+    outputs = {o.name for o in graph.output}
+    initializers = {i.name for i in graph.initializer}
+
+    names = [
+        i.name for i in graph.input
+        if i.name not in initializers and types.get(i.name) in FLOAT_TYPES and (tensors is None or i.name in tensors)
+    ]
+    for node in graph.node:
+        if node.name in skip or node.op_type in ('Constant', 'Shape'):
+            continue
+        for name in node.output:
+            if tensors is not None and name not in tensors:
+                continue
+            if name and types.get(name) in FLOAT_TYPES:
+                names.append(name)
+                if name not in outputs:
+                    graph.output.append(onnx.helper.make_tensor_value_info(name, types[name], None))
+                    outputs.add(name)
+
+    return model_onnx, names
+
+
+def run_tensors(session, names, x):
+    input_name = session.get_inputs()[0].name
+    output_names = [name for name in names if name != input_name]
+    outputs = dict(zip(output_names, session.run(output_names, {input_name: x})))
+    if input_name in names:
+        outputs[input_name] = x
+    return outputs
+
+
+def collect_amax(session, batches, names):
+    amax = {name: 0.0 for name in names}
+    for i, x in enumerate(batches()):
+        for name, y in run_tensors(session, names, x).items():
+            amax[name] = max(amax[name], float(np.abs(y).max(initial=0)))
+        print(f'\rRange: batch {i + 1}', end='', flush=True)
+    print()
+    return amax
+
+
+def collect_histograms(session, batches, names, amax, num_bins=2048):
+    hists = {name: np.zeros(num_bins, dtype=np.int64) for name in names}
+    for i, x in enumerate(batches()):
+        for name, y in run_tensors(session, names, x).items():
+            if amax[name] > 0:
+                hists[name] += np.histogram(np.abs(y), bins=num_bins, range=(0, amax[name]))[0]
+        print(f'\rHistogram: batch {i + 1}', end='', flush=True)
+    print()
+    return hists
+
+
+def entropy_amax(hist, amax, num_quant_bins=128, stride=1):
+    hist = np.asarray(hist, dtype=np.float64)
+    num_bins = len(hist)
+    if amax <= 0 or hist.sum() == 0:
+        return amax
+
+    best_i, best_kl = num_bins, np.inf
+    for i in range(num_quant_bins, num_bins + 1, stride):
+        p = hist[:i].copy()
+        p[-1] += hist[i:].sum()
+        nonzero = hist[:i] > 0
+
+        index = np.arange(i) * num_quant_bins // i
+        q_sum = np.bincount(index, weights=hist[:i], minlength=num_quant_bins)
+        q_count = np.bincount(index, weights=nonzero, minlength=num_quant_bins)
+        q = np.where(nonzero, q_sum[index] / np.maximum(q_count[index], 1), 0)
+
+        if np.any((p > 0) & (q == 0)):
+            continue
+
+        mask = p > 0
+        p = p[mask] / p.sum()
+        q = q[mask] / q.sum()
+        kl = float(np.sum(p * np.log(p / q)))
+        if kl <= best_kl:
+            best_i, best_kl = i, kl
+
+    return amax * best_i / num_bins
+
+
+def entropy_task(item):
+    name, hist, amax, stride = item
+    return name, entropy_amax(hist, amax, stride=stride)
+
+
+def compute_scales(hists, amax, workers=1, stride=1):
+    items = [(name, hists[name], amax[name], stride) for name in hists]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        thresholds = dict(executor.map(entropy_task, items, chunksize=4))
+    return {name: thresholds[name] / 127 for name in hists if thresholds[name] > 0}
+
+
+def write_calibration_cache(cache_file, scales, trt_version):
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        f.write(f'TRT-{trt_version}-EntropyCalibration2\n')
+        for name, scale in scales.items():
+            f.write(f'{name}: {struct.pack(">f", scale).hex()}\n')
+
+
+def read_calibration_cache(cache_file):
+    scales = {}
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        header = f.readline().strip()
+        for line in f:
+            name, _, value = line.strip().rpartition(': ')
+            if name:
+                scales[name] = struct.unpack('>f', bytes.fromhex(value))[0]
+    return header, scales
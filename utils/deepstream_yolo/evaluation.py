@@ -0,0 +1,146 @@
+import os
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from deepstream_yolo.parser import parse_yolo, parse_yolo_compact, parse_yolo_nms, parse_yolo_topk
+
+
+def load_coco(annotations_file, images_dir, num=0):
+    with open(annotations_file, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+
+    category_ids = sorted(c['id'] for c in dataset['categories'])
+    labels = {category_id: k for k, category_id in enumerate(category_ids)}
+
+    images = sorted(dataset['images'], key=lambda image: image['id'])
+    if num > 0:
+        images = images[:num]
+
+    boxes = {image['id']: ([], []) for image in images}
+    for ann in dataset.get('annotations', []):
+        if ann['image_id'] not in boxes or ann['category_id'] not in labels:
+            continue
+        x, y, w, h = ann['bbox']
+        boxes[ann['image_id']][int(ann.get('iscrowd', 0))].append([x, y, x + w, y + h, labels[ann['category_id']]])
+
+    items = [
+        {'id': image['id'], 'file': os.path.join(images_dir, image['file_name']), 'height': image['height'],
+         'width': image['width']} for image in images
+    ]
+    gts = [np.array(boxes[image['id']][0], dtype=np.float32).reshape(-1, 5) for image in images]
+    crowds = [np.array(boxes[image['id']][1], dtype=np.float32).reshape(-1, 5) for image in images]
+    return items, gts, crowds, category_ids
+
+
+def prefetch(items, load, workers=4, size=16):
+    # Ordered streaming map: at most size items are loaded ahead of the consumer
+    with ThreadPoolExecutor(max(workers, 1)) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(load, item))
+            if len(pending) >= size:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def objects_to_detections(objects):
+    return np.stack([
+        objects['left'], objects['top'], objects['left'] + objects['width'], objects['top'] + objects['height'],
+        objects['detectionConfidence'], objects['classId'].astype(np.float32)
+    ], axis=1).astype(np.float32)
+
+
+def parse_outputs(outputs, output_names, layout, net_w, net_h, threshold):
+    outputs = dict(zip(output_names, outputs))
+    if layout == 'compact':
+        objects = parse_yolo_compact(outputs['boxes'], outputs['scores'], outputs['classes'], net_w, net_h, threshold)
+    elif layout == 'nms':
+        objects = parse_yolo_nms(outputs['output'], outputs['num_detections'], net_w, net_h, threshold)
+    elif layout == 'topk':
+        objects = parse_yolo_topk(outputs[output_names[0]], net_w, net_h, threshold)
+    else:
+        objects = parse_yolo(outputs[output_names[0]], net_w, net_h, threshold)
+    return [objects_to_detections(o) for o in objects]
+
+
+def coco_detections(dets, image_id, category_ids):
+    return [
+        {'image_id': image_id, 'category_id': category_ids[int(d[5])],
+         'bbox': [round(float(d[0]), 3), round(float(d[1]), 3), round(float(d[2] - d[0]), 3),
+                  round(float(d[3] - d[1]), 3)], 'score': round(float(d[4]), 5)}
+        for d in dets if 0 <= int(d[5]) < len(category_ids)
+    ]
+
+
+def device_name(providers=None):
+    name = ''
+    if os.path.isfile('/proc/cpuinfo'):
+        with open('/proc/cpuinfo', 'r', encoding='utf-8') as f:
+            name = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), '')
+    if not name:
+        import platform
+        name = platform.processor() or platform.machine()
+    return f'{name} ({", ".join(providers)})' if providers else name
+
+
+def config_values(results, key):
+    values = []
+    for r in results:
+        if str(r[key]) not in values:
+            values.append(str(r[key]))
+    return ' / '.join(values)
+
+
+def resolution(result):
+    height, width = result['size']
+    return str(height) if height == width else f'{width}x{height}'
+
+
+def markdown_table(results):
+    lines = [
+        '# Benchmarks',
+        '',
+        '### Config',
+        '',
+        '```',
+        f'device = {config_values(results, "device")}',
+        f'batch-size = {config_values(results, "batch")}',
+        f'eval = {config_values(results, "dataset")}',
+        '```',
+        '',
+        '### NMS config',
+        '',
+        '```',
+        f'cluster-mode = {config_values(results, "cluster_mode")}',
+        f'nms-iou-threshold = {config_values(results, "nms_iou_threshold")}',
+        f'pre-cluster-threshold = {config_values(results, "pre_cluster_threshold")}',
+        f'topk = {config_values(results, "topk")}',
+        '```',
+        '',
+        '### Results',
+        '',
+        '**NOTE**: FPS = images per second of the ONNX Runtime inference, end-to-end FPS includes the image loading,',
+        'preprocessing and post-processing.',
+        ''
+    ]
+    columns = [
+        ('Model', lambda r: r['name']),
+        ('Precision', lambda r: r['precision'].upper()),
+        ('Resolution', resolution),
+        ('IoU=0.5:0.95', lambda r: f'{r["map"]:.3f}'),
+        ('IoU=0.5', lambda r: f'{r["map50"]:.3f}'),
+        ('IoU=0.75', lambda r: f'{r["map75"]:.3f}'),
+        ('FPS', lambda r: f'{r["fps"]:.2f}'),
+        ('End-to-end FPS', lambda r: f'{r["e2e_fps"]:.2f}')
+    ]
+    rows = [[name for name, _ in columns]] + [[value(r) for _, value in columns] for r in results]
+    widths = [max(len(row[k]) for row in rows) for k in range(len(columns))]
+    lines.append('| ' + ' | '.join(v.ljust(w) for v, w in zip(rows[0], widths)) + ' |')
+    lines.append('|' + '|'.join(':' + '-' * w + ':' for w in widths) + '|')
+    for row in rows[1:]:
+        lines.append('| ' + ' | '.join(v.ljust(w) for v, w in zip(row, widths)) + ' |')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,153 @@
+import numpy as np
+
+FP32_OPS = ['Softmax', 'LayerNormalization', 'ReduceMean', 'Pow', 'Sqrt']
+
+
+def weighted_nodes(graph, min_size=64):
+    initializers = {i.name: int(np.prod(i.dims)) for i in graph.initializer}
+    weighted = set()
+    for node in graph.node:
+        if node.op_type in ('Conv', 'ConvTranspose', 'Gemm', 'MatMul'):
+            if any(initializers.get(name, 0) >= min_size for name in node.input):
+                weighted.add(node.name)
+    return weighted
+
+
+def tail_nodes(graph):
+    weighted = weighted_nodes(graph)
+    consumers = {}
+    for node in graph.node:
+        for name in node.input:
+            consumers.setdefault(name, []).append(node)
+
+    feeds_weighted = {}
+    for node in reversed(graph.node):
+        feeds_weighted[node.name] = any(
+            c.name in weighted or feeds_weighted.get(c.name, False)
+            for name in node.output for c in consumers.get(name, [])
+        )
+
+    return [node.name for node in graph.node if node.name not in weighted and not feeds_weighted[node.name]]
+
+
+def name_nodes(graph):
+    for i, node in enumerate(graph.node):
+        if not node.name:
+            node.name = f'{node.op_type}_{i}'
+
+
+def input_casts(graph):
+    # The converter retypes the Cast of the UINT8 input (--preprocess --uint8) to FP16 without its value info
+    from onnx import TensorProto
+
+    uint8 = {i.name for i in graph.input if i.type.tensor_type.elem_type == TensorProto.UINT8}
+    casts = []
+    for node in graph.node:
+        if not any(name in uint8 for name in node.input):
+            continue
+        if node.op_type == 'Cast':
+            casts.append(node.name)
+        else:
+            uint8.update(node.output)
+    return casts
+
+
+def convert_fp16(model_onnx):
+    from onnxconverter_common import float16
+
+    name_nodes(model_onnx.graph)
+    node_block_list = tail_nodes(model_onnx.graph)
+    op_block_list = list(float16.DEFAULT_OP_BLOCK_LIST) + FP32_OPS
+
+    print(f'Converting the ONNX model to FP16 ({len(node_block_list)} post-processing nodes kept in FP32)')
+    return float16.convert_float_to_float16(
+        model_onnx, keep_io_types=True, op_block_list=op_block_list,
+        node_block_list=node_block_list + input_casts(model_onnx.graph)
+    )
+
+
+def sample_batches(session, input_shape, samples, rng, images='', options=None):
+    # Real images through the nvinfer preprocessing or random pixels with the same normalization (net-scale-factor,
+    # offsets and layout), as the family models are not calibrated for uniform [0, 1] inputs
+    from deepstream_yolo.preprocess import get_offsets
+    from deepstream_yolo.runtime import input_dtype
+
+    options = options or {}
+    dtype = input_dtype(session)
+    if images:
+        from deepstream_yolo.calibration import calibration_batches
+        batches, count = calibration_batches(images, input_shape, samples * input_shape[0], 0, dtype=dtype, **options)
+        if count < input_shape[0]:
+            raise SystemExit(f'FP16 comparison requires at least {input_shape[0]} images')
+        for _, x in zip(range(samples), batches()):
+            yield x
+        return
+
+    nhwc = options.get('layout', 'NCHW') == 'NHWC'
+    batch, channels, height, width = input_shape
+    shape = (batch, height, width, channels) if nhwc else input_shape
+    offsets = get_offsets(options.get('offsets', ()), options.get('input_format', 0))
+    offsets = offsets.reshape((1, 1, 1, channels) if nhwc else (1, channels, 1, 1))
+    for _ in range(samples):
+        pixels = rng.integers(0, 256, shape)
+        if np.issubdtype(dtype, np.integer):
+            yield pixels.astype(dtype)
+        else:
+            yield (options.get('scale_factor', 1 / 255) * (pixels - offsets)).astype(dtype)
+
+
+def compare_outputs(model_fp32, model_fp16, input_shape, samples=4, seed=0, images='', options=None):
+    import onnxruntime as ort
+
+    providers = ort.get_available_providers()
+    sess_fp32 = ort.InferenceSession(model_fp32.SerializeToString(), providers=providers)
+    sess_fp16 = ort.InferenceSession(model_fp16.SerializeToString(), providers=providers)
+
+    input_name = sess_fp32.get_inputs()[0].name
+    output_names = [o.name for o in sess_fp32.get_outputs()]
+
+    rng = np.random.default_rng(seed)
+    report = {name: {} for name in output_names}
+    for x in sample_batches(sess_fp32, input_shape, samples, rng, images, options):
+        y32 = sess_fp32.run(output_names, {input_name: x})
+        y16 = sess_fp16.run(output_names, {input_name: x})
+        for name, a, b in zip(output_names, y32, y16):
+            a = a.astype(np.float32)
+            b = b.astype(np.float32)
+            stats = report[name]
+            if a.ndim == 3 and a.shape[-1] == 6:
+                stats['boxes'] = max(stats.get('boxes', 0.0), float(np.abs(a[..., :4] - b[..., :4]).max(initial=0)))
+                stats['scores'] = max(stats.get('scores', 0.0), float(np.abs(a[..., 4] - b[..., 4]).max(initial=0)))
+                stats['labels_mismatch'] = max(
+                    stats.get('labels_mismatch', 0.0), float((a[..., 5] != b[..., 5]).mean()) if a.size else 0.0
+                )
+            else:
+                stats['max'] = max(stats.get('max', 0.0), float(np.abs(a - b).max(initial=0)))
+
+    return report
+
+
+def print_report(report):
+    print('FP16 vs FP32 max abs deviation')
+    for name, stats in report.items():
+        values = ', '.join(f'{k} {v:.6f}' for k, v in stats.items())
+        print(f'  {name}: {values}')
+
+
+def export_fp16(onnx_output_file, input_shape, samples=4, images='', options=None):
+    import onnx
+
+    model_fp32 = onnx.load(onnx_output_file)
+    model_fp16 = convert_fp16(model_fp32)
+
+    report = None
+    if samples > 0:
+        try:
+            report = compare_outputs(model_fp32, model_fp16, input_shape, samples, 0, images, options)
+            print_report(report)
+        except Exception as e:
+            print(f'Cannot compare the FP16 model with onnxruntime: {e}')
+
+    onnx.save(model_fp16, onnx_output_file)
+
+    return report
@@ -0,0 +1,130 @@
+import torch
+import torch.nn as nn
+
+
+def box_iou(box, boxes):
+    x1 = torch.maximum(box[0], boxes[:, 0])
+    y1 = torch.maximum(box[1], boxes[:, 1])
+    x2 = torch.minimum(box[2], boxes[:, 2])
+    y2 = torch.minimum(box[3], boxes[:, 3])
+    inter = (x2 - x1).clamp(min=0) * (y2 - y1).clamp(min=0)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (area + areas - inter).clamp(min=1e-9)
+
+
+class NonMaxSuppression(torch.autograd.Function):
+    @staticmethod
+    def forward(ctx, boxes, scores, max_output_boxes, iou_threshold, score_threshold):
+        selected = []
+        for b in range(boxes.shape[0]):
+            for c in range(scores.shape[1]):
+                s = scores[b, c]
+                idx = torch.nonzero(s > score_threshold).flatten()
+                idx = idx[s[idx].argsort(descending=True)]
+                keep = 0
+                while idx.numel() > 0 and keep < max_output_boxes:
+                    i = idx[0]
+                    selected.append([b, c, int(i)])
+                    keep += 1
+                    idx = idx[1:][box_iou(boxes[b, i], boxes[b, idx[1:]]) <= iou_threshold]
+        return torch.tensor(selected, dtype=torch.int64, device=boxes.device).reshape(-1, 3)
+
+    @staticmethod
+    def symbolic(g, boxes, scores, max_output_boxes, iou_threshold, score_threshold):
+        return g.op(
+            'NonMaxSuppression', boxes, scores,
+            g.op('Constant', value_t=torch.tensor([max_output_boxes], dtype=torch.int64)),
+            g.op('Constant', value_t=torch.tensor([iou_threshold], dtype=torch.float32)),
+            g.op('Constant', value_t=torch.tensor([score_threshold], dtype=torch.float32))
+        )
+
+
+def scatter_detections(x, batch_idx, box_idx, rank, max_det):
+    # ONNX Runtime fails on an empty ScatterND (frames without detections): an extra row is always scattered to a
+    # spare slot after the max_det rows. The buffer does not depend on the number of anchors (dynamic size models).
+    pad = torch.zeros(1, dtype=batch_idx.dtype, device=x.device)
+    batch_idx = torch.cat([batch_idx, pad])
+    box_idx = torch.cat([box_idx, pad])
+    rank = torch.cat([rank, pad + max_det])
+    output = x.new_zeros((x.shape[0], max_det + 1, x.shape[2]))
+    output[batch_idx, rank] = x[batch_idx, box_idx]
+    return output[:, :max_det]
+
+
+class DeepStreamNMS(nn.Module):
+    def __init__(self, iou_threshold=0.45, score_threshold=0.25, max_det=300):
+        super().__init__()
+        self.iou_threshold = iou_threshold
+        self.score_threshold = score_threshold
+        self.max_det = max_det
+
+    def forward(self, x):
+        boxes = x[:, :, :4]
+        scores = x[:, :, 4:5].transpose(1, 2)
+        offset = boxes.abs().max() * 2 + 1
+        boxes = boxes + x[:, :, 5:6] * offset
+        # Python int, a traced size cannot be a constant of the NMS node. The output has max_det rows at any input size
+        # (fewer anchors than max_det with small dynamic sizes)
+        max_det = self.max_det
+        self.output_dims = {'output': [max_det, int(x.shape[2])]}
+        selected = NonMaxSuppression.apply(boxes, scores, max_det, self.iou_threshold, self.score_threshold)
+        batch_idx = selected[:, 0]
+        box_idx = selected[:, 2]
+        batch = torch.arange(x.shape[0], device=x.device)
+        counts = (batch_idx.unsqueeze(1) == batch.unsqueeze(0)).sum(0)
+        starts = (batch_idx.unsqueeze(1) < batch.unsqueeze(0)).sum(0)
+        rank = torch.arange(selected.shape[0], device=x.device) - starts[batch_idx]
+        return scatter_detections(x, batch_idx, box_idx, rank, max_det), counts.unsqueeze(1).to(torch.int32)
+
+
+class DeepStreamTopK(nn.Module):
+    def __init__(self, score_threshold=0.25, k=300):
+        super().__init__()
+        self.score_threshold = score_threshold
+        self.k = k
+
+    def forward(self, x):
+        k = min(self.k, x.shape[1])
+        scores, idx = torch.topk(x[:, :, 4], k, dim=1)
+        output = torch.gather(x, 1, idx.unsqueeze(-1).expand(-1, -1, x.shape[2]))
+        return output * (scores > self.score_threshold).unsqueeze(-1).to(x.dtype)
+
+
+class DeepStreamCompact(nn.Module):
+    def __init__(self, half=False):
+        super().__init__()
+        self.half = half
+
+    def forward(self, x):
+        boxes = x[:, :, :4]
+        scores = x[:, :, 4]
+        classes = x[:, :, 5].to(torch.int32)
+        if self.half:
+            boxes = boxes.half()
+            scores = scores.half()
+        return boxes, scores, classes
+
+
+class DeepStreamInput(nn.Module):
+    # nvinfer preprocessing in the model: BGR frames with 0-255 values (uint8 or float, NCHW or NHWC) converted to the
+    # model-color-format and normalized as y = net-scale-factor * (x - offsets)
+    def __init__(self, scale_factor=1 / 255, offsets=(), input_format=0, nhwc=False):
+        super().__init__()
+        channels = 1 if input_format == 2 else 3
+        self.scale_factor = float(scale_factor)
+        self.order = [2, 1, 0] if input_format == 0 else None
+        self.nhwc = nhwc
+        self.register_buffer('offsets', torch.tensor(
+            [float(o) for o in offsets][:channels] + [0.0] * (channels - len(offsets)), dtype=torch.float32
+        ).view(1, channels, 1, 1) if any(offsets) else None)
+
+    def forward(self, x):
+        if self.nhwc:
+            x = x.permute(0, 3, 1, 2)
+        x = x.float()
+        if self.order:
+            x = x[:, self.order]
+        if self.offsets is not None:
+            x = x - self.offsets
+        return x * self.scale_factor
@@ -0,0 +1,164 @@
+import os
+
+SCALE_FACTOR = '0.0039215697906911373'
+IMAGENET_SCALE_FACTOR = '0.0173520735727919486'
+IMAGENET_OFFSETS = '123.675;116.28;103.53'
+
+LETTERBOX = {'maintain-aspect-ratio': 1, 'symmetric-padding': 1}
+LETTERBOX_CORNER = {'maintain-aspect-ratio': 1, 'symmetric-padding': 0}
+RESIZE = {'maintain-aspect-ratio': 0, 'symmetric-padding': 1}
+
+PREPROCESS = {
+    'darknet': {**RESIZE},
+    'yoloV5': {**LETTERBOX},
+    'yoloV5u': {**LETTERBOX},
+    'yoloV6': {**LETTERBOX},
+    'yoloV7': {**LETTERBOX},
+    'yoloV7_u6': {**LETTERBOX},
+    'yoloV8': {**LETTERBOX},
+    'yoloV9': {**LETTERBOX},
+    'yoloV10': {**LETTERBOX, 'cluster-mode': 4},
+    'yolo11': {**LETTERBOX},
+    'yolor': {**LETTERBOX},
+    'yolox': {**LETTERBOX_CORNER, 'net-scale-factor': '1', 'model-color-format': 1},
+    'yolox_legacy': {**LETTERBOX_CORNER, 'net-scale-factor': IMAGENET_SCALE_FACTOR, 'offsets': IMAGENET_OFFSETS},
+    'yolonas': {**LETTERBOX_CORNER},
+    'yolonas_custom': {**LETTERBOX_CORNER, 'net-scale-factor': '1'},
+    'rtmdet': {
+        **LETTERBOX, 'net-scale-factor': IMAGENET_SCALE_FACTOR, 'offsets': '103.53;116.28;123.675',
+        'model-color-format': 1
+    },
+    'goldyolo': {**LETTERBOX},
+    'damoyolo': {**RESIZE, 'net-scale-factor': '1'},
+    'ppyoloe': {**RESIZE},
+    'ppyoloe_legacy': {**RESIZE, 'net-scale-factor': IMAGENET_SCALE_FACTOR, 'offsets': IMAGENET_OFFSETS},
+    'codetr': {**LETTERBOX_CORNER},
+    'rtdetr_pytorch': {**RESIZE, 'cluster-mode': 4},
+    'rtdetr_paddle': {**RESIZE, 'cluster-mode': 4},
+    'rtdetr_ultralytics': {**RESIZE, 'cluster-mode': 4},
+    'dfine': {**RESIZE, 'cluster-mode': 4},
+}
+
+PARSE_FUNCTIONS = {
+    'default': 'NvDsInferParseYolo',
+    'nms': 'NvDsInferParseYoloNMS',
+    'topk': 'NvDsInferParseYoloTopK',
+    'compact': 'NvDsInferParseYoloCompact',
+}
+
+
+def family_preprocess(family):
+    if family not in PREPROCESS:
+        raise SystemExit(f'Invalid model family: {family} (available: {", ".join(PREPROCESS)})')
+    values = {'net-scale-factor': SCALE_FACTOR, 'offsets': '', 'model-color-format': 0, 'cluster-mode': 2}
+    values.update(PREPROCESS[family])
+    return values
+
+
+def output_layout(args):
+    if getattr(args, 'nms', False):
+        return 'nms'
+    if getattr(args, 'compact', False):
+        return 'compact'
+    if getattr(args, 'topk', False):
+        return 'topk'
+    return 'default'
+
+
+def export_precision(args):
+    if getattr(args, 'qdq', ''):
+        return 'int8'
+    if getattr(args, 'fp16', False):
+        return 'fp16'
+    return 'fp32'
+
+
+def num_classes(model_onnx):
+    import onnx
+
+    graph = onnx.shape_inference.infer_shapes(model_onnx, data_prop=True).graph
+    shapes = {v.name: v.type.tensor_type.shape for v in [*graph.input, *graph.value_info, *graph.output]}
+    classes = []
+    for node in graph.node:
+        if node.op_type == 'ArgMax' and node.input[0] in shapes:
+            dims = shapes[node.input[0]].dim
+            axis = next((a.i for a in node.attribute if a.name == 'axis'), 0)
+            if dims and dims[axis].HasField('dim_value'):
+                classes.append(dims[axis].dim_value)
+    return max(classes) if classes else 0
+
+
+def count_labels(labels_file):
+    if not labels_file or not os.path.isfile(labels_file):
+        return 0
+    with open(labels_file, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def profile_shapes(args, input_shape):
+    from deepstream_yolo.common import get_img_size
+
+    batch, channels, height, width = input_shape
+    batch = batch or 1
+    min_size = [height, width]
+    max_size = [height, width]
+    if getattr(args, 'dynamic_size', False):
+        min_size = get_img_size(args.min_size) if args.min_size else min_size
+        max_size = get_img_size(args.max_size) if args.max_size else max_size
+        if len(min_size) != 2 or len(max_size) != 2:
+            raise SystemExit('Invalid minimum or maximum size: set [H,W]')
+        if not all(a <= b <= c for a, b, c in zip(min_size, (height, width), max_size)):
+            raise SystemExit(f'Invalid dynamic size: {min_size} <= {[height, width]} <= {max_size} is not valid')
+    min_batch = getattr(args, 'min_batch', 1) if args.dynamic else batch
+    max_batch = (getattr(args, 'max_batch', 0) or batch) if args.dynamic else batch
+    return [min_batch, channels, *min_size], [batch, channels, height, width], [max_batch, channels, *max_size]
+
+
+def write_metadata(model_onnx, metadata):
+    props = [p for p in model_onnx.metadata_props if not p.key.startswith('deepstream.')]
+    del model_onnx.metadata_props[:]
+    model_onnx.metadata_props.extend(props)
+    for key, value in metadata.items():
+        model_onnx.metadata_props.add(key=f'deepstream.{key}', value=str(value))
+
+
+def export_metadata(onnx_output_file, args, input_shape, family, extra=None):
+    import onnx
+
+    model_onnx = onnx.load(onnx_output_file)
+    layout = output_layout(args)
+    dynamic_size = getattr(args, 'dynamic_size', False)
+
+    metadata = {
+        'family': family,
+        'input-shape': ','.join(str(d) for d in (
+            -1 if args.dynamic else input_shape[0], input_shape[1], *([-1, -1] if dynamic_size else input_shape[2:])
+        )),
+        'num-classes': num_classes(model_onnx) or count_labels(getattr(args, 'labels', '')),
+        'output-layout': layout,
+        'output-names': ','.join(o.name for o in model_onnx.graph.output),
+        'parse-bbox-func-name': PARSE_FUNCTIONS[layout],
+        'precision': export_precision(args),
+        **family_preprocess(family)
+    }
+    if layout == 'nms':
+        metadata['cluster-mode'] = 4
+    if args.dynamic or dynamic_size:
+        for name, shape in zip(('min', 'opt', 'max'), profile_shapes(args, input_shape)):
+            metadata[f'profile-{name}'] = ','.join(str(d) for d in shape)
+    metadata.update(extra or {})
+
+    write_metadata(model_onnx, metadata)
+    onnx.save(model_onnx, onnx_output_file)
+
+    print(f'Embedding metadata: {family}, {metadata["num-classes"]} classes, {layout} output layout')
+
+
+def model_metadata(model_onnx):
+    return {p.key[len('deepstream.'):]: p.value for p in model_onnx.metadata_props if p.key.startswith('deepstream.')}
+
+
+def read_metadata(onnx_file):
+    import onnx
+
+    return model_metadata(onnx.load(onnx_file, load_external_data=False))
@@ -0,0 +1,86 @@
+import numpy as np
+
+from deepstream_yolo.cluster import box_area, pair_iou
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def box_iou(boxes1, boxes2):
+    i, j = np.meshgrid(np.arange(len(boxes1)), np.arange(len(boxes2)), indexing='ij')
+    return pair_iou(boxes1[i.ravel()], boxes2[j.ravel()]).reshape(len(boxes1), len(boxes2))
+
+
+def box_ioa(boxes1, boxes2):
+    # Intersection over the area of boxes1 (COCO crowd regions)
+    i, j = np.meshgrid(np.arange(len(boxes1)), np.arange(len(boxes2)), indexing='ij')
+    a, b = boxes1[i.ravel()], boxes2[j.ravel()]
+    inter = np.clip(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None) * \
+        np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None)
+    return (inter / np.maximum(box_area(a), 1e-9)).reshape(len(boxes1), len(boxes2))
+
+
+def class_ious(dets, gts, crowd=False):
+    iou = box_ioa if crowd else box_iou
+    ious = iou(dets[:, :4].astype(np.float64), gts[:, :4].astype(np.float64))
+    return np.where(dets[:, 5:6] == gts[None, :, -1], ious, 0)
+
+
+def match_detections(ious, iou_thresholds):
+    # Greedy matching of the detections (sorted by score) to the best overlapped unmatched ground truth, for each IoU
+    # threshold at once
+    iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64).reshape(-1, 1)
+    matches = np.full((len(iou_thresholds), ious.shape[0]), -1, dtype=np.int64)
+    matched = np.zeros((len(iou_thresholds), ious.shape[1]), dtype=bool)
+    rows = np.arange(len(iou_thresholds))
+    for k in np.flatnonzero(ious.max(axis=1, initial=0) >= iou_thresholds.min(initial=1)):
+        candidates = np.where(matched | (ious[k] < iou_thresholds), -1, ious[k])
+        best = candidates.argmax(axis=1)
+        found = candidates[rows, best] >= 0
+        matches[found, k] = best[found]
+        matched[rows[found], best[found]] = True
+    return matches
+
+
+def average_precision(tp, scores, num_gt):
+    # COCO 101-point interpolated AP
+    order = np.argsort(-scores, kind='stable')
+    tp = tp[order]
+    ctp = np.cumsum(tp)
+    recall = ctp / num_gt
+    precision = np.maximum.accumulate((ctp / np.arange(1, len(tp) + 1))[::-1])[::-1]
+    index = np.searchsorted(recall, np.linspace(0, 1, 101), side='left')
+    return float(np.where(index < len(tp), precision[np.minimum(index, len(tp) - 1)], 0).mean())
+
+
+def mean_average_precision(detections, ground_truths, iou_thresholds=IOU_THRESHOLDS, crowds=None, max_dets=0):
+    # detections: [N, 6] (x1, y1, x2, y2, score, label), ground truths and crowd regions: [M, 5+] (x1, y1, x2, y2, ...,
+    # label), the detections matched only to crowd regions are ignored, only the top max_dets detections of each image
+    # (all classes) are matched, returns the AP of each IoU threshold
+    iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64)
+    gt_labels = np.concatenate([gts[:, -1] for gts in ground_truths]) if ground_truths else np.empty(0)
+    classes, num_gt = np.unique(gt_labels, return_counts=True)
+    if not len(classes):
+        return np.full(len(iou_thresholds), np.nan)
+
+    crowds = crowds or [np.empty((0, 5), dtype=np.float32)] * len(ground_truths)
+    scores, labels, tp, valid = [], [], [], []
+    for dets, gts, crowd in zip(detections, ground_truths, crowds):
+        dets = dets[np.argsort(-dets[:, 4], kind='stable')][:max_dets or None]
+        matches = match_detections(class_ious(dets, gts), iou_thresholds)
+        crowd_ious = class_ious(dets, crowd, crowd=True).max(axis=1, initial=0)
+        ignored = (matches < 0) & (crowd_ious >= iou_thresholds[:, None])
+        scores.append(dets[:, 4])
+        labels.append(dets[:, 5])
+        tp.append(matches >= 0)
+        valid.append(~ignored)
+    scores, labels = np.concatenate(scores), np.concatenate(labels)
+    tp, valid = np.concatenate(tp, axis=1), np.concatenate(valid, axis=1)
+
+    aps = np.zeros((len(iou_thresholds), len(classes)))
+    for c, (label, count) in enumerate(zip(classes, num_gt)):
+        mask = labels == label
+        for k in range(len(iou_thresholds)):
+            m = mask & valid[k]
+            if m.any():
+                aps[k, c] = average_precision(tp[k, m], scores[m], count)
+    return aps.mean(axis=1)
@@ -0,0 +1,180 @@
+import numpy as np
+
+from deepstream_yolo.cluster import nms, pair_iou
+from deepstream_yolo.metrics import class_ious, match_detections, mean_average_precision
+
+
+def torch_reference(model):
+    import torch
+
+    param = next(model.parameters(), None)
+    device = param.device if param is not None else torch.device('cpu')
+
+    def run(x):
+        with torch.no_grad():
+            return model(torch.from_numpy(x).to(device)).float().cpu().numpy()
+
+    return run
+
+
+def input_reference(stage, reference):
+    # Run the DeepStreamInput stage before the reference, both take the model input
+    import torch
+
+    def run(x):
+        with torch.no_grad():
+            return reference(stage(torch.from_numpy(x)).numpy())
+
+    return run
+
+
+def original_reference(model):
+    # Run the framework code without the DeepStream patches
+    from deepstream_yolo.patches import original_code
+
+    run_model = torch_reference(model)
+
+    def run(x):
+        with original_code():
+            return run_model(x)
+
+    return run
+
+
+def xywh_reference(model):
+    # Run the framework code without the DeepStream patches, the boxes come in the framework [cx, cy, w, h] format
+    run_model = original_reference(model)
+
+    def run(x):
+        y = run_model(x)
+        xy, wh = y[..., 0:2].copy(), y[..., 2:4] / 2
+        y[..., 0:2] = xy - wh
+        y[..., 2:4] = xy + wh
+        return y
+
+    return run
+
+
+def detections_array(detections):
+    # [N, 6] detections of each image padded to a [B, N, 6] array, the padding rows have -1 score
+    output = np.zeros((len(detections), max((len(d) for d in detections), default=0), 6), dtype=np.float32)
+    output[..., 4] = -1
+    for out, dets in zip(output, detections):
+        out[:len(dets)] = dets
+    return output
+
+
+def mmdet_reference(model):
+    # Run the unpatched mmdet predict (framework postprocessing and NMS of the test_cfg), without rescaling the boxes
+    import torch
+    from mmdet.structures import DetDataSample
+    from deepstream_yolo.patches import original_code
+
+    param = next(model.parameters(), None)
+    device = param.device if param is not None else torch.device('cpu')
+
+    def run(x):
+        h, w = x.shape[2:]
+        metainfo = {'img_shape': (h, w), 'ori_shape': (h, w), 'batch_input_shape': (h, w), 'pad_shape': (h, w),
+                    'scale_factor': (1.0, 1.0)}
+        samples = [DetDataSample(metainfo=metainfo) for _ in range(len(x))]
+        with torch.no_grad(), original_code():
+            results = model.predict(torch.from_numpy(x).to(device), samples, rescale=False)
+        return detections_array([torch.cat([
+            r.pred_instances.bboxes, r.pred_instances.scores[:, None], r.pred_instances.labels[:, None].float()
+        ], 1).float().cpu().numpy() for r in results])
+
+    return run
+
+
+def final_detections(dets, score_threshold, iou_threshold, max_det, topk=False):
+    dets = dets[dets[:, 4] >= score_threshold]
+    if topk:
+        dets = dets[np.argsort(-dets[:, 4], kind='stable')[:max_det]]
+    return nms(dets, iou_threshold)[:max_det]
+
+
+def parity_batches(source, onnx_file, input_shape, num):
+    from deepstream_yolo.calibration import calibration_batches
+    from deepstream_yolo.metadata import read_metadata
+    from deepstream_yolo.preprocess import preprocess_options
+
+    metadata = read_metadata(onnx_file)
+    if metadata.get('input-preprocess') == '1' and source.endswith('.idx'):
+        raise SystemExit('Parity check of the models with input preprocessing requires an images folder or list')
+    batch = input_shape[0] or 1
+    shape = (batch, *input_shape[1:])
+    dtype = np.uint8 if metadata.get('input-dtype') == 'uint8' else np.float32
+    batches, count = calibration_batches(source, shape, num, 0, dtype=dtype, **preprocess_options(metadata))
+    if count < batch:
+        raise SystemExit(f'Parity check requires at least {batch} images')
+    return batches
+
+
+def compare_detections(references, outputs, iou_threshold=0.5):
+    ious, score_deltas = [], []
+    matched, extra = 0, 0
+    for ref, out in zip(references, outputs):
+        out = out[np.argsort(-out[:, 4], kind='stable')]
+        matches = match_detections(class_ious(out, ref), [iou_threshold])[0]
+        found = matches >= 0
+        ious.append(pair_iou(out[found, :4], ref[matches[found], :4]))
+        score_deltas.append(np.abs(out[found, 4] - ref[matches[found], 4]))
+        matched += int(found.sum())
+        extra += int((~found).sum())
+
+    ious, score_deltas = np.concatenate(ious), np.concatenate(score_deltas)
+    num_references = sum(len(ref) for ref in references)
+    maps = mean_average_precision(outputs, references)
+    return {
+        'images': len(references),
+        'reference_detections': num_references,
+        'onnx_detections': sum(len(out) for out in outputs),
+        'matched': matched / num_references if num_references else 1.0,
+        'extra': extra,
+        'mean_iou': float(ious.mean()) if len(ious) else 1.0,
+        'min_iou': float(ious.min()) if len(ious) else 1.0,
+        'mean_score_delta': float(score_deltas.mean()) if len(score_deltas) else 0.0,
+        'max_score_delta': float(score_deltas.max()) if len(score_deltas) else 0.0,
+        'map50': float(maps[0]) if num_references else 1.0,
+        'map': float(maps.mean()) if num_references else 1.0
+    }
+
+
+def print_parity(report):
+    print(f'Parity ({report["images"]} images): {report["reference_detections"]} reference and '
+          f'{report["onnx_detections"]} ONNX detections, {report["matched"] * 100:.1f}% matched, '
+          f'{report["extra"]} extra')
+    print(f'  IoU mean {report["mean_iou"]:.4f}, min {report["min_iou"]:.4f}; score delta mean '
+          f'{report["mean_score_delta"]:.5f}, max {report["max_score_delta"]:.5f}')
+    print(f'  mAP50 {report["map50"]:.4f}, mAP50-95 {report["map"]:.4f} (reference as ground truth)')
+
+
+def check_parity(onnx_file, reference, args, input_shape):
+    from deepstream_yolo.runtime import create_session
+    from deepstream_yolo.tiling import output_detections
+
+    print(f'Checking the ONNX parity on {args.parity}')
+    score_threshold = getattr(args, 'score_thres', 0.25)
+    iou_threshold = getattr(args, 'iou_thres', 0.45)
+    max_det = getattr(args, 'max_det', 300)
+    topk = getattr(args, 'topk', False)
+
+    session = create_session(onnx_file)
+    input_name = session.get_inputs()[0].name
+    output_names = [o.name for o in session.get_outputs()]
+
+    references, outputs = [], []
+    for x in parity_batches(args.parity, onnx_file, input_shape, args.parity_num)():
+        y = session.run(None, {input_name: x})
+        outputs += [final_detections(d, score_threshold, iou_threshold, max_det, topk)
+                    for d in output_detections(y, output_names)]
+        references += [final_detections(d, score_threshold, iou_threshold, max_det, topk)
+                       for d in np.asarray(reference(x), dtype=np.float32)]
+
+    report = compare_detections(references, outputs)
+    print_parity(report)
+    if report['map'] < args.parity_thres:
+        raise SystemExit(f'Parity check failed: mAP50-95 {report["map"]:.4f} < {args.parity_thres} (the exported '
+                         'model does not match the framework model)')
+    return report
@@ -0,0 +1,129 @@
+import numpy as np
+
+OBJECT_DTYPE = np.dtype([
+    ('classId', np.uint32), ('left', np.float32), ('top', np.float32), ('width', np.float32), ('height', np.float32),
+    ('detectionConfidence', np.float32)
+])
+
+
+def clamp(val, min_val, max_val):
+    val = np.where(np.float32(min_val) < val, val, np.float32(min_val))
+    return np.where(val < np.float32(max_val), val, np.float32(max_val))
+
+
+def class_thresholds(classes, thresholds):
+    if np.ndim(thresholds) == 0:
+        return np.full(classes.shape, thresholds, dtype=np.float32), np.ones(classes.shape, dtype=bool)
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    known = (classes >= 0) & (classes < len(thresholds))
+    return thresholds[np.where(known, classes, 0)] if len(thresholds) else np.zeros(classes.shape, np.float32), known
+
+
+def split_batch(keep, objects):
+    counts = keep.reshape(-1, keep.shape[-1]).sum(axis=1)
+    return np.split(objects, np.cumsum(counts)[:-1])
+
+
+def decode_tensor(boxes, scores, classes, net_w, net_h, thresholds, valid=None):
+    boxes = np.asarray(boxes).astype(np.float32)
+    scores = np.asarray(scores).astype(np.float32)
+    classes = np.asarray(classes).astype(np.int64)
+
+    batched = scores.ndim == 2
+    if not batched:
+        boxes, scores, classes = boxes[None], scores[None], classes[None]
+        valid = valid[None] if valid is not None else None
+
+    threshold, known = class_thresholds(classes, thresholds)
+    keep = known & ~(scores < threshold)
+    if valid is not None:
+        keep &= valid
+
+    x1 = clamp(boxes[..., 0], 0, net_w)
+    y1 = clamp(boxes[..., 1], 0, net_h)
+    x2 = clamp(boxes[..., 2], 0, net_w)
+    y2 = clamp(boxes[..., 3], 0, net_h)
+    width = clamp(x2 - x1, 0, net_w)
+    height = clamp(y2 - y1, 0, net_h)
+
+    keep &= ~(width < 1) & ~(height < 1)
+
+    objects = np.empty(int(keep.sum()), dtype=OBJECT_DTYPE)
+    objects['classId'] = classes[keep]
+    objects['left'] = x1[keep]
+    objects['top'] = y1[keep]
+    objects['width'] = width[keep]
+    objects['height'] = height[keep]
+    objects['detectionConfidence'] = scores[keep]
+
+    objects = split_batch(keep, objects)
+    return objects if batched else objects[0]
+
+
+def split_output(output):
+    output = np.asarray(output).astype(np.float32)
+    return output[..., :4], output[..., 4], output[..., 5].astype(np.int32)
+
+
+def parse_yolo(output, net_w, net_h, thresholds):
+    boxes, scores, classes = split_output(output)
+    return decode_tensor(boxes, scores, classes, net_w, net_h, thresholds)
+
+
+def parse_yolo_nms(output, num_detections, net_w, net_h, thresholds):
+    boxes, scores, classes = split_output(output)
+    num_detections = np.clip(np.asarray(num_detections).reshape(scores.shape[:-1] + (1,)), 0, scores.shape[-1])
+    valid = np.arange(scores.shape[-1]) < num_detections
+    return decode_tensor(boxes, scores, classes, net_w, net_h, thresholds, valid=valid)
+
+
+def parse_yolo_topk(output, net_w, net_h, thresholds):
+    boxes, scores, classes = split_output(output)
+    min_threshold = np.float32(np.min(thresholds)) if np.size(thresholds) else np.float32(0.0)
+    valid = np.logical_and.accumulate(~((scores < min_threshold) | (scores <= 0)), axis=-1)
+    return decode_tensor(boxes, scores, classes, net_w, net_h, thresholds, valid=valid)
+
+
+def parse_yolo_compact(boxes, scores, classes, net_w, net_h, thresholds):
+    return decode_tensor(boxes, scores, classes, net_w, net_h, thresholds)
+
+
+def parse_yolo_loop(output, net_w, net_h, thresholds):
+    output = np.asarray(output, dtype=np.float32)
+    if output.ndim == 3:
+        return [parse_yolo_loop(o, net_w, net_h, thresholds) for o in output]
+
+    zero, w, h = np.float32(0), np.float32(net_w), np.float32(net_h)
+
+    def clamp_value(val, min_val, max_val):
+        val = val if min_val < val else min_val
+        return val if val < max_val else max_val
+
+    objects = []
+    for row in output:
+        max_prob = row[4]
+        max_index = int(row[5])
+
+        if np.ndim(thresholds) == 0:
+            threshold = thresholds
+        elif 0 <= max_index < len(thresholds):
+            threshold = thresholds[max_index]
+        else:
+            continue
+
+        if max_prob < np.float32(threshold):
+            continue
+
+        x1 = clamp_value(row[0], zero, w)
+        y1 = clamp_value(row[1], zero, h)
+        x2 = clamp_value(row[2], zero, w)
+        y2 = clamp_value(row[3], zero, h)
+        width = clamp_value(x2 - x1, zero, w)
+        height = clamp_value(y2 - y1, zero, h)
+
+        if width < 1 or height < 1:
+            continue
+
+        objects.append((max_index, x1, y1, width, height, max_prob))
+
+    return np.array(objects, dtype=OBJECT_DTYPE)
@@ -0,0 +1,41 @@
+import types
+from contextlib import contextmanager
+
+original_codes = {}
+original_methods = {}
+
+
+def replace_code(func, replacement):
+    original_codes.setdefault(func, func.__code__)
+    func.__code__ = replacement.__code__
+
+
+def replace_method(obj, name, replacement):
+    # Instance method patch, the original is the instance attribute (if any) or the class method
+    original_methods.setdefault((id(obj), name), (obj, name, obj.__dict__.get(name)))
+    setattr(obj, name, types.MethodType(replacement, obj))
+
+
+def set_method(obj, name, method):
+    if method is None:
+        if name in obj.__dict__:
+            delattr(obj, name)
+    else:
+        setattr(obj, name, method)
+
+
+@contextmanager
+def original_code():
+    patched = {func: func.__code__ for func in original_codes}
+    patched_methods = [(obj, name, obj.__dict__.get(name)) for obj, name, _ in original_methods.values()]
+    for func, code in original_codes.items():
+        func.__code__ = code
+    for obj, name, method in original_methods.values():
+        set_method(obj, name, method)
+    try:
+        yield
+    finally:
+        for func, code in patched.items():
+            func.__code__ = code
+        for obj, name, method in patched_methods:
+            set_method(obj, name, method)
@@ -0,0 +1,162 @@
+import threading
+
+import numpy as np
+
+INPUT_FORMATS = {'rgb': 0, 'bgr': 1, 'gray': 2}
+
+# nvinfer scaling-filter values
+SCALING_FILTERS = ('nearest', 'bilinear', 'cubic', 'super', 'lanczos')
+
+
+def get_offsets(offsets, input_format=0):
+    # nvinfer offsets are per network input channel, in the 0-255 range of the pixels
+    channels = 1 if input_format == 2 else 3
+    offsets = [float(o) for o in offsets][:channels]
+    return np.array(offsets + [0.0] * (channels - len(offsets)), dtype=np.float32)
+
+
+def convert_color(img, input_format=0):
+    import cv2
+
+    if input_format == 0:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    if input_format == 2:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)[..., None]
+    return img
+
+
+def normalize_image(img, scale_factor, offsets=(), input_format=0):
+    # y = net-scale-factor * (x - offsets)
+    out = img.astype(np.float32) - get_offsets(offsets, input_format)
+    out *= np.float32(scale_factor)
+    return np.ascontiguousarray(out.transpose(2, 0, 1))
+
+
+def source_size(image_h, image_w):
+    # nvinfer scales the source rounded down to even width and height
+    return max(image_h - image_h % 2, 1), max(image_w - image_w % 2, 1)
+
+
+def letterbox_transform(image_h, image_w, input_h, input_w, maintain_aspect_ratio=1, symmetric_padding=1):
+    # nvinfer scaling: the scaled size is truncated and the padding is split only with symmetric-padding, returns
+    # (scale_x, scale_y, pad_x, pad_y, resized_w, resized_h)
+    src_h, src_w = source_size(image_h, image_w)
+    resized_w, resized_h = input_w, input_h
+    if maintain_aspect_ratio:
+        if input_w * src_h / src_w <= input_h:
+            resized_h = max(int(input_w * src_h / src_w), 1)
+        else:
+            resized_w = max(int(input_h * src_w / src_h), 1)
+    pad_x = (input_w - resized_w) // 2 if maintain_aspect_ratio and symmetric_padding else 0
+    pad_y = (input_h - resized_h) // 2 if maintain_aspect_ratio and symmetric_padding else 0
+    return resized_w / src_w, resized_h / src_h, pad_x, pad_y, resized_w, resized_h
+
+
+def preprocess_options(metadata):
+    # Preprocessor options from the ONNX metadata (config_infer keys)
+    return {
+        'scale_factor': float(metadata.get('net-scale-factor', 1 / 255)),
+        'offsets': [float(o) for o in metadata.get('offsets', '').split(';') if o],
+        'input_format': int(metadata.get('model-color-format', 0)),
+        'maintain_aspect_ratio': int(metadata.get('maintain-aspect-ratio', 1)),
+        'symmetric_padding': int(metadata.get('symmetric-padding', 1)),
+        'scaling_filter': int(metadata.get('scaling-filter', 1)),
+        'layout': 'NHWC' if int(metadata.get('network-input-order', 0)) == 1 else 'NCHW'
+    }
+
+
+class Preprocessor:
+    # nvinfer preprocessing into preallocated buffers: the image is resized into a uint8 canvas (padding included) and
+    # the channel order, net-scale-factor and offsets are applied while converting the canvas to the output tensor
+    def __init__(self, input_h, input_w, batch_size=1, scale_factor=1 / 255, offsets=(), input_format=0,
+                 maintain_aspect_ratio=1, symmetric_padding=1, scaling_filter=1, dtype=np.float32, layout='NCHW'):
+        if input_format not in INPUT_FORMATS.values():
+            raise ValueError(f'Invalid model-color-format: {input_format}')
+        if not 0 <= scaling_filter < len(SCALING_FILTERS):
+            raise ValueError(f'Invalid scaling-filter: {scaling_filter}')
+        if layout not in ('NCHW', 'NHWC'):
+            raise ValueError(f'Invalid layout: {layout}')
+
+        self.input_h, self.input_w = input_h, input_w
+        self.channels = 1 if input_format == 2 else 3
+        self.order = [2, 1, 0] if input_format == 0 else list(range(self.channels))
+        self.scale_factor = np.float32(scale_factor)
+        self.offsets = get_offsets(offsets, input_format)
+        self.input_format = input_format
+        self.maintain_aspect_ratio = maintain_aspect_ratio
+        self.symmetric_padding = symmetric_padding
+        self.scaling_filter = scaling_filter
+        self.dtype = np.dtype(dtype)
+        self.layout = layout
+
+        shape = (input_h, input_w, self.channels) if layout == 'NHWC' else (self.channels, input_h, input_w)
+        self.tensor = np.zeros((batch_size, *shape), dtype=self.dtype)
+        self.local = threading.local()
+
+    def buffers(self):
+        # Canvas (and float32 plane of the non float32 outputs) of the calling thread
+        if not hasattr(self.local, 'canvas'):
+            self.local.canvas = np.zeros((self.input_h, self.input_w, self.channels), dtype=np.uint8)
+            self.local.plane = np.empty((self.input_h, self.input_w), dtype=np.float32)
+        return self.local.canvas, self.local.plane
+
+    def letterbox(self, img, canvas):
+        import cv2
+
+        transform = letterbox_transform(*img.shape[:2], self.input_h, self.input_w, self.maintain_aspect_ratio,
+                                        self.symmetric_padding)
+        _, _, pad_x, pad_y, resized_w, resized_h = transform
+        src_h, src_w = source_size(*img.shape[:2])
+
+        src = img[:src_h, :src_w]
+        if self.channels == 1:
+            src = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY) if src.ndim == 3 and src.shape[2] == 3 else src
+            src = src.reshape(src_h, src_w)
+
+        canvas[:pad_y] = 0
+        canvas[pad_y + resized_h:] = 0
+        canvas[:, :pad_x] = 0
+        canvas[:, pad_x + resized_w:] = 0
+        dst = canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w]
+        dst = dst[..., 0] if self.channels == 1 else dst
+        if src.shape[:2] == dst.shape[:2]:
+            dst[...] = src
+        else:
+            interpolation = (cv2.INTER_NEAREST, cv2.INTER_LINEAR, cv2.INTER_CUBIC, cv2.INTER_AREA, cv2.INTER_LANCZOS4)
+            cv2.resize(src, (resized_w, resized_h), dst=dst, interpolation=interpolation[self.scaling_filter])
+        return transform
+
+    def convert(self, canvas, out, plane):
+        # uint8 -> float with the channel order, net-scale-factor and offsets, without temporary arrays
+        for c, k in enumerate(self.order):
+            dst = out[..., c] if self.layout == 'NHWC' else out[c]
+            if self.dtype == np.uint8:
+                dst[...] = canvas[..., k]
+                continue
+            tmp = dst if self.dtype == np.float32 and self.layout == 'NCHW' else plane
+            np.subtract(canvas[..., k], self.offsets[c], out=tmp, dtype=np.float32)
+            np.multiply(tmp, self.scale_factor, out=tmp)
+            if tmp is not dst:
+                dst[...] = tmp
+        return out
+
+    def prepare(self, img, out=None):
+        out = np.empty(self.tensor.shape[1:], dtype=self.dtype) if out is None else out
+        canvas, plane = self.buffers()
+        transform = self.letterbox(img, canvas)
+        return self.convert(canvas, out, plane), transform
+
+    def __call__(self, images):
+        # Batch in the preallocated tensor (reused by the next call)
+        if len(images) > len(self.tensor):
+            raise ValueError(f'Batch of {len(images)} images exceeds the batch-size {len(self.tensor)}')
+        transforms = [self.prepare(img, self.tensor[i])[1] for i, img in enumerate(images)]
+        return self.tensor[:len(images)], transforms
+
+
+def restore_boxes(dets, transform, image_h, image_w):
+    scale_x, scale_y, pad_x, pad_y = transform[:4]
+    dets = dets.copy()
+    dets[:, [0, 2]] = np.clip((dets[:, [0, 2]] - pad_x) / scale_x, 0, image_w)
+    dets[:, [1, 3]] = np.clip((dets[:, [1, 3]] - pad_y) / scale_y, 0, image_h)
+    return dets
@@ -0,0 +1,201 @@
+import json
+
+import numpy as np
+
+from deepstream_yolo.fp16 import name_nodes, tail_nodes
+
+ELEMENTWISE_OPS = (
+    'Add', 'Sub', 'Mul', 'Div', 'Pow', 'Sqrt', 'Exp', 'Log', 'Neg', 'Abs', 'Sigmoid', 'Relu', 'LeakyRelu',
+    'HardSigmoid', 'HardSwish', 'Tanh', 'Erf', 'Clip', 'Max', 'Min', 'Where', 'Greater', 'Less', 'Equal', 'Not', 'And',
+    'Or', 'Elu', 'Selu', 'PRelu', 'Gelu', 'Mish', 'Softplus', 'Reciprocal', 'Floor', 'Ceil', 'Round', 'Sin', 'Cos'
+)
+
+REDUCE_OPS = (
+    'ReduceMean', 'ReduceSum', 'ReduceMax', 'ReduceMin', 'ReduceProd', 'ReduceL2', 'ArgMax', 'ArgMin', 'TopK',
+    'GlobalAveragePool', 'GlobalMaxPool'
+)
+
+DTYPE_BYTES = {1: 4, 2: 1, 3: 1, 5: 2, 6: 4, 7: 8, 9: 1, 10: 2, 11: 8, 16: 2}
+
+
+def value_shapes(graph):
+    shapes = {}
+    for value in [*graph.input, *graph.value_info, *graph.output]:
+        tensor_type = value.type.tensor_type
+        dims = [d.dim_value if d.HasField('dim_value') else None for d in tensor_type.shape.dim]
+        shapes[value.name] = (dims, tensor_type.elem_type)
+    for init in graph.initializer:
+        shapes[init.name] = (list(init.dims), init.data_type)
+    for node in graph.node:
+        if node.op_type == 'Constant':
+            for attr in node.attribute:
+                if attr.name == 'value':
+                    shapes[node.output[0]] = (list(attr.t.dims), attr.t.data_type)
+    return shapes
+
+
+def numel(shape):
+    if shape is None or any(d is None for d in shape[0]):
+        return 0
+    return int(np.prod(shape[0], dtype=np.int64))
+
+
+def nbytes(shape):
+    return numel(shape) * DTYPE_BYTES.get(shape[1], 4) if shape else 0
+
+
+def get_attr(node, name, default=None):
+    import onnx
+    for attr in node.attribute:
+        if attr.name == name:
+            return onnx.helper.get_attribute_value(attr)
+    return default
+
+
+def node_flops(node, shapes):
+    inputs = [shapes.get(name) for name in node.input]
+    output = shapes.get(node.output[0]) if node.output else None
+
+    if node.op_type == 'Conv' and len(inputs) > 1 and inputs[1]:
+        weight = inputs[1][0]
+        return 2 * numel(output) * int(np.prod(weight[1:]))
+    if node.op_type == 'ConvTranspose' and len(inputs) > 1 and inputs[1]:
+        weight = inputs[1][0]
+        return 2 * numel(inputs[0]) * int(np.prod(weight[1:]))
+    if node.op_type in ('MatMul', 'Gemm') and inputs[0] and inputs[0][0]:
+        k = inputs[0][0][-2] if node.op_type == 'Gemm' and get_attr(node, 'transA', 0) else inputs[0][0][-1]
+        return 2 * numel(output) * (k or 0)
+    if node.op_type in ('MaxPool', 'AveragePool'):
+        return numel(output) * int(np.prod(get_attr(node, 'kernel_shape', [1])))
+    if node.op_type in ('Softmax', 'LogSoftmax', 'LayerNormalization', 'BatchNormalization', 'InstanceNormalization'):
+        return 5 * numel(output)
+    if node.op_type in ELEMENTWISE_OPS:
+        return numel(output)
+    if node.op_type in REDUCE_OPS:
+        return numel(inputs[0]) if inputs else 0
+    return 0
+
+
+def peak_activation_bytes(graph, shapes):
+    initializers = {i.name for i in graph.initializer}
+    outputs = {o.name for o in graph.output}
+
+    last_use = {}
+    for i, node in enumerate(graph.node):
+        for name in node.input:
+            last_use[name] = i
+
+    live = {i.name: nbytes(shapes.get(i.name)) for i in graph.input if i.name not in initializers}
+    current = peak = sum(live.values())
+    for i, node in enumerate(graph.node):
+        for name in node.output:
+            if name and name not in live:
+                live[name] = nbytes(shapes.get(name))
+                current += live[name]
+        peak = max(peak, current)
+        for name in list(live):
+            if last_use.get(name, -1) <= i and name not in outputs:
+                current -= live.pop(name)
+
+    return peak
+
+
+def fix_input_shape(model_onnx, input_shape):
+    graph_input = model_onnx.graph.input[0]
+    dims = graph_input.type.tensor_type.shape.dim
+    for i, dim in enumerate(dims):
+        if not dim.HasField('dim_value'):
+            value = input_shape[i] if input_shape and i < len(input_shape) else 1
+            dim.Clear()
+            dim.dim_value = int(value)
+    for output in model_onnx.graph.output:
+        for dim in output.type.tensor_type.shape.dim:
+            if not dim.HasField('dim_value'):
+                dim.Clear()
+    del model_onnx.graph.value_info[:]
+    return [d.dim_value for d in dims]
+
+
+def profile_input_shape(onnx_file, batch=1, size=None):
+    # Profile input shape in the layout of the model input (NCHW or NHWC)
+    import onnx
+    from deepstream_yolo.runtime import is_nhwc
+
+    model_onnx = onnx.load(onnx_file, load_external_data=False)
+    dims = [d.dim_value if d.HasField('dim_value') else d.dim_param
+            for d in model_onnx.graph.input[0].type.tensor_type.shape.dim]
+    if len(dims) != 4 or not size:
+        return [batch]
+    nhwc = is_nhwc(dims)
+    channels = dims[3] if nhwc else dims[1]
+    channels = channels if isinstance(channels, int) and channels > 0 else 3
+    return [batch, *size, channels] if nhwc else [batch, channels, *size]
+
+
+def profile_graph(onnx_file, input_shape=None):
+    import onnx
+
+    model_onnx = onnx.load(onnx_file)
+    input_shape = fix_input_shape(model_onnx, input_shape)
+    model_onnx = onnx.shape_inference.infer_shapes(model_onnx)
+
+    graph = model_onnx.graph
+    name_nodes(graph)
+    shapes = value_shapes(graph)
+    initializers = {i.name: i for i in graph.initializer}
+    tail = set(tail_nodes(graph))
+
+    ops = {}
+    parts = {'backbone': {'nodes': 0, 'flops': 0, 'params': 0}, 'tail': {'nodes': 0, 'flops': 0, 'params': 0}}
+    for node in graph.node:
+        flops = node_flops(node, shapes)
+        params = [initializers[name] for name in node.input if name in initializers]
+        param_count = sum(int(np.prod(p.dims)) for p in params)
+        param_bytes = sum(nbytes((list(p.dims), p.data_type)) for p in params)
+
+        op = ops.setdefault(node.op_type, {'nodes': 0, 'flops': 0, 'params': 0, 'param_bytes': 0})
+        op['nodes'] += 1
+        op['flops'] += flops
+        op['params'] += param_count
+        op['param_bytes'] += param_bytes
+
+        part = parts['tail' if node.name in tail else 'backbone']
+        part['nodes'] += 1
+        part['flops'] += flops
+        part['params'] += param_count
+
+    return {
+        'model': onnx_file,
+        'input': input_shape,
+        'nodes': len(graph.node),
+        'flops': sum(op['flops'] for op in ops.values()),
+        'params': sum(int(np.prod(i.dims)) for i in graph.initializer),
+        'param_bytes': sum(nbytes((list(i.dims), i.data_type)) for i in graph.initializer),
+        'peak_activation_bytes': peak_activation_bytes(graph, shapes),
+        'parts': parts,
+        'ops': dict(sorted(ops.items(), key=lambda x: -x[1]['flops']))
+    }
+
+
+def print_profile(profile, top=10):
+    total = max(profile['flops'], 1)
+    print(f'Profile: {profile["input"]} input, {profile["flops"] / 1e9:.2f} GFLOPs, {profile["params"] / 1e6:.2f}M '
+          f'params ({profile["param_bytes"] / 2 ** 20:.1f} MB), {profile["peak_activation_bytes"] / 2 ** 20:.1f} MB '
+          f'peak activation memory')
+    print(f'  {"":>20} {"nodes":>6} {"GFLOPs":>9} {"%":>6} {"params":>11}')
+    for name, part in profile['parts'].items():
+        print(f'  {name:>20} {part["nodes"]:6d} {part["flops"] / 1e9:9.3f} {100 * part["flops"] / total:6.2f} '
+              f'{part["params"]:11d}')
+    print(f'  {"op":>20} {"nodes":>6} {"GFLOPs":>9} {"%":>6} {"params":>11}')
+    for name, op in list(profile['ops'].items())[:top]:
+        print(f'  {name:>20} {op["nodes"]:6d} {op["flops"] / 1e9:9.3f} {100 * op["flops"] / total:6.2f} '
+              f'{op["params"]:11d}')
+
+
+def export_profile(onnx_file, profile_file, input_shape=None, top=10):
+    profile = profile_graph(onnx_file, input_shape)
+    print_profile(profile, top=top)
+    with open(profile_file, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    print(f'Profile: {profile_file}')
+    return profile
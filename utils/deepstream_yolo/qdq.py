@@ -0,0 +1,99 @@
+import numpy as np
+
+from deepstream_yolo.fp16 import name_nodes, tail_nodes, weighted_nodes
+
+
+def quantized_convs(graph):
+    weighted = weighted_nodes(graph)
+    tail = set(tail_nodes(graph))
+    initializers = {i.name for i in graph.initializer}
+    return [
+        node for node in graph.node
+        if node.op_type == 'Conv' and node.name in weighted and node.name not in tail and node.input[1] in initializers
+    ]
+
+
+def activation_amax(onnx_file, tensors, calib, input_shape, num=512, method='entropy'):
+    import onnx
+    from deepstream_yolo.calibration import calibration_batches
+    from deepstream_yolo.entropy import add_tensor_outputs, collect_amax, collect_histograms, entropy_amax
+    from deepstream_yolo.runtime import create_session
+
+    model_onnx, names = add_tensor_outputs(onnx.load(onnx_file), tail=True, tensors=set(tensors))
+    session = create_session(model_onnx.SerializeToString())
+    batches, num_images = calibration_batches(calib, input_shape, num=num)
+    if num_images < input_shape[0]:
+        raise SystemExit('Not enough calibration images')
+
+    print(f'Calibrating {len(names)} activations: {num_images} images ({method})')
+    amax = collect_amax(session, batches, names)
+    if method == 'entropy':
+        hists = collect_histograms(session, batches, names, amax)
+        amax = {name: entropy_amax(hists[name], amax[name]) for name in names}
+    return amax
+
+
+def make_qdq(graph, name, scale, axis=None):
+    from onnx import helper, numpy_helper
+
+    scale = np.maximum(np.asarray(scale, dtype=np.float32), np.float32(1e-8))
+    zero_point = np.zeros(scale.shape, dtype=np.int8)
+    graph.initializer.extend([
+        numpy_helper.from_array(scale, f'{name}_scale'), numpy_helper.from_array(zero_point, f'{name}_zero_point')
+    ])
+
+    kwargs = {} if axis is None else {'axis': axis}
+    inputs = [f'{name}_scale', f'{name}_zero_point']
+    nodes = [
+        helper.make_node('QuantizeLinear', [name, *inputs], [f'{name}_quantized'], name=f'{name}_QuantizeLinear',
+                         **kwargs),
+        helper.make_node('DequantizeLinear', [f'{name}_quantized', *inputs], [f'{name}_dequantized'],
+                         name=f'{name}_DequantizeLinear', **kwargs)
+    ]
+    return nodes, f'{name}_dequantized'
+
+
+def insert_qdq(model_onnx, amax):
+    from onnx import numpy_helper
+
+    graph = model_onnx.graph
+    name_nodes(graph)
+    convs = {node.name for node in quantized_convs(graph)}
+    initializers = {i.name: i for i in graph.initializer}
+
+    quantized = {}
+    nodes = []
+    for node in list(graph.node):
+        if node.name in convs and node.input[0] in amax:
+            x = node.input[0]
+            if x not in quantized:
+                qdq, quantized[x] = make_qdq(graph, x, amax[x] / 127)
+                nodes += qdq
+            node.input[0] = quantized[x]
+
+            w = node.input[1]
+            weight = numpy_helper.to_array(initializers[w])
+            scale = np.abs(weight).reshape(weight.shape[0], -1).max(axis=1) / 127
+            qdq, node.input[1] = make_qdq(graph, w, scale, axis=0)
+            nodes += qdq
+        nodes.append(node)
+
+    del graph.node[:]
+    graph.node.extend(nodes)
+
+    return len(convs)
+
+
+def export_qdq(onnx_output_file, calib, input_shape, num=512, method='entropy'):
+    import onnx
+
+    model_onnx = onnx.load(onnx_output_file)
+    name_nodes(model_onnx.graph)
+    tensors = [node.input[0] for node in quantized_convs(model_onnx.graph)]
+
+    amax = activation_amax(onnx_output_file, tensors, calib, input_shape, num, method)
+    amax = {name: value for name, value in amax.items() if value > 0}
+
+    count = insert_qdq(model_onnx, amax)
+    print(f'Inserting Q/DQ nodes: {count} Conv layers (per-channel weights, per-tensor activations)')
+    onnx.save(model_onnx, onnx_output_file)
@@ -0,0 +1,42 @@
+import importlib
+
+FAMILIES = {
+    'yoloV5': 'export_yoloV5',
+    'yoloV5u': 'export_yoloV5u',
+    'yoloV6': 'export_yoloV6',
+    'yoloV7': 'export_yoloV7',
+    'yoloV7_u6': 'export_yoloV7_u6',
+    'yoloV8': 'export_yoloV8',
+    'yoloV9': 'export_yoloV9',
+    'yoloV10': 'export_yoloV10',
+    'yolo11': 'export_yolo11',
+    'yolor': 'export_yolor',
+    'yolox': 'export_yolox',
+    'yolonas': 'export_yolonas',
+    'rtmdet': 'export_rtmdet',
+    'goldyolo': 'export_goldyolo',
+    'damoyolo': 'export_damoyolo',
+    'ppyoloe': 'export_ppyoloe',
+    'codetr': 'export_codetr',
+    'rtdetr_pytorch': 'export_rtdetr_pytorch',
+    'rtdetr_paddle': 'export_rtdetr_paddle',
+    'rtdetr_ultralytics': 'export_rtdetr_ultralytics',
+    'dfine': 'export_dfine',
+}
+
+
+def get_family(name):
+    if name not in FAMILIES:
+        raise SystemExit(f'Invalid model family: {name} (available: {", ".join(FAMILIES)})')
+    try:
+        return importlib.import_module(FAMILIES[name])
+    except ImportError as e:
+        raise SystemExit(f'Cannot load {name} exporter: {e}')
+
+
+def export_family(name, argv, labels=None):
+    module = get_family(name)
+    args = module.parse_args(argv)
+    if labels is not None:
+        args.labels = labels
+    return module.main(args)
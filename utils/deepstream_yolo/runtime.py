@@ -0,0 +1,63 @@
+import numpy as np
+
+ORT_TYPES = {
+    'tensor(float)': np.float32, 'tensor(float16)': np.float16, 'tensor(double)': np.float64,
+    'tensor(uint8)': np.uint8, 'tensor(int8)': np.int8, 'tensor(int32)': np.int32, 'tensor(int64)': np.int64
+}
+
+
+def create_session(onnx_file, threads=0, providers=None):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    if threads > 0:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    return ort.InferenceSession(onnx_file, sess_options=options, providers=providers or ['CPUExecutionProvider'])
+
+
+def is_nhwc(shape):
+    return len(shape) == 4 and shape[3] in (1, 3) and shape[1] not in (1, 3)
+
+
+def input_shape(session, batch=1, size=None):
+    shape = list(session.get_inputs()[0].shape)
+    if len(shape) != 4:
+        raise ValueError(f'Unsupported input shape {shape}')
+
+    spatial = (1, 2) if is_nhwc(shape) else (2, 3)
+    channels = 3 if spatial == (1, 2) else 1
+
+    if isinstance(shape[0], int) and shape[0] != batch:
+        raise ValueError(f'Static batch-size {shape[0]} model cannot run with batch-size {batch}')
+    shape[0] = batch
+
+    for i, axis in enumerate(spatial):
+        if not isinstance(shape[axis], int):
+            if not size:
+                raise ValueError('Set the input size of the dynamic model')
+            shape[axis] = size[i]
+        elif size and shape[axis] != size[i]:
+            raise ValueError(f'Static input size {shape[spatial[0]]}x{shape[spatial[1]]} model cannot run with size '
+                             f'{size[0]}x{size[1]}')
+
+    if not isinstance(shape[channels], int):
+        shape[channels] = 3
+
+    return shape
+
+
+def input_size(shape):
+    return tuple(shape[1:3]) if is_nhwc(shape) else tuple(shape[2:4])
+
+
+def input_dtype(session):
+    return ORT_TYPES.get(session.get_inputs()[0].type, np.float32)
+
+
+def random_input(session, shape, rng=None):
+    rng = rng or np.random.default_rng(0)
+    dtype = input_dtype(session)
+    if np.issubdtype(dtype, np.integer):
+        return rng.integers(0, 256, shape).astype(dtype)
+    return rng.random(shape, dtype=np.float32).astype(dtype)
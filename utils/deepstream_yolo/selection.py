@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from deepstream_yolo.preprocess import Preprocessor
+
+
+def image_features(img, size=64, bins=16):
+    import cv2
+
+    small = cv2.resize(img, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32) / 255
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+
+    hist = np.histogram(gray, bins=bins, range=(0, 1))[0] / gray.size
+    hue = np.histogram(hsv[..., 0], bins=bins, range=(0, 360), weights=hsv[..., 1])[0] / gray.size
+    grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0)
+    grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1)
+    edges = np.sqrt(grad_x ** 2 + grad_y ** 2)
+
+    h, w = img.shape[:2]
+    stats = [
+        *small.reshape(-1, 3).mean(axis=0), *small.reshape(-1, 3).std(axis=0), hsv[..., 1].mean(), edges.mean(),
+        (edges > 0.5).mean(), np.log(w / h)
+    ]
+
+    return np.concatenate([stats, hist, hue]).astype(np.float32)
+
+
+def detection_features(output, num_classes, score_threshold=0.25):
+    output = output.reshape(-1, output.shape[-1])
+    scores = output[:, 4]
+    keep = scores >= score_threshold
+    labels = output[keep, 5].astype(np.int64)
+    labels = labels[(labels >= 0) & (labels < num_classes)]
+
+    classes = np.log1p(np.bincount(labels, minlength=num_classes)).astype(np.float32)
+    wh = np.clip(output[keep, 2:4] - output[keep, 0:2], 1, None)
+    areas = np.log(wh[:, 0] * wh[:, 1]) if len(wh) else np.zeros(1, np.float32)
+    top = np.sort(scores)[::-1][:100]
+
+    stats = [np.log1p(keep.sum()), top.mean() if len(top) else 0.0, *np.percentile(areas, [10, 50, 90])]
+
+    return np.concatenate([stats, classes]).astype(np.float32)
+
+
+def read_image_features(image):
+    import cv2
+
+    img = cv2.imread(image)
+    return None if img is None else image_features(img)
+
+
+def pool_features(images, workers=1):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_image_features, images, chunksize=16))
+
+
+def model_features(images, onnx_file, num_classes, score_threshold=0.25, size=None, threads=0):
+    import cv2
+    from deepstream_yolo.metadata import read_metadata
+    from deepstream_yolo.preprocess import preprocess_options
+    from deepstream_yolo.runtime import create_session, input_dtype, input_shape, input_size
+    from deepstream_yolo.tiling import output_detections
+
+    session = create_session(onnx_file, threads)
+    input_name = session.get_inputs()[0].name
+    output_names = [o.name for o in session.get_outputs()]
+    model_batch = session.get_inputs()[0].shape[0]
+    batch = model_batch if isinstance(model_batch, int) else 1
+    input_h, input_w = input_size(input_shape(session, batch, size))
+    options = preprocess_options(read_metadata(onnx_file))
+    preprocessor = Preprocessor(input_h, input_w, batch, dtype=input_dtype(session), **options)
+
+    features = []
+    for i, image in enumerate(images):
+        img = cv2.imread(image)
+        if img is None:
+            features.append(None)
+            continue
+        preprocessor.prepare(img, preprocessor.tensor[0])
+        outputs = session.run(None, {input_name: preprocessor.tensor})
+        output = output_detections(outputs, output_names)[0]
+        features.append(detection_features(output, num_classes, score_threshold))
+        print(f'\rProgress: {i + 1}/{len(images)}', end='', flush=True)
+    print()
+
+    return features
+
+
+def standardize(features, weight=1.0):
+    features = np.asarray(features, dtype=np.float32)
+    std = features.std(axis=0)
+    return weight * (features - features.mean(axis=0)) / np.where(std > 0, std, 1) / np.sqrt(features.shape[1])
+
+
+def k_center(features, k):
+    k = min(k, len(features))
+
+    first = int(np.argmin(((features - features.mean(axis=0)) ** 2).sum(axis=1)))
+    selected = [first]
+    distances = ((features - features[first]) ** 2).sum(axis=1)
+
+    for _ in range(k - 1):
+        i = int(np.argmax(distances))
+        selected.append(i)
+        distances = np.minimum(distances, ((features - features[i]) ** 2).sum(axis=1))
+
+    return selected, float(np.sqrt(distances.max()))
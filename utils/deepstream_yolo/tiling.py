@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+
+from deepstream_yolo.cluster import nms, wbf
+from deepstream_yolo.preprocess import Preprocessor, preprocess_options, restore_boxes
+from deepstream_yolo.runtime import create_session, input_dtype, input_shape, input_size
+
+MERGE_FUNCTIONS = {'nms': nms, 'wbf': wbf}
+
+
+def tile_offsets(length, tile, overlap):
+    if length <= tile:
+        return [0]
+    stride = max(int(tile * (1 - overlap)), 1)
+    return list(range(0, length - tile, stride)) + [length - tile]
+
+
+def tile_grid(image_h, image_w, tile_h, tile_w, overlap=0.2):
+    ys = tile_offsets(image_h, tile_h, overlap)
+    xs = tile_offsets(image_w, tile_w, overlap)
+    return np.array([(x, y) for y in ys for x in xs], dtype=np.int64).reshape(-1, 2)
+
+
+def crop_tile(img, x, y, tile_h, tile_w):
+    tile = img[y:y + tile_h, x:x + tile_w]
+    if tile.shape[:2] != (tile_h, tile_w):
+        tile = np.pad(tile, ((0, tile_h - tile.shape[0]), (0, tile_w - tile.shape[1]), (0, 0)))
+    return tile
+
+
+def output_detections(outputs, output_names, score_threshold=0.0):
+    outputs = dict(zip(output_names, outputs))
+    if 'boxes' in outputs:
+        output = np.concatenate([
+            outputs['boxes'].astype(np.float32), outputs['scores'][..., None].astype(np.float32),
+            outputs['classes'][..., None].astype(np.float32)
+        ], axis=-1)
+    else:
+        output = outputs[output_names[0]].astype(np.float32)
+
+    valid = output[..., 4] >= score_threshold
+    if 'num_detections' in outputs:
+        num_detections = outputs['num_detections'].reshape(-1, 1)
+        valid &= np.arange(output.shape[1]) < num_detections
+    return [o[v] for o, v in zip(output, valid)]
+
+
+def clip_boxes(dets, image_h, image_w):
+    dets[:, [0, 2]] = np.clip(dets[:, [0, 2]], 0, image_w)
+    dets[:, [1, 3]] = np.clip(dets[:, [1, 3]], 0, image_h)
+    return dets[(dets[:, 2] > dets[:, 0]) & (dets[:, 3] > dets[:, 1])]
+
+
+class TiledDetector:
+    def __init__(self, onnx_file, size=None, batch=1, overlap=0.2, merge='nms', iou_threshold=0.5,
+                 score_threshold=0.25, full_frame=False, class_agnostic=False, threads=0, providers=None):
+        from deepstream_yolo.metadata import read_metadata
+
+        if merge not in MERGE_FUNCTIONS:
+            raise ValueError(f'Invalid merge method: {merge}')
+        if not 0 <= overlap < 1:
+            raise ValueError(f'Invalid tile overlap: {overlap}')
+
+        self.session = create_session(onnx_file, threads, providers)
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+        self.dtype = input_dtype(self.session)
+
+        model_batch = self.session.get_inputs()[0].shape[0]
+        self.batch = model_batch if isinstance(model_batch, int) else batch
+        self.tile_h, self.tile_w = input_size(input_shape(self.session, self.batch, size))
+
+        # The tiles have the network size, the full frame is scaled with the preprocessing of the model
+        options = preprocess_options(read_metadata(onnx_file))
+        self.frame_preprocessor = Preprocessor(self.tile_h, self.tile_w, dtype=self.dtype, **options)
+        options.update(maintain_aspect_ratio=0)
+        self.preprocessor = Preprocessor(self.tile_h, self.tile_w, self.batch, dtype=self.dtype, **options)
+
+        self.overlap = overlap
+        self.merge = MERGE_FUNCTIONS[merge]
+        self.iou_threshold = iou_threshold
+        self.score_threshold = score_threshold
+        self.full_frame = full_frame
+        self.class_agnostic = class_agnostic
+        self.times = {'preprocess': 0.0, 'inference': 0.0, 'merge': 0.0}
+
+    def infer(self, inputs):
+        detections = []
+        for i in range(0, len(inputs), self.batch):
+            x = inputs[i:i + self.batch]
+            count = len(x)
+            if count < self.batch:
+                x = np.concatenate([x, np.zeros((self.batch - count, *x.shape[1:]), dtype=x.dtype)])
+            t0 = time.perf_counter()
+            outputs = self.session.run(None, {self.input_name: x})
+            self.times['inference'] += time.perf_counter() - t0
+            detections += output_detections(outputs, self.output_names, self.score_threshold)[:count]
+        return detections
+
+    def detect_frame(self, img):
+        t0 = time.perf_counter()
+        image_h, image_w = img.shape[:2]
+        x, transform = self.frame_preprocessor.prepare(img)
+        self.times['preprocess'] += time.perf_counter() - t0
+
+        dets = self.infer(x[None])[0]
+        return clip_boxes(restore_boxes(dets, transform, image_h, image_w), image_h, image_w)
+
+    def __call__(self, img):
+        t0 = time.perf_counter()
+        image_h, image_w = img.shape[:2]
+        offsets = tile_grid(image_h, image_w, self.tile_h, self.tile_w, self.overlap)
+        tiles = np.empty((len(offsets), *self.preprocessor.tensor.shape[1:]), dtype=self.dtype)
+        for tile, (x, y) in zip(tiles, offsets):
+            self.preprocessor.prepare(crop_tile(img, x, y, self.tile_h, self.tile_w), tile)
+        self.times['preprocess'] += time.perf_counter() - t0
+
+        detections = self.infer(tiles)
+        for (x, y), dets in zip(offsets, detections):
+            dets[:, [0, 2]] += x
+            dets[:, [1, 3]] += y
+        if self.full_frame:
+            detections.append(self.detect_frame(img))
+
+        t0 = time.perf_counter()
+        dets = clip_boxes(np.concatenate(detections), image_h, image_w)
+        dets = self.merge(dets, self.iou_threshold, self.class_agnostic)
+        self.times['merge'] += time.perf_counter() - t0
+
+        return dets, len(offsets)
+
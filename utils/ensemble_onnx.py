@@ -0,0 +1,56 @@
+import os
+
+from deepstream_yolo.ensemble import build_ensemble, merge_labels
+
+
+def main(args):
+    import onnx
+
+    print(f'\nCreating ensemble of {len(args.models)} models')
+    model_onnx, metadata, class_offsets = build_ensemble(args.models)
+
+    try:
+        onnx.checker.check_model(model_onnx)
+    except Exception as e:
+        raise SystemExit(f'Invalid ensemble model: {e}')
+
+    onnx.save(model_onnx, args.output)
+    print(f'Created: {args.output}')
+
+    names = [os.path.basename(f).split('.')[0] for f in args.models]
+    labels = merge_labels(args.model_labels or [''] * len(args.models), metadata, names)
+    with open(args.labels, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(labels) + '\n')
+    print(f'Created: {args.labels} ({len(labels)} classes)\n')
+
+    for name, m, offset in zip(names, metadata, class_offsets):
+        count = int(m['num-classes'])
+        print(f'{name}: {m["family"]}, {count} classes, class ids {offset} to {offset + count - 1}')
+
+    print('\nDone\n')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo ONNX ensemble')
+    parser.add_argument('-m', '--models', nargs='+', required=True,
+                        help='Input exported ONNX model files paths, the first model sets the input preprocessing '
+                        '(required)')
+    parser.add_argument('-l', '--model-labels', nargs='+', default=[],
+                        help='Input labels files paths of the models, in the same order (default MODEL_N labels)')
+    parser.add_argument('-o', '--output', default='ensemble.onnx', help='Output ONNX file path (default ensemble.onnx)')
+    parser.add_argument('--labels', default='labels.txt', help='Output merged labels file path (default labels.txt)')
+    args = parser.parse_args()
+    if len(args.models) < 2:
+        raise SystemExit('Set at least 2 models')
+    for f in args.models + args.model_labels:
+        if not os.path.isfile(f):
+            raise SystemExit(f'Invalid file: {f}')
+    if args.model_labels and len(args.model_labels) != len(args.models):
+        raise SystemExit('Set one labels file for each model')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+
+import numpy as np
+
+from deepstream_yolo.cluster import CLUSTER_MODES, cluster_frames
+from deepstream_yolo.evaluation import coco_detections, device_name, load_coco, markdown_table, parse_outputs, prefetch
+from deepstream_yolo.metrics import mean_average_precision
+from deepstream_yolo.metadata import read_metadata
+from deepstream_yolo.preprocess import Preprocessor, preprocess_options, restore_boxes
+from deepstream_yolo.runtime import create_session, input_dtype, input_shape, input_size
+
+
+def image_loader(metadata, input_h, input_w, dtype):
+    import cv2
+
+    preprocessor = Preprocessor(input_h, input_w, dtype=dtype, **preprocess_options(metadata))
+
+    def load(item):
+        img = cv2.imread(item['file'])
+        if img is None:
+            return item, None, None
+        return (item, *preprocessor.prepare(img))
+
+    return load
+
+
+def batches(loaded, batch_size):
+    batch = []
+    for item, x, transform in loaded:
+        if x is None:
+            print(f'Cannot read {item["file"]}')
+            continue
+        batch.append((item, x, transform))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def evaluate(args, metadata):
+    session = create_session(args.model, args.threads, args.providers)
+    input_name = session.get_inputs()[0].name
+    output_names = [o.name for o in session.get_outputs()]
+    model_batch = session.get_inputs()[0].shape[0]
+    batch_size = model_batch if isinstance(model_batch, int) else args.batch
+    shape = input_shape(session, batch_size, args.size)
+    input_h, input_w = input_size(shape)
+    layout = metadata.get('output-layout', 'compact' if 'boxes' in output_names else 'default')
+    cluster_mode = args.cluster_mode if args.cluster_mode >= 0 else int(metadata.get('cluster-mode', 2))
+
+    items, gts, crowds, category_ids = load_coco(args.annotations, args.images, args.num)
+    print(f'Dataset: {args.annotations} ({len(items)} images, {len(category_ids)} classes)')
+    print(f'Model: {args.model} (input {input_w}x{input_h}, batch {batch_size}, {layout} output layout, cluster-mode '
+          f'{cluster_mode})\n')
+
+    zeros = np.zeros((batch_size, *shape[1:]), dtype=input_dtype(session))
+    for _ in range(args.warmup):
+        session.run(None, {input_name: zeros})
+
+    load = image_loader(metadata, input_h, input_w, input_dtype(session))
+    detections = {}
+    inference_time, num_images = 0.0, 0
+    t0 = time.perf_counter()
+    for batch in batches(prefetch(items, load, args.workers, args.prefetch * batch_size), batch_size):
+        x = np.stack([b[1] for b in batch])
+        if len(x) < batch_size:
+            x = np.concatenate([x, zeros[len(x):]])
+
+        t1 = time.perf_counter()
+        outputs = session.run(None, {input_name: x})
+        inference_time += time.perf_counter() - t1
+
+        dets = parse_outputs(outputs, output_names, layout, input_w, input_h, args.pre_cluster_thres)[:len(batch)]
+        dets = cluster_frames(
+            dets, cluster_mode, iou_threshold=args.nms_iou_thres, topk=args.topk, eps=args.eps,
+            group_threshold=args.group_thres, min_boxes=args.min_boxes, min_score=args.min_score
+        )
+        for (item, _, transform), d in zip(batch, dets):
+            detections[item['id']] = restore_boxes(d, transform, item['height'], item['width'])
+
+        num_images += len(batch)
+        if num_images % (100 * batch_size) < batch_size:
+            print(f'{num_images}/{len(items)} images')
+    total_time = time.perf_counter() - t0
+
+    if not num_images:
+        raise SystemExit('No valid images')
+
+    valid = [k for k, item in enumerate(items) if item['id'] in detections]
+    empty = np.empty((0, 6), dtype=np.float32)
+    aps = mean_average_precision(
+        [detections.get(items[k]['id'], empty) for k in valid], [gts[k] for k in valid],
+        crowds=[crowds[k] for k in valid], max_dets=100
+    )
+
+    result = {
+        'name': args.name or os.path.basename(args.model).split('.')[0],
+        'model': args.model,
+        'precision': metadata.get('precision', 'fp32'),
+        'size': [input_h, input_w],
+        'batch': batch_size,
+        'device': device_name(session.get_providers()),
+        'dataset': f'{os.path.basename(args.annotations)} ({num_images} images)',
+        'cluster_mode': cluster_mode,
+        'nms_iou_threshold': args.nms_iou_thres,
+        'pre_cluster_threshold': args.pre_cluster_thres,
+        'topk': args.topk,
+        'map': float(aps.mean()),
+        'map50': float(aps[0]),
+        'map75': float(aps[5]),
+        'fps': num_images / inference_time,
+        'e2e_fps': num_images / total_time
+    }
+
+    if args.detections:
+        results = []
+        for item in items:
+            if item['id'] in detections:
+                results += coco_detections(detections[item['id']], item['id'], category_ids)
+        with open(args.detections, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        print(f'Saved: {args.detections} ({len(results)} detections)')
+
+    return result
+
+
+def save_results(result, output_file):
+    results = []
+    if os.path.isfile(output_file):
+        with open(output_file, 'r', encoding='utf-8') as f:
+            results = json.load(f).get('results', [])
+    results = [r for r in results if r['name'] != result['name']] + [result]
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'results': results}, f, indent=2)
+    print(f'Saved: {output_file} ({len(results)} models)')
+    return results
+
+
+def main(args):
+    metadata = read_metadata(args.model)
+    if not metadata:
+        print('WARNING: The model has no DeepStream metadata, using the default preprocessing')
+
+    result = evaluate(args, metadata)
+
+    print(f'\nmAP@0.5:0.95 {result["map"]:.3f}, mAP@0.5 {result["map50"]:.3f}, mAP@0.75 {result["map75"]:.3f}')
+    print(f'FPS {result["fps"]:.2f} (inference), {result["e2e_fps"]:.2f} (end-to-end)\n')
+
+    results = [result]
+    if args.output:
+        results = save_results(result, args.output)
+
+    if args.markdown:
+        with open(args.markdown, 'w', encoding='utf-8') as f:
+            f.write(markdown_table(results))
+        print(f'Saved: {args.markdown}')
+
+    print('Done\n')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo ONNX COCO mAP and FPS evaluation')
+    parser.add_argument('-m', '--model', required=True, help='Input exported ONNX model file path (required)')
+    parser.add_argument('-a', '--annotations', required=True, help='COCO annotations (.json) file path (required)')
+    parser.add_argument('-i', '--images', required=True, help='COCO images folder path (required)')
+    parser.add_argument('--num', type=int, default=0, help='Number of images (default all)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[],
+                        help='Inference size [H,W] of dynamic size models')
+    parser.add_argument('--batch', type=int, default=1, help='Batch-size of dynamic batch models (default 1)')
+    parser.add_argument('--pre-cluster-thres', type=float, default=0.001,
+                        help='pre-cluster-threshold (default 0.001)')
+    parser.add_argument('--nms-iou-thres', type=float, default=0.7, help='nms-iou-threshold (default 0.7)')
+    parser.add_argument('--topk', type=int, default=300, help='topk per class (default 300)')
+    parser.add_argument('--cluster-mode', type=int, choices=[-1, *CLUSTER_MODES], default=-1,
+                        help='cluster-mode (default from the model metadata)')
+    parser.add_argument('--eps', type=float, default=None,
+                        help='eps of cluster-mode 0, 1 and 3 (default 0.2 for 0, 0.7 for 1 and 3)')
+    parser.add_argument('--group-thres', type=int, default=1, help='group-threshold of cluster-mode 0 (default 1)')
+    parser.add_argument('--min-boxes', type=int, default=3, help='minBoxes of cluster-mode 1 and 3 (default 3)')
+    parser.add_argument('--min-score', type=float, default=0.0,
+                        help='dbscan-min-score of cluster-mode 1 and 3 (default 0)')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime intra-op threads (default auto)')
+    parser.add_argument('--providers', nargs='+', default=None,
+                        help='ONNX Runtime execution providers (default CPUExecutionProvider)')
+    parser.add_argument('--workers', type=int, default=4, help='Image loading threads (default 4)')
+    parser.add_argument('--prefetch', type=int, default=4, help='Prefetched batches (default 4)')
+    parser.add_argument('--warmup', type=int, default=2, help='Warmup runs (default 2)')
+    parser.add_argument('--name', default='', help='Model name in the results (default model file name)')
+    parser.add_argument('-o', '--output', default='',
+                        help='Output results (.json) file path, the results of other models in the file are kept')
+    parser.add_argument('--markdown', default='', help='Output benchmarks table (.md) file path')
+    parser.add_argument('--detections', default='', help='Output COCO detections (.json) file path')
+    args = parser.parse_args()
+    if not os.path.isfile(args.model):
+        raise SystemExit('Invalid model file')
+    if not os.path.isfile(args.annotations):
+        raise SystemExit('Invalid annotations file')
+    if not os.path.isdir(args.images):
+        raise SystemExit('Invalid images folder')
+    if args.size:
+        args.size = args.size * 2 if len(args.size) == 1 else args.size
+    if args.batch < 1 or args.topk < 0 or args.workers < 1 or args.prefetch < 1 or args.warmup < 0:
+        raise SystemExit('Invalid evaluation settings')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
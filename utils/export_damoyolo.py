@@ -1,5 +1,3 @@
-import os
-import onnx
 import torch
 import torch.nn as nn
 
@@ -8,6 +6,11 @@ from damo.utils.model_utils import replace_module
 from damo.base_models.core.ops import RepConv, SiLU
 from damo.detectors.detector import build_local_model
 
+from deepstream_yolo.common import (
+    suppress_warnings, get_img_size, write_labels, export_onnx, add_export_args, check_export_args
+)
+from deepstream_yolo.cache import cached_export
+
 
 class DeepStreamOutput(nn.Module):
     def __init__(self):
@@ -19,15 +22,6 @@ class DeepStreamOutput(nn.Module):
         return torch.cat([boxes, scores, labels.to(boxes.dtype)], dim=-1)
 
 
-def suppress_warnings():
-    import warnings
-    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
-    warnings.filterwarnings('ignore', category=UserWarning)
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
-    warnings.filterwarnings('ignore', category=ResourceWarning)
-
-
 def damoyolo_export(weights, config_file, device):
     config = parse_config(config_file)
     config.model.head.export_with_post = True
@@ -45,6 +39,7 @@ def damoyolo_export(weights, config_file, device):
     return config, model
 
 
+@cached_export
 def main(args):
     suppress_warnings()
 
@@ -55,61 +50,26 @@ def main(args):
     device = torch.device('cpu')
     cfg, model = damoyolo_export(args.weights, args.config, device)
 
-    if len(cfg.dataset['class_names']) > 0:
-        print('Creating labels.txt file')
-        with open('labels.txt', 'w', encoding='utf-8') as f:
-            for name in cfg.dataset['class_names']:
-                f.write(f'{name}\n')
+    write_labels(cfg.dataset['class_names'], args.labels)
 
     model = nn.Sequential(model, DeepStreamOutput())
 
-    img_size = args.size * 2 if len(args.size) == 1 else args.size
+    img_size = get_img_size(args.size)
 
     onnx_input_im = torch.zeros(args.batch, 3, *img_size).to(device)
     onnx_output_file = f'{args.weights}.onnx'
 
-    dynamic_axes = {
-        'input': {
-            0: 'batch'
-        },
-        'output': {
-            0: 'batch'
-        }
-    }
-
-    print('Exporting the model to ONNX')
-    torch.onnx.export(
-        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
-        input_names=['input'], output_names=['output'], dynamic_axes=dynamic_axes if args.dynamic else None
-    )
-
-    if args.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
-
-    print(f'Done: {onnx_output_file}\n')
+    return export_onnx(model, onnx_input_im, onnx_output_file, args, family='damoyolo')
 
 
-def parse_args():
+def parse_args(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description='DeepStream DAMO-YOLO conversion')
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pth) file path (required)')
     parser.add_argument('-c', '--config', required=True, help='Input config (.py) file path (required)')
-    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])')
-    parser.add_argument('--opset', type=int, default=11, help='ONNX opset version')
-    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
-    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
-    parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
-    if not os.path.isfile(args.weights):
-        raise SystemExit('Invalid weights file')
-    if not os.path.isfile(args.config):
-        raise SystemExit('Invalid config file')
-    if args.dynamic and args.batch > 1:
-        raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
+    add_export_args(parser, 11)
+    args = parser.parse_args(argv)
+    check_export_args(args, files=('config',))
     return args
 
 
@@ -0,0 +1,62 @@
+import os
+import torch
+
+from deepstream_yolo.common import (
+    suppress_warnings, get_img_size, write_labels, export_onnx, add_export_args, add_qdq_args, check_export_args
+)
+from deepstream_yolo.cache import cached_export
+from deepstream_yolo.darknet import load_darknet
+
+
+def read_names(names_file):
+    if not names_file:
+        return []
+    with open(names_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+@cached_export
+def main(args):
+    suppress_warnings()
+
+    print(f'\nStarting: {args.weights}')
+
+    print('Opening Darknet model')
+
+    device = torch.device('cpu')
+    model = load_darknet(args.cfg, args.weights)
+
+    write_labels(read_names(args.names), args.labels)
+
+    img_size = get_img_size(args.size) if args.size else [model.height, model.width]
+
+    onnx_input_im = torch.zeros(args.batch, model.channels, *img_size).to(device)
+    onnx_output_file = f'{args.weights}.onnx'
+
+    return export_onnx(
+        model, onnx_input_im, onnx_output_file, args, family='darknet',
+        metadata={'maintain-aspect-ratio': model.letter_box}
+    )
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream Darknet conversion')
+    parser.add_argument('-w', '--weights', required=True, help='Input weights (.weights) file path (required)')
+    parser.add_argument('-c', '--cfg', required=True, help='Input cfg (.cfg) file path (required)')
+    parser.add_argument('-n', '--names', default='', help='Input class names (.names) file path')
+    parser.add_argument(
+        '-s', '--size', nargs='+', type=int, default=[], help='Inference size [H,W] (default cfg height and width)'
+    )
+    add_export_args(parser, 13, size=False)
+    add_qdq_args(parser)
+    args = parser.parse_args(argv)
+    check_export_args(args, files=('cfg',))
+    if args.names and not os.path.isfile(args.names):
+        raise SystemExit('Invalid names file')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
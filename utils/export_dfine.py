@@ -1,11 +1,12 @@
-import os
-import onnx
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
 from src.core import YAMLConfig
 
+from deepstream_yolo.common import suppress_warnings, get_img_size, export_onnx, add_export_args, check_export_args
+from deepstream_yolo.cache import cached_export
+
 
 class DeepStreamOutput(nn.Module):
     def __init__(self, img_size, use_focal_loss):
@@ -38,15 +39,7 @@ def dfine_export(weights, cfg_file, device):
     return cfg.model.deploy(), cfg.postprocessor.use_focal_loss
 
 
-def suppress_warnings():
-    import warnings
-    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
-    warnings.filterwarnings('ignore', category=UserWarning)
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
-    warnings.filterwarnings('ignore', category=ResourceWarning)
-
-
+@cached_export
 def main(args):
     suppress_warnings()
 
@@ -57,55 +50,24 @@ def main(args):
     device = torch.device('cpu')
     model, use_focal_loss = dfine_export(args.weights, args.config, device)
 
-    img_size = args.size * 2 if len(args.size) == 1 else args.size
+    img_size = get_img_size(args.size)
 
     model = nn.Sequential(model, DeepStreamOutput(img_size, use_focal_loss))
 
     onnx_input_im = torch.zeros(args.batch, 3, *img_size).to(device)
     onnx_output_file = f'{args.weights}.onnx'
 
-    dynamic_axes = {
-        'input': {
-            0: 'batch'
-        },
-        'output': {
-            0: 'batch'
-        }
-    }
-
-    print('Exporting the model to ONNX')
-    torch.onnx.export(
-        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
-        input_names=['input'], output_names=['output'], dynamic_axes=dynamic_axes if args.dynamic else None
-    )
-
-    if args.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
-
-    print(f'Done: {onnx_output_file}\n')
+    return export_onnx(model, onnx_input_im, onnx_output_file, args, family='dfine')
 
 
-def parse_args():
+def parse_args(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description='DeepStream D-FINE conversion')
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pth) file path (required)')
     parser.add_argument('-c', '--config', required=True, help='Input YAML (.yml) file path (required)')
-    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])')
-    parser.add_argument('--opset', type=int, default=17, help='ONNX opset version')
-    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
-    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
-    parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
-    if not os.path.isfile(args.weights):
-        raise SystemExit('Invalid weights file')
-    if not os.path.isfile(args.config):
-        raise SystemExit('Invalid config file')
-    if args.dynamic and args.batch > 1:
-        raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
+    add_export_args(parser, 17, labels=False)
+    args = parser.parse_args(argv)
+    check_export_args(args, files=('config',))
     return args
 
 
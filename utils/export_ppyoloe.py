@@ -1,5 +1,4 @@
 import os
-import onnx
 import paddle
 import paddle.nn as nn
 
@@ -10,6 +9,10 @@ from ppdet.data.source.category import get_categories
 from ppdet.utils.check import check_version, check_config
 from ppdet.core.workspace import load_config, merge_config
 
+from deepstream_yolo.common import write_labels, simplify_onnx, add_parity_args, check_parity_args
+from deepstream_yolo.cache import cached_export
+from deepstream_yolo.metadata import export_metadata
+
 
 class DeepStreamOutput(nn.Layer):
     def __init__(self):
@@ -59,6 +62,7 @@ def suppress_warnings():
     warnings.filterwarnings('ignore')
 
 
+@cached_export
 def main(FLAGS):
     suppress_warnings()
 
@@ -72,10 +76,7 @@ def main(FLAGS):
     anno_file = cfg['TestDataset'].get_anno()
     if os.path.isfile(anno_file):
         _, catid2name = get_categories(cfg['metric'], anno_file, 'detection_arch')
-        print('Creating labels.txt file')
-        with open('labels.txt', 'w', encoding='utf-8') as f:
-            for name in catid2name.values():
-                f.write(f'{name}\n')
+        write_labels(catid2name.values(), FLAGS.labels)
 
     model = nn.Sequential(DeepStreamInput(), model, DeepStreamOutput())
 
@@ -89,16 +90,21 @@ def main(FLAGS):
     paddle.onnx.export(model, FLAGS.weights, input_spec=[onnx_input_im], opset_version=FLAGS.opset)
 
     if FLAGS.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
+        simplify_onnx(onnx_output_file)
+
+    export_metadata(onnx_output_file, FLAGS, (FLAGS.batch, 3, *img_size), 'ppyoloe')
+
+    if FLAGS.parity:
+        from deepstream_yolo.parity import check_parity
+        reference = lambda x: model({'image': paddle.to_tensor(x)}).numpy()
+        check_parity(onnx_output_file, reference, FLAGS, (FLAGS.batch, 3, *img_size))
 
     print(f'Done: {onnx_output_file}\n')
 
+    return onnx_output_file
+
 
-def parse_args():
+def parse_args(argv=None):
     parser = ArgsParser()
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pdparams) file path (required)')
     parser.add_argument('--slim_config', default=None, type=str, help='Slim configuration file of slim method')
@@ -106,9 +112,13 @@ def parse_args():
     parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
     parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
     parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
+    parser.add_argument('--cache', default='', help='Export cache folder path (default disabled)')
+    add_parity_args(parser)
+    parser.add_argument('--labels', default='labels.txt', help='Output labels file path (default labels.txt)')
+    args = parser.parse_args(argv)
     if not os.path.isfile(args.weights):
         raise SystemExit('Invalid weights file')
+    check_parity_args(args)
     if args.dynamic and args.batch > 1:
         raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
     elif args.dynamic:
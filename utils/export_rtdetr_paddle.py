@@ -1,5 +1,4 @@
 import os
-import onnx
 import paddle
 import paddle.nn as nn
 import paddle.nn.functional as F
@@ -9,6 +8,10 @@ from ppdet.utils.cli import ArgsParser
 from ppdet.utils.check import check_version, check_config
 from ppdet.core.workspace import load_config, merge_config
 
+from deepstream_yolo.common import simplify_onnx, add_parity_args, check_parity_args
+from deepstream_yolo.cache import cached_export
+from deepstream_yolo.metadata import export_metadata
+
 
 class DeepStreamOutput(nn.Layer):
     def __init__(self, img_size, use_focal_loss):
@@ -53,6 +56,7 @@ def suppress_warnings():
     warnings.filterwarnings('ignore')
 
 
+@cached_export
 def main(FLAGS):
     suppress_warnings()
 
@@ -75,16 +79,21 @@ def main(FLAGS):
     paddle.onnx.export(model, FLAGS.weights, input_spec=[onnx_input_im], opset_version=FLAGS.opset)
 
     if FLAGS.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
+        simplify_onnx(onnx_output_file)
+
+    export_metadata(onnx_output_file, FLAGS, (FLAGS.batch, 3, *img_size), 'rtdetr_paddle')
+
+    if FLAGS.parity:
+        from deepstream_yolo.parity import check_parity
+        reference = lambda x: model({'image': paddle.to_tensor(x)}).numpy()
+        check_parity(onnx_output_file, reference, FLAGS, (FLAGS.batch, 3, *img_size))
 
     print(f'Done: {onnx_output_file}\n')
 
+    return onnx_output_file
+
 
-def parse_args():
+def parse_args(argv=None):
     parser = ArgsParser()
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pdparams) file path (required)')
     parser.add_argument('--slim_config', default=None, type=str, help='Slim configuration file of slim method')
@@ -92,9 +101,12 @@ def parse_args():
     parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
     parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
     parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
+    parser.add_argument('--cache', default='', help='Export cache folder path (default disabled)')
+    add_parity_args(parser)
+    args = parser.parse_args(argv)
     if not os.path.isfile(args.weights):
         raise SystemExit('Invalid weights file')
+    check_parity_args(args)
     if args.dynamic and args.batch > 1:
         raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
     elif args.dynamic:
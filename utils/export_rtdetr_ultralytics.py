@@ -1,10 +1,14 @@
-import os
 import torch
 import torch.nn as nn
 from copy import deepcopy
 
 from ultralytics import RTDETR
 
+from deepstream_yolo.common import (
+    suppress_warnings, get_img_size, write_labels, export_onnx, add_export_args, check_export_args
+)
+from deepstream_yolo.cache import cached_export
+
 
 class DeepStreamOutput(nn.Module):
     def __init__(self, img_size):
@@ -40,15 +44,7 @@ def rtdetr_ultralytics_export(weights, device):
     return model
 
 
-def suppress_warnings():
-    import warnings
-    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
-    warnings.filterwarnings('ignore', category=UserWarning)
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
-    warnings.filterwarnings('ignore', category=ResourceWarning)
-
-
+@cached_export
 def main(args):
     suppress_warnings()
 
@@ -59,54 +55,25 @@ def main(args):
     device = torch.device('cpu')
     model = rtdetr_ultralytics_export(args.weights, device)
 
-    if len(model.names.keys()) > 0:
-        print('Creating labels.txt file')
-        with open('labels.txt', 'w', encoding='utf-8') as f:
-            for name in model.names.values():
-                f.write(f'{name}\n')
+    write_labels(model.names.values(), args.labels)
 
-    img_size = args.size * 2 if len(args.size) == 1 else args.size
+    img_size = get_img_size(args.size)
 
     model = nn.Sequential(model, DeepStreamOutput(img_size))
 
     onnx_input_im = torch.zeros(args.batch, 3, *img_size).to(device)
     onnx_output_file = f'{args.weights}.onnx'
 
-    dynamic_axes = {
-        'input': {
-            0: 'batch'
-        },
-        'output': {
-            0: 'batch'
-        }
-    }
-
-    print('Exporting the model to ONNX')
-    torch.onnx.export(
-        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
-        input_names=['input'], output_names=['output'], dynamic_axes=dynamic_axes if args.dynamic else None
-    )
-
-    if args.simplify:
-        print('Simplifying is not available for this model')
-
-    print(f'Done: {onnx_output_file}\n')
+    return export_onnx(model, onnx_input_im, onnx_output_file, args, simplify=False, family='rtdetr_ultralytics')
 
 
-def parse_args():
+def parse_args(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description='DeepStream RT-DETR Ultralytics conversion')
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pt) file path (required)')
-    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])')
-    parser.add_argument('--opset', type=int, default=17, help='ONNX opset version')
-    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
-    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
-    parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
-    if not os.path.isfile(args.weights):
-        raise SystemExit('Invalid weights file')
-    if args.dynamic and args.batch > 1:
-        raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
+    add_export_args(parser, 17)
+    args = parser.parse_args(argv)
+    check_export_args(args)
     return args
 
 
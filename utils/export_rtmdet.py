@@ -1,6 +1,3 @@
-import os
-import types
-import onnx
 import torch
 import torch.nn as nn
 
@@ -8,6 +5,11 @@ from mmdet.apis import init_detector
 from projects.easydeploy.model import DeployModel, MMYOLOBackend
 from projects.easydeploy.bbox_code import rtmdet_bbox_decoder as bbox_decoder
 
+from deepstream_yolo.common import suppress_warnings, get_img_size, export_onnx, add_export_args, check_export_args
+from deepstream_yolo.cache import cached_export
+from deepstream_yolo.parity import mmdet_reference
+from deepstream_yolo.patches import replace_method
+
 
 class DeepStreamOutput(nn.Module):
     def __init__(self):
@@ -70,19 +72,11 @@ def rtmdet_export(weights, config, device):
     deploy_model.num_base_priors = model.bbox_head.num_base_priors
     deploy_model.featmap_strides = model.bbox_head.featmap_strides
     deploy_model.num_classes = model.bbox_head.num_classes
-    deploy_model.pred_by_feat = types.MethodType(pred_by_feat_deepstream, deploy_model)
+    replace_method(deploy_model, 'pred_by_feat', pred_by_feat_deepstream)
     return deploy_model
 
 
-def suppress_warnings():
-    import warnings
-    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
-    warnings.filterwarnings('ignore', category=UserWarning)
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
-    warnings.filterwarnings('ignore', category=ResourceWarning)
-
-
+@cached_export
 def main(args):
     suppress_warnings()
 
@@ -93,55 +87,25 @@ def main(args):
     device = torch.device('cpu')
     model = rtmdet_export(args.weights, args.config, device)
 
+    reference = mmdet_reference(model.baseModel)
     model = nn.Sequential(model, DeepStreamOutput())
 
-    img_size = args.size * 2 if len(args.size) == 1 else args.size
+    img_size = get_img_size(args.size)
 
     onnx_input_im = torch.zeros(args.batch, 3, *img_size).to(device)
     onnx_output_file = f'{args.weights}.onnx'
 
-    dynamic_axes = {
-        'input': {
-            0: 'batch'
-        },
-        'output': {
-            0: 'batch'
-        }
-    }
-
-    print('Exporting the model to ONNX')
-    torch.onnx.export(
-        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
-        input_names=['input'], output_names=['output'], dynamic_axes=dynamic_axes if args.dynamic else None
-    )
-
-    if args.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
-
-    print(f'Done: {onnx_output_file}\n')
+    return export_onnx(model, onnx_input_im, onnx_output_file, args, family='rtmdet', reference=reference)
 
 
-def parse_args():
+def parse_args(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description='DeepStream RTMDet conversion')
     parser.add_argument('-w', '--weights', required=True, type=str, help='Input weights (.pt) file path (required)')
     parser.add_argument('-c', '--config', required=True, help='Input config (.py) file path (required)')
-    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])')
-    parser.add_argument('--opset', type=int, default=17, help='ONNX opset version')
-    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
-    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
-    parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
-    if not os.path.isfile(args.weights):
-        raise SystemExit('Invalid weights file')
-    if not os.path.isfile(args.config):
-        raise SystemExit('Invalid config file')
-    if args.dynamic and args.batch > 1:
-        raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
+    add_export_args(parser, 17, labels=False)
+    args = parser.parse_args(argv)
+    check_export_args(args, files=('config',))
     return args
 
 
@@ -1,7 +1,4 @@
-import os
 import sys
-import types
-import onnx
 import torch
 import torch.nn as nn
 from copy import deepcopy
@@ -10,6 +7,13 @@ import ultralytics.utils
 import ultralytics.models.yolo
 import ultralytics.utils.tal as _m
 
+from deepstream_yolo.common import (
+    suppress_warnings, get_img_size, write_labels, export_onnx, add_export_args, check_export_args
+)
+from deepstream_yolo.cache import cached_export
+from deepstream_yolo.parity import original_reference
+from deepstream_yolo.patches import replace_code, replace_method
+
 sys.modules['ultralytics.yolo'] = ultralytics.models.yolo
 sys.modules['ultralytics.yolo.utils'] = ultralytics.utils
 
@@ -21,7 +25,7 @@ def _dist2bbox(distance, anchor_points, xywh=False, dim=-1):
     return torch.cat((x1y1, x2y2), dim)
 
 
-_m.dist2bbox.__code__ = _dist2bbox.__code__
+replace_code(_m.dist2bbox, _dist2bbox)
 
 
 class DeepStreamOutput(nn.Module):
@@ -73,19 +77,11 @@ def yolov10_export(weights, device, inplace=True, fuse=True):
             m.export = True
             m.format = 'onnx'
             if m.__class__.__name__ == 'v10Detect':
-                m.forward = types.MethodType(forward_deepstream, m)
+                replace_method(m, 'forward', forward_deepstream)
     return model
 
 
-def suppress_warnings():
-    import warnings
-    warnings.filterwarnings('ignore', category=torch.jit.TracerWarning)
-    warnings.filterwarnings('ignore', category=UserWarning)
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
-    warnings.filterwarnings('ignore', category=ResourceWarning)
-
-
+@cached_export
 def main(args):
     suppress_warnings()
 
@@ -96,58 +92,27 @@ def main(args):
     device = torch.device('cpu')
     model = yolov10_export(args.weights, device)
 
-    if len(model.names.keys()) > 0:
-        print('Creating labels.txt file')
-        with open('labels.txt', 'w', encoding='utf-8') as f:
-            for name in model.names.values():
-                f.write(f'{name}\n')
+    write_labels(model.names.values(), args.labels)
 
+    # The framework v10Detect export output (NMS-free top max-det detections) is the parity reference
+    reference = original_reference(model)
     model = nn.Sequential(model, DeepStreamOutput())
 
-    img_size = args.size * 2 if len(args.size) == 1 else args.size
+    img_size = get_img_size(args.size)
 
     onnx_input_im = torch.zeros(args.batch, 3, *img_size).to(device)
     onnx_output_file = f'{args.weights}.onnx'
 
-    dynamic_axes = {
-        'input': {
-            0: 'batch'
-        },
-        'output': {
-            0: 'batch'
-        }
-    }
-
-    print('Exporting the model to ONNX')
-    torch.onnx.export(
-        model, onnx_input_im, onnx_output_file, verbose=False, opset_version=args.opset, do_constant_folding=True,
-        input_names=['input'], output_names=['output'], dynamic_axes=dynamic_axes if args.dynamic else None
-    )
-
-    if args.simplify:
-        print('Simplifying the ONNX model')
-        import onnxslim
-        model_onnx = onnx.load(onnx_output_file)
-        model_onnx = onnxslim.slim(model_onnx)
-        onnx.save(model_onnx, onnx_output_file)
-
-    print(f'Done: {onnx_output_file}\n')
+    return export_onnx(model, onnx_input_im, onnx_output_file, args, family='yoloV10', reference=reference)
 
 
-def parse_args():
+def parse_args(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description='DeepStream YOLOv10 conversion')
     parser.add_argument('-w', '--weights', required=True, help='Input weights (.pt) file path (required)')
-    parser.add_argument('-s', '--size', nargs='+', type=int, default=[640], help='Inference size [H,W] (default [640])')
-    parser.add_argument('--opset', type=int, default=17, help='ONNX opset version')
-    parser.add_argument('--simplify', action='store_true', help='ONNX simplify model')
-    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch-size')
-    parser.add_argument('--batch', type=int, default=1, help='Static batch-size')
-    args = parser.parse_args()
-    if not os.path.isfile(args.weights):
-        raise SystemExit('Invalid weights file')
-    if args.dynamic and args.batch > 1:
-        raise SystemExit('Cannot set dynamic batch-size and static batch-size at same time')
+    add_export_args(parser, 17)
+    args = parser.parse_args(argv)
+    check_export_args(args)
     return args
 
 
@@ -0,0 +1,212 @@
+import os
+import math
+
+from deepstream_yolo.engines import NETWORK_MODES
+from deepstream_yolo.metadata import PREPROCESS, family_preprocess, read_metadata
+
+PRECISIONS = {v: k for k, v in NETWORK_MODES.items()}
+
+CUDA_PARSE_FUNCTIONS = {
+    'NvDsInferParseYolo': 'NvDsInferParseYoloCuda',
+    'NvDsInferParseYoloCompact': 'NvDsInferParseYoloCompactCuda',
+}
+
+SAMPLE_URI = 'file:///opt/nvidia/deepstream/deepstream/samples/streams/sample_1080p_h264.mp4'
+
+
+def relative_path(path, output_file):
+    return os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(output_file)))
+
+
+def get_batch_size(args, input_shape):
+    batch = input_shape[0]
+    if batch > 0:
+        if args.batch and args.batch != batch:
+            raise SystemExit(f'Invalid batch-size: the model has static batch-size {batch}')
+        return batch
+    return args.batch or args.sources
+
+
+def get_infer_size(args, metadata, input_shape):
+    if input_shape[2] > 0 and input_shape[3] > 0:
+        if args.size and args.size != input_shape[2:]:
+            raise SystemExit(f'Invalid size: the model has static size {input_shape[2:]}')
+        return None
+    if args.size:
+        size = args.size
+    elif 'profile-opt' in metadata:
+        size = [int(d) for d in metadata['profile-opt'].split(',')[2:]]
+    else:
+        raise SystemExit('The model has dynamic size, set --size')
+    if 'profile-min' in metadata and 'profile-max' in metadata:
+        min_size = [int(d) for d in metadata['profile-min'].split(',')[2:]]
+        max_size = [int(d) for d in metadata['profile-max'].split(',')[2:]]
+        if not all(a <= b <= c for a, b, c in zip(min_size, size, max_size)):
+            raise SystemExit(f'Invalid size: the model supports sizes from {min_size} to {max_size}')
+    return size
+
+
+def config_infer(args, metadata, batch_size, infer_size):
+    mode = args.network_mode or metadata['precision']
+    precision = PRECISIONS[mode]
+    parse_function = metadata['parse-bbox-func-name']
+    cluster_mode = int(metadata['cluster-mode'])
+    calib = args.calib and precision == 1 and metadata['precision'] != 'int8'
+
+    lines = ['[property]', f'gpu-id={args.gpu_id}', f'net-scale-factor={metadata["net-scale-factor"]}']
+    if metadata['offsets']:
+        lines.append(f'offsets={metadata["offsets"]}')
+    lines += [
+        f'model-color-format={metadata["model-color-format"]}',
+        f'onnx-file={relative_path(args.model, args.output)}',
+        f'model-engine-file=model_b{batch_size}_gpu{args.gpu_id}_{mode}.engine',
+        f'{"" if calib else "#"}int8-calib-file={args.calib or "calib.table"}',
+        f'labelfile-path={args.labels}'
+    ]
+    if metadata.get('network-input-order') == '1':
+        lines.append('network-input-order=1')
+    if infer_size:
+        lines.append(f'infer-dims={metadata["input-shape"].split(",")[1]};{infer_size[0]};{infer_size[1]}')
+    lines += [
+        f'batch-size={batch_size}',
+        f'network-mode={precision}',
+        f'num-detected-classes={metadata["num-classes"]}',
+        'interval=0',
+        'gie-unique-id=1',
+        'process-mode=1',
+        'network-type=0',
+        f'cluster-mode={cluster_mode}',
+        f'maintain-aspect-ratio={metadata["maintain-aspect-ratio"]}',
+        f'symmetric-padding={metadata["symmetric-padding"]}',
+        '#workspace-size=2000',
+        f'parse-bbox-func-name={parse_function}'
+    ]
+    if parse_function in CUDA_PARSE_FUNCTIONS:
+        lines.append(f'#parse-bbox-func-name={CUDA_PARSE_FUNCTIONS[parse_function]}')
+    lines += [
+        f'custom-lib-path={args.lib}',
+        'engine-create-func-name=NvDsInferYoloCudaEngineGet',
+        '',
+        '[class-attrs-all]'
+    ]
+    if cluster_mode == 2:
+        lines.append('nms-iou-threshold=0.45')
+    lines += ['pre-cluster-threshold=0.25', 'topk=300']
+    return '\n'.join(lines) + '\n'
+
+
+def deepstream_app_config(args, config_file, batch_size):
+    columns = math.ceil(math.sqrt(args.sources))
+    rows = math.ceil(args.sources / columns)
+    sections = [
+        ('application', ['enable-perf-measurement=1', 'perf-measurement-interval-sec=5']),
+        ('tiled-display', [
+            'enable=1', f'rows={rows}', f'columns={columns}', 'width=1280', 'height=720', f'gpu-id={args.gpu_id}',
+            'nvbuf-memory-type=0'
+        ]),
+        ('source0', [
+            'enable=1', 'type=3', f'uri={args.uri}', f'num-sources={args.sources}', f'gpu-id={args.gpu_id}',
+            'cudadec-memtype=0'
+        ]),
+        ('sink0', ['enable=1', 'type=2', 'sync=0', f'gpu-id={args.gpu_id}', 'nvbuf-memory-type=0']),
+        ('osd', [
+            'enable=1', f'gpu-id={args.gpu_id}', 'border-width=5', 'text-size=15', 'text-color=1;1;1;1;',
+            'text-bg-color=0.3;0.3;0.3;1', 'font=Serif', 'show-clock=0', 'clock-x-offset=800', 'clock-y-offset=820',
+            'clock-text-size=12', 'clock-color=1;0;0;0', 'nvbuf-memory-type=0'
+        ]),
+        ('streammux', [
+            f'gpu-id={args.gpu_id}', 'live-source=0', f'batch-size={batch_size}', 'batched-push-timeout=40000',
+            f'width={args.width}', f'height={args.height}', 'enable-padding=0', 'nvbuf-memory-type=0'
+        ]),
+        ('primary-gie', [
+            'enable=1', f'gpu-id={args.gpu_id}', 'gie-unique-id=1', 'nvbuf-memory-type=0',
+            f'config-file={relative_path(config_file, args.app)}'
+        ]),
+        ('tests', ['file-loop=0'])
+    ]
+    return '\n'.join(f'[{name}]\n' + '\n'.join(lines) + '\n' for name, lines in sections)
+
+
+def main(args):
+    metadata = read_metadata(args.model)
+    if not metadata:
+        raise SystemExit('The model has no DeepStream metadata, export it again with the updated export file')
+
+    if args.family:
+        # The models with input preprocessing keep the nvinfer normalization of the export
+        skip = {'cluster-mode'} | ({'net-scale-factor', 'offsets', 'model-color-format'}
+                                   if metadata.get('input-preprocess') == '1' else set())
+        metadata.update({k: str(v) for k, v in family_preprocess(args.family).items() if k not in skip})
+        metadata['family'] = args.family
+    if args.classes:
+        metadata['num-classes'] = str(args.classes)
+    if int(metadata['num-classes']) < 1:
+        raise SystemExit('Unknown number of classes, set --classes')
+
+    input_shape = [int(d) for d in metadata['input-shape'].split(',')]
+    batch_size = get_batch_size(args, input_shape)
+    infer_size = get_infer_size(args, metadata, input_shape)
+
+    print(f'\nModel: {args.model} ({metadata["family"]}, input {input_shape[1:]}, {metadata["num-classes"]} classes, '
+          f'{metadata["output-layout"]} output layout, {metadata["precision"]})')
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(config_infer(args, metadata, batch_size, infer_size))
+    print(f'Created: {args.output} (batch-size {batch_size}' + (f', infer-dims {infer_size})' if infer_size else ')'))
+
+    with open(args.app, 'w', encoding='utf-8') as f:
+        f.write(deepstream_app_config(args, args.output, batch_size))
+    print(f'Created: {args.app} (streammux batch-size {batch_size}, {args.sources} sources)')
+
+    if 'profile-max' in metadata and batch_size > int(metadata['profile-max'].split(',')[0]):
+        print(f'NOTE: The batch-size ({batch_size}) is larger than the maximum batch-size of the exported profile, the '
+              'engine will be built with the batch-size as maximum')
+    if metadata.get('input-dtype') == 'uint8':
+        print('WARNING: nvinfer does not feed UINT8 input, export the model without --uint8 to use it in DeepStream')
+    if batch_size != args.sources:
+        print(f'NOTE: The batch-size ({batch_size}) is different from the number of sources ({args.sources})')
+
+    print('Done\n')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo config_infer and deepstream_app_config generator')
+    parser.add_argument('-m', '--model', required=True, help='Input exported ONNX model file path (required)')
+    parser.add_argument('-o', '--output', default='',
+                        help='Output config_infer file path (default config_infer_MODEL.txt)')
+    parser.add_argument('-a', '--app', default='',
+                        help='Output deepstream_app_config file path (default deepstream_app_config_MODEL.txt)')
+    parser.add_argument('--sources', type=int, default=1, help='Number of sources (default 1)')
+    parser.add_argument('--batch', type=int, default=0, help='Batch-size of dynamic models (default number of sources)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[],
+                        help='Inference size [H,W] of dynamic size models (default exported optimal size)')
+    parser.add_argument('--network-mode', choices=list(PRECISIONS), default='',
+                        help='Network mode (default from the exported model precision)')
+    parser.add_argument('--calib', default='', help='INT8 calibration table file path (network-mode int8)')
+    parser.add_argument('--family', choices=list(PREPROCESS), default='',
+                        help='Override the model family normalization (e.g. yolox_legacy)')
+    parser.add_argument('--classes', type=int, default=0, help='Override the number of classes')
+    parser.add_argument('--labels', default='labels.txt', help='labelfile-path of the config_infer file')
+    parser.add_argument('--lib', default='nvdsinfer_custom_impl_Yolo/libnvdsinfer_custom_impl_Yolo.so',
+                        help='custom-lib-path of the config_infer file')
+    parser.add_argument('--uri', default=SAMPLE_URI, help='Source URI of the deepstream_app_config file')
+    parser.add_argument('--width', type=int, default=1920, help='Streammux width (default 1920)')
+    parser.add_argument('--height', type=int, default=1080, help='Streammux height (default 1080)')
+    parser.add_argument('--gpu-id', type=int, default=0, help='GPU id (default 0)')
+    args = parser.parse_args()
+    if not os.path.isfile(args.model):
+        raise SystemExit('Invalid model file')
+    if args.sources < 1 or args.batch < 0:
+        raise SystemExit('Invalid number of sources or batch-size')
+    if args.size:
+        args.size = args.size * 2 if len(args.size) == 1 else args.size
+    name = os.path.basename(args.model).split('.')[0]
+    args.output = args.output or f'config_infer_{name}.txt'
+    args.app = args.app or f'deepstream_app_config_{name}.txt'
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
@@ -0,0 +1,46 @@
+import os
+
+from deepstream_yolo.profiler import export_profile, print_profile, profile_graph, profile_input_shape
+
+
+def main(args):
+    if args.output and len(args.model) > 1:
+        os.makedirs(args.output, exist_ok=True)
+    for onnx_file in args.model:
+        print(f'Model: {onnx_file}')
+        input_shape = profile_input_shape(onnx_file, args.batch, args.size)
+        if args.output:
+            output = args.output
+            if len(args.model) > 1:
+                output = os.path.join(args.output, f'{os.path.basename(onnx_file)}.profile.json')
+            export_profile(onnx_file, output, input_shape, top=args.top)
+        else:
+            print_profile(profile_graph(onnx_file, input_shape), top=args.top)
+        print()
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo ONNX graph profiler')
+    parser.add_argument('-m', '--model', nargs='+', required=True, help='Input ONNX model file paths')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[], help='Input size of dynamic models: H,W')
+    parser.add_argument('--batch', type=int, default=1, help='Batch-size (default 1)')
+    parser.add_argument('--top', type=int, default=10, help='Number of op types printed (default 10)')
+    parser.add_argument('-o', '--output', default='',
+                        help='Output profile (.json) file path (folder path when more than one model is set)')
+    args = parser.parse_args()
+    for onnx_file in args.model:
+        if not os.path.isfile(onnx_file):
+            raise SystemExit(f'Invalid model file: {onnx_file}')
+    if len(args.size) == 1:
+        args.size = args.size * 2
+    if len(args.size) > 2 or args.batch < 1:
+        raise SystemExit('Invalid size or batch-size')
+    if args.output and len(args.model) > 1 and os.path.isfile(args.output):
+        raise SystemExit('Invalid output folder: set a folder path with more than one model')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
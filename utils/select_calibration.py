@@ -0,0 +1,75 @@
+import os
+import time
+
+import numpy as np
+
+from deepstream_yolo.calibration import list_images
+from deepstream_yolo.selection import k_center, model_features, pool_features, standardize
+
+
+def main(args):
+    images = list_images(args.images)
+    if not images:
+        raise SystemExit('No images found')
+
+    print(f'Computing image features: {len(images)} images')
+    t0 = time.time()
+    features = pool_features(images, args.workers)
+
+    detections = [np.zeros(0, np.float32)] * len(images)
+    if args.model:
+        print(f'Computing detection features: {args.model}')
+        detections = model_features(
+            images, args.model, args.classes, score_threshold=args.score_thres, size=args.size, threads=args.threads
+        )
+
+    valid = [i for i in range(len(images)) if features[i] is not None and detections[i] is not None]
+    for i in sorted(set(range(len(images))) - set(valid)):
+        print(f'Failed to read image: {images[i]}')
+    if not valid:
+        raise SystemExit('No valid images found')
+
+    features = standardize(np.stack([features[i] for i in valid]))
+    if args.model:
+        features = np.concatenate([features, standardize(np.stack([detections[i] for i in valid]), args.weight)], 1)
+
+    selected, radius = k_center(features, args.num)
+    selected = sorted(valid[i] for i in selected)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for i in selected:
+            f.write(f'{images[i]}\n')
+
+    print(f'Done: {args.output} ({len(selected)}/{len(valid)} images, coverage radius {radius:.3f}, '
+          f'{time.time() - t0:.1f}s)')
+
+
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='DeepStream-Yolo INT8 calibration images selection')
+    parser.add_argument('-i', '--images', required=True, help='Input images folder or list (.txt) file path')
+    parser.add_argument('-o', '--output', default='calibration.txt', help='Output images list file path')
+    parser.add_argument('-n', '--num', type=int, default=1000, help='Number of selected images (default 1000)')
+    parser.add_argument('-m', '--model', default='', help='Exported ONNX model to compute detection features')
+    parser.add_argument('--classes', type=int, default=80, help='Number of classes of the model (default 80)')
+    parser.add_argument('--score-thres', type=float, default=0.25, help='Score threshold of the detections')
+    parser.add_argument('--weight', type=float, default=1.0, help='Weight of the detection features (default 1.0)')
+    parser.add_argument('-s', '--size', nargs='+', type=int, default=[],
+                        help='Inference size [H,W] of dynamic size models')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default CPU count)')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime CPU threads (default all)')
+    args = parser.parse_args()
+    if not os.path.exists(args.images):
+        raise SystemExit('Invalid images folder or file')
+    if args.model and not os.path.isfile(args.model):
+        raise SystemExit('Invalid model file')
+    if args.num < 1 or args.workers < 1:
+        raise SystemExit('Invalid number of images or workers')
+    if args.size:
+        args.size = args.size * 2 if len(args.size) == 1 else args.size
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
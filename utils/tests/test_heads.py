@@ -0,0 +1,48 @@
+import argparse
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('onnx')
+pytest.importorskip('onnxruntime')
+
+from deepstream_yolo.common import add_export_args, check_export_args, export_onnx  # noqa: E402
+from deepstream_yolo.runtime import create_session  # noqa: E402
+
+
+class ToyDetector(torch.nn.Module):
+    # [B, anchors, 6] output with one anchor per 2x2 pixels
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 6, 2, stride=2)
+
+    def forward(self, x):
+        y = self.conv(x).flatten(2).transpose(1, 2)
+        xy = torch.sigmoid(y[..., :2]) * x.shape[3]
+        wh = torch.sigmoid(y[..., 2:4]) * 16 + 1
+        return torch.cat([xy - wh / 2, xy + wh / 2, torch.sigmoid(y[..., 4:5]), (y[..., 5:6] > 0).float()], -1)
+
+
+def export(tmp_path, *argv):
+    parser = argparse.ArgumentParser()
+    add_export_args(parser, 17, labels=False)
+    args = parser.parse_args(list(argv))
+    args.weights = str(tmp_path / 'toy.pt')
+    (tmp_path / 'toy.pt').write_bytes(b'')
+    check_export_args(args)
+    torch.manual_seed(0)
+    onnx_file = str(tmp_path / 'toy.onnx')
+    export_onnx(ToyDetector().eval(), torch.zeros(args.batch, 3, 64, 64), onnx_file, args, family='yoloV8')
+    return create_session(onnx_file)
+
+
+@pytest.mark.parametrize('size', [32, 64, 128])
+def test_nms_dynamic_size(tmp_path, size):
+    # 256 anchors at 32x32, fewer than max-det
+    session = export(tmp_path, '-s', '64', '--nms', '--dynamic-size', '--min-size', '32', '--max-size', '128')
+    for x in (np.random.default_rng(0).random((1, 3, size, size), dtype=np.float32),
+              np.zeros((1, 3, size, size), dtype=np.float32)):
+        output, num_detections = session.run(None, {'input': x})
+        assert output.shape == (1, 300, 6)
+        assert 0 <= num_detections[0, 0] <= min(300, (size // 2) ** 2)
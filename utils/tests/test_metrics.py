@@ -0,0 +1,83 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from deepstream_yolo.metrics import mean_average_precision
+
+# pycocotools AP of 150 perfect detections of one image with maxDets=100: recall 100/150, 67 of the 101 recall points
+COCO_AP_150 = 67 / 101
+
+
+def grid_boxes(num, label=0, start=1.0):
+    xy = np.stack(np.meshgrid(np.arange(15), np.arange(10)), -1).reshape(-1, 2)[:num] * 60.0
+    gts = np.concatenate([xy, xy + 50, np.full((num, 1), label)], 1)
+    scores = np.linspace(start, start - 0.4, num)[:, None]
+    return gts, np.concatenate([gts[:, :4], scores, gts[:, 4:]], 1)
+
+
+def random_frames(num_images=5, seed=0):
+    rng = np.random.default_rng(seed)
+    detections, ground_truths = [], []
+    for _ in range(num_images):
+        n = rng.integers(1, 20)
+        xy = rng.uniform(0, 800, (n, 2))
+        gts = np.concatenate([xy, xy + rng.uniform(20, 150, (n, 2)), rng.integers(0, 3, (n, 1))], 1)
+        m = rng.integers(1, 40)
+        k = rng.integers(0, n, m)
+        labels = np.where(rng.random(m) < 0.8, gts[k, 4], rng.integers(0, 3, m))
+        boxes = gts[k, :4] + rng.normal(0, 5, (m, 4)).clip(-9, 9)
+        detections.append(np.concatenate([boxes, rng.random((m, 1)), labels[:, None]], 1))
+        ground_truths.append(gts)
+    return detections, ground_truths
+
+
+def coco_ap(detections, ground_truths):
+    pytest.importorskip('pycocotools')
+    from pycocotools.coco import COCO
+    from pycocotools.cocoeval import COCOeval
+
+    def coco_box(b):
+        return [float(b[0]), float(b[1]), float(b[2] - b[0]), float(b[3] - b[1])]
+
+    annotations, results = [], []
+    for i, (dets, gts) in enumerate(zip(detections, ground_truths)):
+        for g in gts:
+            annotations.append({'id': len(annotations) + 1, 'image_id': i, 'category_id': int(g[4]),
+                                'bbox': coco_box(g), 'area': float((g[2] - g[0]) * (g[3] - g[1])), 'iscrowd': 0})
+        for d in dets:
+            results.append({'image_id': i, 'category_id': int(d[5]), 'bbox': coco_box(d), 'score': float(d[4])})
+
+    coco = COCO()
+    coco.dataset = {'images': [{'id': i} for i in range(len(ground_truths))], 'annotations': annotations,
+                    'categories': [{'id': k} for k in range(3)]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        coco.createIndex()
+        evaluator = COCOeval(coco, coco.loadRes(results), 'bbox')
+        evaluator.evaluate()
+        evaluator.accumulate()
+        evaluator.summarize()
+    return evaluator.stats[0]
+
+
+def test_max_dets_one_class():
+    gts, dets = grid_boxes(150)
+    assert mean_average_precision([dets], [gts], max_dets=100).mean() == pytest.approx(COCO_AP_150)
+    assert mean_average_precision([dets], [gts]).mean() == pytest.approx(1.0)
+
+
+def test_max_dets_per_image_across_classes():
+    # 60 + 60 perfect detections: the top 100 of the image keep all the first class and 40 of the second class
+    gts0, dets0 = grid_boxes(60, 0, 1.0)
+    gts1, dets1 = grid_boxes(60, 1, 0.5)
+    gts1[:, :4] += 5
+    dets1[:, :4] += 5
+    ap = mean_average_precision([np.concatenate([dets0, dets1])], [np.concatenate([gts0, gts1])], max_dets=100)
+    assert ap.mean() == pytest.approx((1 + COCO_AP_150) / 2)
+
+
+def test_matches_pycocotools():
+    detections, ground_truths = random_frames()
+    ap = mean_average_precision(detections, ground_truths, max_dets=100).mean()
+    assert ap == pytest.approx(coco_ap(detections, ground_truths), abs=1e-6)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from deepstream_yolo.preprocess import Preprocessor, normalize_image
+
+cv2 = pytest.importorskip('cv2')
+torch = pytest.importorskip('torch')
+
+from deepstream_yolo.heads import DeepStreamInput  # noqa: E402
+
+# PP-YOLOE (RGB) and RTMDet (BGR) normalization
+SETTINGS = [
+    (0.0173520735727919486, (123.675, 116.28, 103.53), 0),
+    (0.0173520735727919486, (103.53, 116.28, 123.675), 1),
+    (1 / 255, (), 0),
+    (1 / 255, (128.0,), 2)
+]
+
+
+def in_graph(frame, scale_factor, offsets, input_format, nhwc=False):
+    # Frame letterboxed without normalization, normalized by the in-graph input stage
+    preprocessor = Preprocessor(64, 96, input_format=1 if input_format != 2 else 2, dtype=np.uint8,
+                                layout='NHWC' if nhwc else 'NCHW')
+    tensor, _ = preprocessor([frame])
+    module = DeepStreamInput(scale_factor, offsets, input_format, nhwc)
+    with torch.no_grad():
+        return module(torch.from_numpy(tensor)).numpy()
+
+
+@pytest.mark.parametrize('scale_factor, offsets, input_format', SETTINGS)
+@pytest.mark.parametrize('layout', ['NCHW', 'NHWC'])
+def test_preprocessor_matches_input_stage(scale_factor, offsets, input_format, layout):
+    frame = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    preprocessor = Preprocessor(64, 96, scale_factor=scale_factor, offsets=offsets, input_format=input_format,
+                                layout=layout)
+    tensor, _ = preprocessor([frame])
+    if layout == 'NHWC':
+        tensor = tensor.transpose(0, 3, 1, 2)
+    expected = in_graph(frame, scale_factor, offsets, input_format, nhwc=layout == 'NHWC')
+    np.testing.assert_allclose(tensor, expected, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize('scale_factor, offsets, input_format', SETTINGS)
+def test_normalize_image_matches_input_stage(scale_factor, offsets, input_format):
+    frame = np.random.default_rng(1).integers(0, 256, (64, 96, 3), dtype=np.uint8)
+    img = frame[..., ::-1] if input_format == 0 else frame
+    img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)[..., None] if input_format == 2 else img
+    tensor = normalize_image(img, scale_factor, offsets, input_format)
+    expected = in_graph(frame, scale_factor, offsets, input_format)[0]
+    np.testing.assert_allclose(tensor, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_offsets_are_subtracted_before_scaling():
+    frame = np.full((64, 96, 3), (10, 20, 30), dtype=np.uint8)
+    tensor, _ = Preprocessor(64, 96, scale_factor=0.5, offsets=(1, 2, 3), input_format=1)([frame])
+    np.testing.assert_allclose(tensor[0, :, 0, 0], [4.5, 9.0, 13.5])